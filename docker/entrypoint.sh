@@ -98,19 +98,20 @@ except Exception as e:
 echo ""
 echo "=== CHECKING DATABASE AVAILABILITY ==="
 DATABASE_AVAILABLE=$(python -c "
-import os
-import sys
-import traceback
+import django
+django.setup()
 from django.conf import settings
+from general.db import database_available
 
 try:
-    database_available = os.getenv('DATABASE_AVAILABLE', 'False').lower() == 'true'
     has_databases = bool(settings.DATABASES)
-    
-    print(f'Database available from env: {database_available}')
+    # Probed here, not when the settings are imported
+    reachable = database_available()
+
     print(f'DATABASES configured: {has_databases}')
-    
-    if database_available and has_databases:
+    print(f'Database reachable: {reachable}')
+
+    if reachable:
         print('✅ Database is available and configured')
         print('true')
     else:
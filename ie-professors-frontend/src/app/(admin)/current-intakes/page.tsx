@@ -20,7 +20,7 @@ type IntakeData = {
   missing_professors: number
   missing_programs: Array<{
     sections__intake__id: string
-    course__programs__name: string
+    program__name: string
     missing_count: number
   }>
 }
@@ -93,10 +93,10 @@ export default function CurrentIntakes() {
       
       // First collect all programs that have any deliveries in this intake
       intake.missing_programs.forEach(missing => {
-        if (missing.course__programs__name && 
-            missing.course__programs__name !== 'null' && 
-            missing.course__programs__name.trim() !== '') {
-          programsInIntake.add(missing.course__programs__name)
+        if (missing.program__name && 
+            missing.program__name !== 'null' && 
+            missing.program__name.trim() !== '') {
+          programsInIntake.add(missing.program__name)
         }
       })
       
@@ -171,7 +171,7 @@ export default function CurrentIntakes() {
               {missingIntakes.map((intake) => {
                 // Group missing programs by program name
                 const groupedPrograms = intake.missing_programs.reduce((acc, item) => {
-                  const programName = item.course__programs__name
+                  const programName = item.program__name
                   if (!acc[programName]) {
                     acc[programName] = 0
                   }
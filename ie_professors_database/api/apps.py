@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class ApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'api'
+
+    def ready(self):
+        import api.reference_data  # noqa
+        # Instruments every connection opened from here on (see record_query)
+        import ie_professor_management.middleware  # noqa
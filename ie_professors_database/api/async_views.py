@@ -0,0 +1,93 @@
+"""
+Async versions of the dashboard endpoints, served instead of the sync ones
+when ``ASYNC_VIEWS`` is on (the ASGI deployment mode).
+
+Authentication, permissions and the ``ETag`` validator still run as sync code
+before the handler (on a query thread); the handler then runs the independent queries of the
+payload concurrently through ``gather_queries``.
+"""
+import asyncio
+import inspect
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from general.cache import acached_payload
+from general.db import gather_queries
+from university.services import delivery_overview
+
+from .reference_data import get_reference_data
+from .views import CurrentIntakeAPIView, DeliveryOverviewAPIView, ProgramDeliveryOverviewAPIView
+
+
+class AsyncAPIView(APIView):
+    """``APIView`` whose handlers are coroutines; Django runs it natively under ASGI."""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # On a query thread, whose connection persists, for the user lookup
+            await gather_queries(lambda: self.initial(request, *args, **kwargs))
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncCurrentIntakeAPIView(AsyncAPIView, CurrentIntakeAPIView):
+
+    async def get(self, request):
+        selected_date = self.get_selected_date(request)
+
+        async def build():
+            return self.build_intakes(*await gather_queries(*self.intake_queries(selected_date)))
+
+        return Response({
+            'selected_date': selected_date,
+            'intakes': await acached_payload('current-intakes', build, selected_date),
+        })
+
+
+class AsyncProgramDeliveryOverviewAPIView(AsyncAPIView, ProgramDeliveryOverviewAPIView):
+
+    async def get(self, request, program_id, intake_id):
+        async def build():
+            return self.build_payload(*await gather_queries(*self.payload_queries(program_id, intake_id)))
+
+        payload = await acached_payload('program-delivery', build, program_id, intake_id)
+        if payload is None:
+            return Response({'error': 'Program or Intake not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(payload)
+
+
+class AsyncDeliveryOverviewAPIView(AsyncAPIView, DeliveryOverviewAPIView):
+
+    async def get(self, request):
+        program_id, intake_id, semester = self.get_filters(request)
+
+        async def build():
+            (years,) = await gather_queries(lambda: delivery_overview(program_id, intake_id, semester))
+            return years
+
+        years, (reference_data,) = await asyncio.gather(
+            acached_payload('delivery-overview', build, program_id, intake_id, semester),
+            gather_queries(get_reference_data),
+        )
+        return Response(self.build_response(request, years, reference_data))
@@ -0,0 +1,165 @@
+"""
+Streaming CSV / NDJSON exports.
+
+Rows are read with ``iterator(chunk_size=...)`` (a server-side cursor on
+PostgreSQL) and encoded one at a time into a ``StreamingHttpResponse``, so
+memory does not grow with the size of the export. Behind a transaction-mode
+pooler (``DISABLE_SERVER_SIDE_CURSORS``) they are read in keyset chunks
+instead, one query each.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import F, Q
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from university.translation import localized
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Column name -> lookup (or expression) on CourseDelivery; one row per delivery and section
+COURSE_DELIVERY_COLUMNS = {
+    'delivery_id': 'id',
+    'created_at': 'created_at',
+    'updated_at': 'updated_at',
+    'course_id': 'course_id',
+    'course_code': 'course__code',
+    'course_name': localized('course__name'),
+    'course_type': 'course__course_type',
+    'course_credits': 'course__credits',
+    'course_sessions': 'course__sessions',
+    'area_name': localized('course__area__name'),
+    'professor_id': 'professor_id',
+    'professor_name': 'professor__name',
+    'professor_last_name': 'professor__last_name',
+    'professor_email': 'professor__email',
+    'professor_corporate_email': 'professor__corporate_email',
+    'professor_type': 'professor__professor_type',
+    'section_id': 'sections__id',
+    'section_name': 'sections__name',
+    'section_campus': 'sections__campus',
+    'section_course_year': 'sections__course_year',
+    'intake_id': 'sections__intake_id',
+    'intake_name': 'sections__intake__name',
+    'program_id': 'sections__program_id',
+    'program_code': 'sections__program__code',
+}
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the value back, for ``csv.writer``."""
+
+    def write(self, value):
+        return value
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = 'text/csv'
+    format = 'csv'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Only reached for error responses; exports stream their own body
+        rows = data if isinstance(data, list) else [data]
+        if not rows or not isinstance(rows[0], dict):
+            return ''
+        writer = csv.writer(_Echo())
+        lines = [writer.writerow(rows[0].keys())]
+        lines += [writer.writerow(row.values()) for row in rows]
+        return ''.join(lines)
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        rows = data if isinstance(data, list) else [data]
+        return ''.join(json.dumps(row, cls=DjangoJSONEncoder) + '\n' for row in rows)
+
+
+def export_rows(queryset, columns):
+    fields = [name for name, lookup in columns.items() if lookup == name]
+    expressions = {
+        name: F(lookup) if isinstance(lookup, str) else lookup
+        for name, lookup in columns.items() if lookup != name
+    }
+    rows = queryset.select_related(None).prefetch_related(None).values(*fields, **expressions)
+    if connections[rows.db].settings_dict.get('DISABLE_SERVER_SIDE_CURSORS'):
+        return _rows_in_chunks(rows)
+    return rows.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+def _rows_in_chunks(rows):
+    """
+    ``rows`` without a server-side cursor, whose ``iterator()`` would load the
+    whole result at once: ``EXPORT_CHUNK_SIZE`` rows at a time, each chunk
+    starting after the last row of the previous one on the export ordering,
+    which must end with keys that make it unique (the delivery and section
+    ids). Each query stands alone, so consecutive ones may run on different
+    server connections, and none reads more than its chunk.
+    """
+    ordering = [(name.lstrip('-'), name.startswith('-')) for name in rows.query.order_by]
+    # Filtering on annotations, not on the lookups, keeps the joins of the rows
+    keys = {f'export_key_{index}': F(lookup) for index, (lookup, _) in enumerate(ordering)}
+    rows = rows.annotate(**keys)
+    ordering = [(key, descending) for key, (_, descending) in zip(keys, ordering)]
+    after = Q()
+    while True:
+        chunk = list(rows.filter(after)[:EXPORT_CHUNK_SIZE])
+        for row in chunk:
+            last = [row.pop(key) for key in keys]
+            yield row
+        if len(chunk) < EXPORT_CHUNK_SIZE:
+            return
+        after = _after(ordering, last)
+
+
+def _after(ordering, values):
+    """
+    Condition for the rows after ``values`` on ``ordering`` (``(key,
+    descending)`` pairs), with PostgreSQL's nulls: last ascending, first
+    descending.
+    """
+    after, same = Q(pk__in=[]), Q()
+    for (key, descending), value in zip(ordering, values):
+        if value is None:
+            later = Q(**{f'{key}__isnull': False}) if descending else Q(pk__in=[])
+            equal = Q(**{f'{key}__isnull': True})
+        elif descending:
+            later = Q(**{f'{key}__lt': value})
+            equal = Q(**{key: value})
+        else:
+            later = Q(**{f'{key}__gt': value}) | Q(**{f'{key}__isnull': True})
+            equal = Q(**{key: value})
+        after |= same & later
+        same &= equal
+    return after
+
+
+def _csv_lines(rows, columns):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(columns)
+    for row in rows:
+        yield writer.writerow(row[column] for column in columns)
+
+
+def _ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder) + '\n'
+
+
+def streaming_export(queryset, columns, export_format, filename):
+    """``StreamingHttpResponse`` with ``queryset`` flattened to ``columns`` as CSV or NDJSON."""
+    rows = export_rows(queryset, columns)
+    if export_format == NDJSONRenderer.format:
+        body, media_type = _ndjson_lines(rows), NDJSONRenderer.media_type
+    else:
+        body, media_type = _csv_lines(rows, list(columns)), CSVRenderer.media_type
+    response = StreamingHttpResponse(body, content_type=f'{media_type}; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
@@ -2,13 +2,23 @@
 Health check views for monitoring application status.
 """
 import json
+import logging
 import os
+import threading
 import time
-from django.http import JsonResponse
-from django.db import connection
+from django.http import HttpResponse, JsonResponse
+from django.db import DatabaseError, connection, connections
 from django.conf import settings
 from django.views.decorators.http import require_http_methods
 from django.views.decorators.csrf import csrf_exempt
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client.core import GaugeMetricFamily
+
+from general.db import database_available
+from general.metrics import exposition, requests_in_progress
+from university.models import Intake
+
+logger = logging.getLogger(__name__)
 
 
 @csrf_exempt
@@ -29,11 +39,9 @@ def health_check(request):
         "checks": {}
     }
     
-    # Check database availability from settings
-    database_available = os.getenv('DATABASE_AVAILABLE', 'False').lower() == 'true'
-    
-    if not database_available or not settings.DATABASES:
-        # No database configured - this is OK, report as skipped
+    # Database availability, probed once on first use
+    if not database_available():
+        # No database configured or reachable - this is OK, report as skipped
         health_status["checks"]["database"] = {
             "status": "skipped",
             "message": "Running in no-database mode"
@@ -70,12 +78,76 @@ def health_check(request):
     return JsonResponse(health_status, status=status_code)
 
 
+_migration_state = {}
+_migration_lock = threading.Lock()
+
+
+def migration_state(refresh=False):
+    """
+    Result of the last migration check: ``{"status", "pending_migrations",
+    "checked_at"}`` (or ``"error"``). Building the plan loads the whole
+    migration graph, so it is only recomputed every
+    ``READINESS_MIGRATION_INTERVAL`` seconds, or every
+    ``READINESS_RETRY_INTERVAL`` seconds while migrations are pending or the
+    check failed. ``refresh`` forces a new check.
+    """
+    with _migration_lock:
+        state = _migration_state.get("default")
+        if state and not refresh:
+            interval = (
+                settings.READINESS_MIGRATION_INTERVAL if state["status"] == "up_to_date"
+                else settings.READINESS_RETRY_INTERVAL
+            )
+            if time.time() - state["checked_at"] < interval:
+                return state
+
+        try:
+            from django.db.migrations.executor import MigrationExecutor
+
+            executor = MigrationExecutor(connections["default"])
+            plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+            state = {"status": "pending" if plan else "up_to_date", "pending_migrations": len(plan)}
+        except Exception as e:
+            state = {"status": "error", "error": str(e)}
+        state["checked_at"] = time.time()
+        _migration_state["default"] = state
+        return state
+
+
+def worker_stats(request):
+    """
+    Requests in progress against the capacity of the server (all gunicorn
+    workers), not counting the probe itself.
+    """
+    capacity = int(os.getenv("GUNICORN_WORKERS", "1")) * int(os.getenv("GUNICORN_THREADS", "1"))
+    in_progress = requests_in_progress()
+    if hasattr(request, "metrics"):
+        # Counted in progress by RequestInstrumentationMiddleware
+        in_progress = max(in_progress - 1, 0)
+    return {
+        "pid": os.getpid(),
+        "requests_in_progress": int(in_progress),
+        "capacity": capacity,
+        "saturation": round(in_progress / capacity, 2),
+    }
+
+
+def pool_stats(connection):
+    """Connection pool counters, or how long connections are kept without a pool."""
+    pool = getattr(connection, "pool", None)
+    if pool is None:
+        return {"pooled": False, "conn_max_age": connection.settings_dict.get("CONN_MAX_AGE", 0)}
+    return {"pooled": True, **pool.get_stats()}
+
+
 @csrf_exempt
 @require_http_methods(["GET"])
 def readiness_check(request):
     """
     Readiness probe endpoint - checks if the application is ready to serve traffic.
-    More comprehensive than health check.
+    Reads the cached migration state (see ``migration_state``) and runs
+    ``SELECT 1`` on the worker's persistent or pooled connection, so it stays
+    cheap when probed constantly. Also reports pool and worker saturation.
     """
     start_time = time.time()
     
@@ -86,31 +158,13 @@ def readiness_check(request):
     }
     
     # Database migration check
-    try:
-        from django.core.management import execute_from_command_line
-        from django.db.migrations.executor import MigrationExecutor
-        from django.db import connections
-        
-        connection = connections['default']
-        executor = MigrationExecutor(connection)
-        plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
-        
-        if plan:
-            readiness_status["status"] = "not_ready"
-            readiness_status["checks"]["migrations"] = {
-                "status": "pending",
-                "pending_migrations": len(plan)
-            }
-        else:
-            readiness_status["checks"]["migrations"] = {
-                "status": "up_to_date"
-            }
-    except Exception as e:
+    migrations = migration_state()
+    if migrations["status"] != "up_to_date":
         readiness_status["status"] = "not_ready"
-        readiness_status["checks"]["migrations"] = {
-            "status": "error",
-            "error": str(e)
-        }
+    readiness_status["checks"]["migrations"] = {
+        **{key: value for key, value in migrations.items() if key != "checked_at"},
+        "checked_seconds_ago": round(time.time() - migrations["checked_at"], 1),
+    }
     
     # Database connectivity (same as health check)
     try:
@@ -118,7 +172,8 @@ def readiness_check(request):
             cursor.execute("SELECT 1")
             cursor.fetchone()
         readiness_status["checks"]["database"] = {
-            "status": "ready"
+            "status": "ready",
+            "pool": pool_stats(connection),
         }
     except Exception as e:
         readiness_status["status"] = "not_ready"
@@ -126,6 +181,8 @@ def readiness_check(request):
             "status": "not_ready",
             "error": str(e)
         }
+
+    readiness_status["checks"]["workers"] = worker_stats(request)
     
     # Response time
     response_time = round((time.time() - start_time) * 1000, 2)
@@ -149,3 +206,30 @@ def liveness_check(request):
         "status": "alive",
         "timestamp": int(time.time())
     }, status=200)
+
+
+def intake_metrics():
+    """Domain gauges, read from the database on each scrape."""
+    unassigned = GaugeMetricFamily(
+        "ie_intake_unassigned_deliveries", "Course deliveries without professor per active intake.", labels=["intake"]
+    )
+    try:
+        for name, missing in Intake.objects.filter(active=True).values_list("name", "missing_professors"):
+            unassigned.add_metric([name], missing)
+    except DatabaseError:
+        logger.warning("Intake metrics skipped: database unavailable", exc_info=True)
+        return
+    yield unassigned
+
+
+@csrf_exempt
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Prometheus scrape endpoint: request latency, status and query counts per
+    route, payload cache hit ratios and intake gauges. When ``METRICS_TOKEN``
+    is set the scraper must send it as a bearer token.
+    """
+    if settings.METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {settings.METRICS_TOKEN}":
+        return JsonResponse({"detail": "Invalid metrics token."}, status=401)
+    return HttpResponse(exposition(intake_metrics), content_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,214 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.reference_data import invalidate_reference_data
+from api.urls import router
+from university.models import Intake, Section
+from university.services import recommend_assignments
+from university.services.synthetic_data import SIZES, generate_synthetic_data
+
+BASELINE_PATH = Path(__file__).resolve().parents[2] / "benchmarks" / "endpoints.json"
+TAG = "BNCH"
+
+
+class _Rollback(Exception):
+    pass
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` that counts and times every query."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs every API route and the custom admin views against generated datasets, records wall time, "
+        "query count, SQL time and response size, and fails when a route goes over its budget in the "
+        "baseline file (--update-baseline rewrites it)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", choices=sorted(SIZES), action="append", dest="sizes",
+                            help="Dataset size to run (repeatable; default all).")
+        parser.add_argument("--repeat", type=int, default=3, help="Timed requests per route (default 3).")
+        parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+        parser.add_argument("--update-baseline", action="store_true", help="Store the results as the new budgets.")
+        parser.add_argument("--query-slack", type=int, default=0, help="Extra queries allowed over the budget (default 0).")
+        parser.add_argument("--time-factor", type=float, default=2.0,
+                            help="Allowed wall/SQL time as a multiple of the budget (default 2.0, plus 50 ms).")
+        parser.add_argument("--size-factor", type=float, default=1.25,
+                            help="Allowed response size as a multiple of the budget (default 1.25).")
+        parser.add_argument("--current-database", action="store_true",
+                            help="Use the configured database instead of a fresh test database "
+                                 "(the generated rows are rolled back).")
+        parser.add_argument("--keepdb", action="store_true", help="Keep the test database between runs.")
+
+    def handle(self, *args, **options):
+        sizes = options["sizes"] or list(SIZES)
+        if options["current_database"]:
+            results = self.run(sizes, options)
+        else:
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False, keepdb=options["keepdb"], aliases={"default"})
+            try:
+                results = self.run(sizes, options)
+            finally:
+                teardown_databases(old_config, verbosity=0, keepdb=options["keepdb"])
+                teardown_test_environment()
+
+        baseline = json.loads(options["baseline"].read_text()) if options["baseline"].exists() else {}
+        if options["update_baseline"]:
+            baseline.update(results)
+            options["baseline"].parent.mkdir(parents=True, exist_ok=True)
+            options["baseline"].write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+            return
+
+        failures = []
+        for size, routes in results.items():
+            for route, current in routes.items():
+                budget = baseline.get(size, {}).get(route)
+                for problem in self.over_budget(current, budget, options):
+                    failures.append(f"[{size}] {route}: {problem}")
+        for failure in failures:
+            self.stderr.write(failure)
+        if failures:
+            raise CommandError(f"{len(failures)} budget violation(s).")
+        self.stdout.write(self.style.SUCCESS("All routes within budget."))
+
+    def run(self, sizes, options):
+        results = {}
+        for size in sizes:
+            try:
+                with transaction.atomic():
+                    generate_synthetic_data(tag=TAG, **SIZES[size])
+                    user = User.objects.create_superuser(f"{TAG.lower()}-benchmark", password="benchmark")
+                    client = APIClient()
+                    client.force_authenticate(user)
+                    client.force_login(user)
+                    results[size] = {
+                        route: self.measure(client, method, url, data, options["repeat"])
+                        for route, method, url, data in self.cases()
+                    }
+                    raise _Rollback
+            except _Rollback:
+                pass
+            self.report(size, results[size])
+        return results
+
+    def cases(self):
+        """``(route, method, url, data)`` for every API route and the custom admin views."""
+        intake = Intake.get_active_at(timezone.localdate()).filter(name__startswith=f"{TAG} ").first()
+        section = Section.objects.filter(intake=intake).order_by("pk").first()
+
+        for prefix, viewset, basename in router.registry:
+            model = viewset.queryset.model
+            yield f"{basename}-list", "get", reverse(f"{basename}-list"), None
+            pk = model._default_manager.order_by("-pk").values_list("pk", flat=True).first()
+            if pk is not None:
+                yield f"{basename}-detail", "get", reverse(f"{basename}-detail", args=[pk]), None
+        yield "coursedelivery-export", "get", reverse("coursedelivery-export"), {"format": "csv"}
+        yield "current-intakes", "get", reverse("current-intakes"), None
+        yield ("program-delivery-overview", "get",
+               reverse("program-delivery-overview", args=[section.program_id, intake.pk]), None)
+        yield "delivery-overview", "get", reverse("delivery-overview"), None
+        yield ("delivery-overview-filtered", "get", reverse("delivery-overview"),
+               {"program": section.program_id, "intake": intake.pk})
+        yield "reference-data", "get", reverse("reference-data"), None
+        yield ("intake-recommend-assignments", "get",
+               reverse("intake-recommend-assignments", args=[intake.pk]), None)
+        yield "intake-conflicts", "get", reverse("intake-conflicts", args=[intake.pk]), None
+        yield "professor-workload", "get", reverse("professor-workload"), {"intake": intake.pk}
+        # A typical batch from the assignment screen; every request is rolled back (see measure)
+        assignments = [
+            {"delivery_id": proposal["delivery_id"], "professor_id": proposal["professor_id"]}
+            for proposal in recommend_assignments(intake)["proposals"][:50]
+        ]
+        yield "coursedelivery-bulk-assign", "post", reverse("coursedelivery-bulk-assign"), assignments
+        yield "health-check", "get", reverse("health-check"), None
+        yield "readiness-check", "get", reverse("readiness-check"), None
+        yield "liveness-check", "get", reverse("liveness-check"), None
+        yield "metrics", "get", reverse("metrics"), None
+        credentials = {"username": f"{TAG.lower()}-benchmark", "password": "benchmark"}
+        yield "token_obtain_pair", "post", reverse("token_obtain_pair"), credentials
+        refresh = APIClient().post(reverse("token_obtain_pair"), credentials).data["refresh"]
+        yield "token_refresh", "post", reverse("token_refresh"), {"refresh": refresh}
+        yield ("admin-current-intake-landing", "get",
+               reverse("admin:university_intake_current_intake_landing"), None)
+        yield ("admin-program-delivery-overview", "get",
+               reverse("admin:program_delivery_overview", args=[section.program_id]), None)
+
+    def measure(self, client, method, url, data, repeat):
+        samples = []
+        for _ in range(repeat):
+            # Every request starts cold, so the numbers do not depend on the order of the routes
+            cache.clear()
+            invalidate_reference_data()
+            recorder = QueryRecorder()
+            try:
+                # Writes are undone, so every repeat sees the same rows
+                with transaction.atomic():
+                    with connection.execute_wrapper(recorder):
+                        started = time.perf_counter()
+                        if method == "get":
+                            response = client.get(url, data)
+                        else:
+                            response = getattr(client, method)(url, data, format="json")
+                        body = b"".join(response.streaming_content) if response.streaming else response.content
+                        wall = time.perf_counter() - started
+                    raise _Rollback
+            except _Rollback:
+                pass
+            samples.append((response.status_code, recorder.count, recorder.seconds * 1000, wall * 1000, len(body)))
+        return {
+            "status": max(sample[0] for sample in samples),
+            "queries": max(sample[1] for sample in samples),
+            "sql_ms": round(statistics.median(sample[2] for sample in samples), 2),
+            "wall_ms": round(statistics.median(sample[3] for sample in samples), 2),
+            "bytes": max(sample[4] for sample in samples),
+        }
+
+    def over_budget(self, current, budget, options):
+        if current["status"] >= 400:
+            yield f"status {current['status']}"
+        if budget is None:
+            return
+        if current["queries"] > budget["queries"] + options["query_slack"]:
+            yield f"{current['queries']} queries (budget {budget['queries']})"
+        for metric in ("sql_ms", "wall_ms"):
+            limit = budget[metric] * options["time_factor"] + 50
+            if current[metric] > limit:
+                yield f"{metric} {current[metric]} (limit {limit:.2f})"
+        if current["bytes"] > budget["bytes"] * options["size_factor"]:
+            yield f"{current['bytes']} bytes (budget {budget['bytes']})"
+
+    def report(self, size, routes):
+        self.stdout.write(f"\n{size}")
+        self.stdout.write(f"  {'route':<36} {'status':>6} {'queries':>8} {'sql ms':>9} {'wall ms':>9} {'bytes':>10}")
+        for route, result in routes.items():
+            self.stdout.write(
+                f"  {route:<36} {result['status']:>6} {result['queries']:>8} {result['sql_ms']:>9.2f} "
+                f"{result['wall_ms']:>9.2f} {result['bytes']:>10}"
+            )
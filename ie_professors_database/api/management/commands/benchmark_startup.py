@@ -0,0 +1,61 @@
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+STEPS = [
+    ("import settings", "import ie_professor_management.settings"),
+    ("django.setup()", "import django; django.setup()"),
+    ("manage.py check", None),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Times the startup steps every manage.py command, gunicorn worker and test run pays "
+        "(settings import, django.setup(), manage.py check), each in a fresh interpreter."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per step (default 5).")
+        parser.add_argument("--stalled-db", action="store_true",
+                            help="Point the database at a local socket that accepts connections but never answers, "
+                                 "to see the cost of a slow or unreachable database.")
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE, "PYTHONDONTWRITEBYTECODE": "1"}
+        stalled = None
+        if options["stalled_db"]:
+            # The kernel completes the handshake of queued connections, so clients wait for a server greeting
+            stalled = socket.create_server(("127.0.0.1", 0), backlog=128)
+            env.update(DB_HOST="127.0.0.1", DB_PORT=str(stalled.getsockname()[1]),
+                       DB_PASSWORD=env.get("DB_PASSWORD") or "stalled")
+        try:
+            self.time_steps(env)
+        finally:
+            if stalled is not None:
+                stalled.close()
+
+    def time_steps(self, env):
+        manage = os.path.join(settings.BASE_DIR, "manage.py")
+        self.stdout.write(f"  {'step':<18} {'median ms':>10} {'min ms':>10} {'max ms':>10}")
+        for name, code in STEPS:
+            command = [sys.executable, "-c", code] if code else [sys.executable, manage, "check"]
+            samples = [self.run(command, env) for _ in range(self.repeat)]
+            self.stdout.write(
+                f"  {name:<18} {statistics.median(samples):>10.1f} {min(samples):>10.1f} {max(samples):>10.1f}"
+            )
+
+    def run(self, command, env):
+        started = time.perf_counter()
+        result = subprocess.run(command, env=env, cwd=settings.BASE_DIR, capture_output=True, text=True)
+        elapsed = (time.perf_counter() - started) * 1000
+        if result.returncode:
+            raise CommandError(f"{' '.join(command)} failed:\n{result.stderr}")
+        return elapsed
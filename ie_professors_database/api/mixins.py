@@ -0,0 +1,188 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.utils.translation import get_language
+
+from general.cache import get_generation
+from general.routers import reading_from_replica
+
+from .pagination import KeysetPagination
+
+
+def _split_param(value):
+    """Turns ``"a, b,c"`` into ``{"a", "b", "c"}``; empty values mean "not requested"."""
+    if not value:
+        return None
+    return {part.strip() for part in value.split(',') if part.strip()} or None
+
+
+class SparseFieldsetMixin:
+    """
+    Adds the ``?fields=`` / ``?expand=`` contract to a viewset.
+
+    - ``fields`` limits the response to the listed (readable) fields.
+    - ``expand`` lists the relations that are rendered as nested objects.
+
+    Without either parameter the response keeps its full nested shape. As soon
+    as one of them is given, relations that are not expanded are rendered as
+    primary keys. ``select_related_plan`` and ``prefetch_related_plan`` map a
+    serializer field to the lookups needed to render it nested, and the queryset
+    is rebuilt from them, so a relation that is left out costs no JOIN or query.
+    """
+    select_related_plan = {}
+    prefetch_related_plan = {}
+
+    def get_sparse_fieldset(self):
+        if not hasattr(self, '_sparse_fieldset'):
+            params = self.request.query_params if self.request is not None else {}
+            self._sparse_fieldset = (_split_param(params.get('fields')), _split_param(params.get('expand')))
+        return self._sparse_fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        fields, expand = self.get_sparse_fieldset()
+        context.update({'fields': fields, 'expand': expand})
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset().select_related(None).prefetch_related(None)
+        fields, expand = self.get_sparse_fieldset()
+        sparse = fields is not None or expand is not None
+
+        select_related, prefetch_related = [], []
+        relations = list(self.select_related_plan)
+        relations += [name for name in self.prefetch_related_plan if name not in relations]
+        for name in relations:
+            if fields is not None and name not in fields:
+                continue
+            if not sparse or name in (expand or ()):
+                select_related += self.select_related_plan.get(name, [])
+                prefetch_related += self.prefetch_related_plan.get(name, [])
+            elif self._is_many_relation(queryset.model, name):
+                # Collapsed to-many relations still need their ids
+                prefetch_related.append(name)
+
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+    @staticmethod
+    def _is_many_relation(model, name):
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return False
+        return field.many_to_many or field.one_to_many
+
+
+class SerializationTimingMixin:
+    """
+    Counts the time the view's serializers spend building the response data
+    (``serializer.data``, lazy queries included) in the request's
+    ``serialize`` timing, next to the renderer's ``render`` timing.
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = getattr(self.request, 'metrics', None)
+        if metrics is not None:
+            serializer.to_representation = metrics.timed_serialization(serializer.to_representation)
+        return serializer
+
+
+class _ConditionalResponse(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+class ConditionalGetMixin:
+    """
+    ``ETag`` / ``Last-Modified`` on GET responses and ``304`` for a matching
+    ``If-None-Match``, decided before the handler runs its queries.
+
+    The validator is ``max(updated_at)`` and the row count of each queryset
+    from ``get_validator_querysets()`` (one aggregate query each), plus the
+    payload-cache generation, which moves on any university model change that
+    does not touch ``updated_at`` (nested relations, m2m links, counters).
+    With a per-process cache that generation is only seen by one worker, so
+    no validator is emitted unless ``PAYLOAD_CACHE_ENABLED`` (on by default
+    only with a shared cache backend). Nor on requests routed to the read
+    replica: the generation moves with the primary, so a lagging replica
+    would serve an old body under the new ETag, and the client would keep it.
+
+    Viewsets validate ``list`` (the filtered queryset) and ``retrieve`` (the
+    object) when the model has ``updated_at``; APIViews override
+    ``get_validator_querysets``.
+    """
+    conditional_actions = ('list', 'retrieve')
+    validator_field = 'updated_at'
+
+    def get_validator_querysets(self, request, *args, **kwargs):
+        action = getattr(self, 'action', None)
+        if action not in self.conditional_actions or not hasattr(self, 'get_queryset'):
+            return None
+        queryset = self.get_queryset()
+        try:
+            queryset.model._meta.get_field(self.validator_field)
+        except FieldDoesNotExist:
+            return None
+        if action == 'retrieve':
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            return [queryset.filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})]
+        if KeysetPagination.cursor_query_param in request.query_params:
+            # Keyset pages exist to avoid whole-table aggregates
+            return None
+        return [self.filter_queryset(queryset)]
+
+    def get_validator(self, request, *args, **kwargs):
+        """``(etag, last_modified)`` for this request, or ``None`` to skip validation."""
+        if not settings.PAYLOAD_CACHE_ENABLED or reading_from_replica():
+            return None
+        querysets = self.get_validator_querysets(request, *args, **kwargs)
+        if querysets is None:
+            return None
+
+        parts = [request.get_full_path(), request.accepted_renderer.format, get_language(), get_generation()]
+        last_modified = None
+        for queryset in querysets:
+            stats = queryset.order_by().aggregate(last_modified=Max(self.validator_field), count=Count('pk'))
+            parts += [queryset.model._meta.label, stats['last_modified'], stats['count']]
+            if stats['last_modified'] and (last_modified is None or stats['last_modified'] > last_modified):
+                last_modified = stats['last_modified']
+        etag = '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+        return etag, last_modified
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.response_validator = None
+        if request.method in ('GET', 'HEAD'):
+            self.response_validator = self.get_validator(request, *args, **kwargs)
+            if self.response_validator:
+                # Only the ETag decides: Last-Modified alone would miss deleted rows
+                response = get_conditional_response(request, etag=self.response_validator[0])
+                if response is not None:
+                    raise _ConditionalResponse(response)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _ConditionalResponse):
+            self._set_validator_headers(exc.response)
+            return exc.response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if getattr(self, 'response_validator', None) and response.status_code == 200:
+            self._set_validator_headers(response)
+        return response
+
+    def _set_validator_headers(self, response):
+        etag, last_modified = self.response_validator
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
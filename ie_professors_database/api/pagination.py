@@ -0,0 +1,227 @@
+import base64
+import binascii
+import datetime
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from general.db import estimate_count
+
+
+def _cursor_value(value):
+    # Full precision: DjangoJSONEncoder drops microseconds, which would break the seek
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset (seek) pagination keyed on the queryset ordering.
+
+    The cursor stores the ordering values of the last row of the page, and the
+    next page is fetched with ``WHERE (ordering) > (cursor) LIMIT n``: there is
+    no ``COUNT(*)`` and no ``OFFSET``, so page N costs the same as page 1.
+    The primary key is appended to the ordering so every position is unique.
+    ``?total=approx`` adds the planner's row estimate to the response.
+    """
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    total_query_param = 'total'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = remove_query_param(request.build_absolute_uri(), 'page')
+        self.ordering = self.get_ordering(queryset, view)
+        position, reverse = self.decode_cursor(request)
+
+        self.approximate_count = None
+        if request.query_params.get(self.total_query_param) == 'approx':
+            self.approximate_count = estimate_count(queryset)
+
+        ordering = [(name, descending != reverse) for name, descending in self.ordering]
+        queryset = queryset.order_by(*[
+            F(name).desc(nulls_first=True) if descending else F(name).asc(nulls_last=True)
+            for name, descending in ordering
+        ])
+        if position is not None:
+            try:
+                queryset = queryset.filter(self._after(queryset.model, ordering, position))
+            except (ValueError, TypeError, DjangoValidationError):
+                # A forged or stale cursor with values the columns do not accept
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_position = self._position(results[-1]) if results else None
+        self.previous_position = self._position(results[0]) if results else None
+        if reverse:
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        return results
+
+    def get_paginated_response(self, data):
+        payload = {
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        }
+        if self.approximate_count is not None:
+            payload['approximate_count'] = self.approximate_count
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'approximate_count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or self.next_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.next_position, False))
+
+    def get_previous_link(self):
+        if not self.has_previous or self.previous_position is None:
+            return None
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(self.previous_position, True))
+
+    def get_ordering(self, queryset, view):
+        """
+        ``(column, descending)`` pairs from the queryset ordering (which includes
+        OrderingFilter), falling back to the view ``ordering`` and the model Meta.
+        """
+        model = queryset.model
+        ordering = [name for name in queryset.query.order_by if isinstance(name, str)]
+        ordering = ordering or list(getattr(view, 'ordering', None) or []) or list(model._meta.ordering)
+
+        columns = []
+        for name in ordering:
+            descending = name.startswith('-')
+            name = name.lstrip('-')
+            if name == 'pk':
+                name = model._meta.pk.attname
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                pass
+            else:
+                if field.is_relation:
+                    name = field.attname
+            columns.append((name, descending))
+
+        if model._meta.pk.attname not in {name for name, _ in columns}:
+            columns.append((model._meta.pk.attname, False))
+        return columns
+
+    def encode_cursor(self, position, reverse):
+        data = json.dumps({'p': position, 'r': reverse}, default=_cursor_value)
+        return base64.urlsafe_b64encode(data.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            data = json.loads(base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)))
+            position, reverse = data['p'], bool(data['r'])
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def _position(self, obj):
+        return [getattr(obj, name) for name, _ in self.ordering]
+
+    def _after(self, model, ordering, position):
+        """
+        Rows strictly after ``position``: ``a > x OR (a = x AND b > y) OR ...``,
+        with NULLs sorted last ascending / first descending like PostgreSQL.
+        """
+        clauses = []
+        for index, (name, descending) in enumerate(ordering):
+            beyond = self._beyond(model, name, descending, position[index])
+            if beyond is None:
+                continue
+            equal = [self._equal(n, v) for (n, _), v in zip(ordering[:index], position[:index])]
+            clauses.append(reduce(and_, equal, beyond))
+        if not clauses:
+            return Q(pk__in=[])
+
+        condition = reduce(or_, clauses)
+        # Redundant bound on the leading column so the index range scan starts at the cursor
+        name, descending = ordering[0]
+        if position[0] is not None and not self._nullable(model, name):
+            condition &= Q(**{f"{name}__{'lte' if descending else 'gte'}": position[0]})
+        return condition
+
+    def _beyond(self, model, name, descending, value):
+        nullable = self._nullable(model, name)
+        if descending:
+            if value is None:
+                return Q(**{f"{name}__isnull": False})
+            return Q(**{f"{name}__lt": value})
+        if value is None:
+            return None
+        condition = Q(**{f"{name}__gt": value})
+        if nullable:
+            condition |= Q(**{f"{name}__isnull": True})
+        return condition
+
+    @staticmethod
+    def _equal(name, value):
+        if value is None:
+            return Q(**{f"{name}__isnull": True})
+        return Q(**{name: value})
+
+    @staticmethod
+    def _nullable(model, name):
+        try:
+            return model._meta.get_field(name).null
+        except FieldDoesNotExist:
+            return True
+
+
+class StandardResultsPagination(PageNumberPagination):
+    """
+    Page-number pagination, switching to keyset mode when ``?cursor=`` is present
+    (an empty value asks for the first page).
+    """
+    keyset_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.keyset_class.cursor_query_param in request.query_params:
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
@@ -0,0 +1,77 @@
+"""
+Versioned bundle of the reference data the frontend needs for its filters and
+labels: programs, intakes, areas, universities, joined academic years and
+every ``TextChoices`` enum.
+"""
+import hashlib
+import inspect
+import json
+import time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.utils.encoding import force_str
+from django.utils.translation import get_language
+
+from general.routers import primary_reads
+from university import models as university_models
+from university.models import Area, CurrentIntake, Intake, JoinedAcademicYear, Program, University
+
+REFERENCE_MODELS = (Program, Intake, Area, University, JoinedAcademicYear)
+
+# Saves only invalidate the process that made them; other workers catch up
+# after this many seconds at the latest.
+MAX_AGE = 300
+
+_bundles = {}
+
+
+def _choices():
+    return {
+        name: [{'value': value, 'display': force_str(label)} for value, label in enum.choices]
+        for name, enum in inspect.getmembers(university_models, inspect.isclass)
+        if issubclass(enum, models.TextChoices) and enum.__module__ == university_models.__name__
+    }
+
+
+def build_reference_data():
+    data = {
+        'programs': list(Program.objects.order_by('id').values('id', 'name', 'code', 'school', 'type', 'years')),
+        'intakes': list(Intake.objects.values('id', 'name', 'semester', 'start_time', 'end_time', 'active')),
+        'areas': [{'id': area.id, 'name': area.name} for area in Area.objects.order_by('id')],
+        'universities': list(University.objects.values('id', 'name', 'country')),
+        'joined_academic_years': list(JoinedAcademicYear.objects.order_by('-start_date', 'id').values('id', 'name', 'start_date')),
+        'choices': _choices(),
+    }
+    # Round-trip through JSON so the cached bundle is exactly what gets hashed and sent
+    content = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True)
+    return {
+        'version': hashlib.sha256(content.encode()).hexdigest()[:16],
+        'data': json.loads(content),
+    }
+
+
+def get_reference_data():
+    """``{'version', 'data'}`` for the active language, cached in this process."""
+    language = get_language()
+    cached = _bundles.get(language)
+    if cached is None or time.monotonic() - cached[1] > MAX_AGE:
+        # Kept for MAX_AGE, so never built from a lagging replica
+        with primary_reads():
+            cached = _bundles[language] = (build_reference_data(), time.monotonic())
+    return cached[0]
+
+
+def invalidate_reference_data():
+    _bundles.clear()
+
+
+def _invalidate_on_change(sender, **kwargs):
+    invalidate_reference_data()
+
+
+# Only the reference models (and the admin's CurrentIntake proxy), not every save or history row
+for _model in (*REFERENCE_MODELS, CurrentIntake):
+    post_save.connect(_invalidate_on_change, sender=_model)
+    post_delete.connect(_invalidate_on_change, sender=_model)
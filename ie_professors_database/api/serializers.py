@@ -3,15 +3,41 @@ from rest_framework import serializers
 from university.models import (
     Professor, Course, Section, Program, Area, University, Degree, 
     Intake, CourseDelivery, ProfessorDegree, ProfessorCoursePossibility,
-    JoinedAcademicYear, CourseDeliverySection
+    JoinedAcademicYear, CourseDeliverySection, SemesterType
 )
 
-class UniversitySerializer(serializers.ModelSerializer):
+class SparseFieldsetSerializerMixin:
+    """
+    Applies the ``fields`` / ``expand`` sets that ``api.mixins.SparseFieldsetMixin``
+    puts in the context. Only the top-level serializer receives that context at
+    init time, so nested serializers always render in full.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields = self.context.get('fields')
+        expand = self.context.get('expand')
+        if fields is None and expand is None:
+            return
+
+        expand = expand or set()
+        for name, field in list(self.fields.items()):
+            # Write-only fields are input, never output: leave them alone
+            if field.write_only:
+                continue
+            if fields is not None and name not in fields:
+                self.fields.pop(name)
+            elif isinstance(field, serializers.BaseSerializer) and name not in expand:
+                kwargs = {'read_only': True, 'many': isinstance(field, serializers.ListSerializer)}
+                if field.source != name:
+                    kwargs['source'] = field.source
+                self.fields[name] = serializers.PrimaryKeyRelatedField(**kwargs)
+
+class UniversitySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = University
         fields = '__all__'
 
-class DegreeSerializer(serializers.ModelSerializer):
+class DegreeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Read-only fields for detailed display
     university = UniversitySerializer(read_only=True)
     degree_type_display = serializers.SerializerMethodField()
@@ -46,12 +72,12 @@ class DegreeSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class AreaSerializer(serializers.ModelSerializer):
+class AreaSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Area
         fields = '__all__'
 
-class ProgramSerializer(serializers.ModelSerializer):
+class ProgramSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     school_display = serializers.SerializerMethodField()
     type_display = serializers.SerializerMethodField()
     
@@ -65,7 +91,7 @@ class ProgramSerializer(serializers.ModelSerializer):
     def get_type_display(self, obj):
         return obj.get_type_display()
 
-class IntakeSerializer(serializers.ModelSerializer):
+class IntakeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     semester_display = serializers.SerializerMethodField()
     
     class Meta:
@@ -75,12 +101,12 @@ class IntakeSerializer(serializers.ModelSerializer):
     def get_semester_display(self, obj):
         return obj.get_semester_display()
 
-class JoinedAcademicYearSerializer(serializers.ModelSerializer):
+class JoinedAcademicYearSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = JoinedAcademicYear
         fields = '__all__'
 
-class SectionSerializer(serializers.ModelSerializer):
+class SectionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Read-only fields for detailed display
     intake = IntakeSerializer(read_only=True)
     program = ProgramSerializer(read_only=True)
@@ -129,7 +155,7 @@ class SectionSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class CourseSerializer(serializers.ModelSerializer):
+class CourseSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Read-only fields for detailed display
     programs = ProgramSerializer(many=True, read_only=True)
     area = AreaSerializer(read_only=True)
@@ -182,7 +208,7 @@ class CourseSerializer(serializers.ModelSerializer):
         
         return instance
 
-class ProfessorSerializer(serializers.ModelSerializer):
+class ProfessorSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     professor_type_display = serializers.SerializerMethodField()
     gender_display = serializers.SerializerMethodField()
     campuses_display = serializers.SerializerMethodField()
@@ -212,7 +238,7 @@ class ProfessorSerializer(serializers.ModelSerializer):
     def get_availabilities_display(self, obj):
         return [dict(obj._meta.get_field('availabilities').base_field.choices).get(availability, availability) for availability in obj.availabilities]
 
-class ProfessorDegreeSerializer(serializers.ModelSerializer):
+class ProfessorDegreeSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Read-only fields for detailed display
     professor = ProfessorSerializer(read_only=True)
     degree = DegreeSerializer(read_only=True)
@@ -250,7 +276,7 @@ class ProfessorDegreeSerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class ProfessorCoursePossibilitySerializer(serializers.ModelSerializer):
+class ProfessorCoursePossibilitySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Read-only fields for detailed display
     professor = ProfessorSerializer(read_only=True)
     course = CourseSerializer(read_only=True)
@@ -288,7 +314,7 @@ class ProfessorCoursePossibilitySerializer(serializers.ModelSerializer):
         instance.save()
         return instance
 
-class CourseDeliverySerializer(serializers.ModelSerializer):
+class CourseDeliverySerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     # Read-only fields for detailed display
     course = CourseSerializer(read_only=True)
     professor = ProfessorSerializer(read_only=True)
@@ -371,10 +397,33 @@ class CourseSimpleSerializer(serializers.ModelSerializer):
     def get_course_type_display(self, obj):
         return obj.get_course_type_display()
 
-class CourseDeliverySectionSerializer(serializers.ModelSerializer):
+class CourseDeliverySectionSerializer(SparseFieldsetSerializerMixin, serializers.ModelSerializer):
     course_delivery = CourseDeliverySerializer(read_only=True)
     section = SectionSerializer(read_only=True)
     
     class Meta:
         model = CourseDeliverySection
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class BulkAssignmentItemSerializer(serializers.Serializer):
+    delivery_id = serializers.IntegerField()
+    professor_id = serializers.IntegerField(required=False, allow_null=True)
+    sections_ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        required=False,
+        allow_empty=True
+    )
+
+class RecommendedAssignmentSerializer(serializers.Serializer):
+    delivery_id = serializers.IntegerField()
+    professor_id = serializers.IntegerField()
+
+class AssignmentRecommendationSerializer(serializers.Serializer):
+    extra_sessions = serializers.IntegerField(min_value=0, required=False, allow_null=True)
+    proposals = RecommendedAssignmentSerializer(many=True, required=False)
+
+class ProfessorWorkloadFilterSerializer(serializers.Serializer):
+    professor = serializers.IntegerField(required=False)
+    intake = serializers.IntegerField(required=False)
+    semester = serializers.ChoiceField(choices=SemesterType.choices, required=False)
+    active = serializers.BooleanField(required=False, allow_null=True)
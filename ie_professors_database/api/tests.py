@@ -1,10 +1,38 @@
-from rest_framework.test import APITestCase
+from rest_framework.test import APIRequestFactory, APITestCase, force_authenticate
 from rest_framework import status
+from rest_framework.pagination import PageNumberPagination
 from django.urls import reverse
+from django.contrib.auth.models import User
+from asgiref.sync import async_to_sync
+from django.db import OperationalError, connection, connections
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.core.management import call_command
+import csv
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from unittest import mock, skipUnless
+from django.conf import settings
+from django.core.paginator import EmptyPage
+from api.async_views import AsyncCurrentIntakeAPIView, AsyncDeliveryOverviewAPIView, AsyncProgramDeliveryOverviewAPIView
+from api.health_views import migration_state
+from api.management.commands.benchmark_endpoints import Command as BenchmarkEndpointsCommand, QueryRecorder as BenchmarkQueryRecorder
+from api.pagination import KeysetPagination
+from general.cache import cached_payload, get_generation, payload_cache_stats
+from general.db import _probes as db_probes, database_available, gather_queries
+from general.paginator import EstimatedCountPaginator
+from general.routers import ReplicaRouter, reads_from
+from university.services import (
+    find_conflicts, generate_synthetic_data, professor_workload, recommend_assignments, refresh_missing_professor_counters,
+)
 from university.models import (
     University, Degree, Area, Program, Intake, Section, Course, 
     Professor, CourseDelivery, ProfessorDegree, ProfessorCoursePossibility,
-    JoinedAcademicYear, CourseDeliverySection
+    JoinedAcademicYear, CourseDeliverySection, IntakeProgramCounter
 )
 from datetime import date
 
@@ -281,3 +309,1524 @@ class FilteringAndOrderingTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 50)  # Page size
         self.assertIsNotNone(response.data['next'])  # Next page exists
+
+
+class AuthenticatedAPITestCase(APITestCase):
+    """Same fixtures as APITestCase, with an authenticated client."""
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="staff", password="password")
+        self.client.force_authenticate(self.user)
+
+
+class SparseFieldsetTest(AuthenticatedAPITestCase):
+    """Test the ?fields= / ?expand= contract."""
+
+    def setUp(self):
+        super().setUp()
+        self.delivery = CourseDelivery.objects.create(
+            course=self.course,
+            professor=self.professor
+        )
+        self.delivery.sections.add(self.section)
+
+    def test_default_response_is_fully_nested(self):
+        response = self.client.get('/api/course-deliveries/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.data['results'][0]
+        self.assertEqual(item['course']['code'], 'CS101')
+        self.assertEqual(item['professor']['last_name'], 'Doe')
+        self.assertEqual(item['sections'][0]['intake']['name'], 'Fall 2025')
+
+    def test_fields_limits_response(self):
+        response = self.client.get('/api/professors/?fields=id,name,last_name')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'last_name'})
+
+    def test_relations_collapse_to_ids_unless_expanded(self):
+        response = self.client.get('/api/course-deliveries/?fields=id,course,professor,sections&expand=professor')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        item = response.data['results'][0]
+        self.assertEqual(item['course'], self.course.id)
+        self.assertEqual(item['sections'], [self.section.id])
+        self.assertEqual(item['professor']['last_name'], 'Doe')
+
+    def test_left_out_relations_cost_no_queries(self):
+        # COUNT(*) + the page itself, no JOINs or prefetches for the relations
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/course-deliveries/?fields=id,course,professor')
+        self.assertEqual(response.data['results'][0]['professor'], self.professor.id)
+
+    def test_collapsed_many_relation_needs_one_query(self):
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/course-deliveries/?fields=id,sections')
+        self.assertEqual(response.data['results'][0]['sections'], [self.section.id])
+
+    def test_write_only_fields_still_accepted(self):
+        url = f'/api/course-deliveries/{self.delivery.id}/?fields=id,professor'
+        response = self.client.patch(url, {'professor_id': None}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'id', 'professor'})
+
+    def test_professor_list_with_degrees(self):
+        ProfessorDegree.objects.create(professor=self.professor, degree=self.degree)
+        response = self.client.get('/api/professors/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['degrees'][0]['university']['name'], 'Test University')
+
+
+class KeysetPaginationTest(AuthenticatedAPITestCase):
+    """Test the ?cursor= keyset pagination mode."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(119):
+            University.objects.create(name=f"University {i:03d}", country="US")
+
+    def _walk(self, url):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append(response.data)
+            url = response.data['next']
+        return pages
+
+    def test_walks_every_row_once_in_order(self):
+        pages = self._walk('/api/universities/?cursor=&ordering=name')
+        names = [item['name'] for page in pages for item in page['results']]
+        self.assertEqual([len(page['results']) for page in pages], [50, 50, 20])
+        self.assertEqual(names, sorted(University.objects.values_list('name', flat=True)))
+        self.assertNotIn('count', pages[0])
+
+    def test_ties_are_broken_by_primary_key(self):
+        # Almost every row ties on country, only the id keeps positions unique
+        University.objects.filter(name__startswith="University").update(country="FR")
+        pages = self._walk('/api/universities/?cursor=&ordering=country')
+        ids = [item['id'] for page in pages for item in page['results']]
+        self.assertEqual(len(ids), 120)
+        self.assertEqual(len(set(ids)), 120)
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get('/api/universities/?cursor=').data
+        second = self.client.get(first['next']).data
+        back = self.client.get(second['previous']).data
+        self.assertIsNone(first['previous'])
+        self.assertEqual(
+            [item['id'] for item in back['results']],
+            [item['id'] for item in first['results']]
+        )
+
+    def test_no_count_query(self):
+        first = self.client.get('/api/universities/?cursor=').data
+        with self.assertNumQueries(1):
+            self.client.get(first['next'])
+
+    def test_approximate_total_is_opt_in(self):
+        response = self.client.get('/api/universities/?cursor=&total=approx')
+        self.assertIn('approximate_count', response.data)
+        self.assertGreater(response.data['approximate_count'], 0)
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/universities/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_bad_values(self):
+        # Well-formed cursors whose values the ordering columns do not accept
+        for ordering, position in (('', ['not-a-date', 1]), ('name', ['A', 'not-a-pk'])):
+            cursor = KeysetPagination().encode_cursor(position, False)
+            response = self.client.get('/api/universities/', {'cursor': cursor, 'ordering': ordering})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_mode_is_unchanged(self):
+        response = self.client.get('/api/universities/?page=2')
+        self.assertEqual(response.data['count'], 120)
+        self.assertEqual(len(response.data['results']), 50)
+
+
+class BulkAssignmentTest(AuthenticatedAPITestCase):
+    """Test POST /api/course-deliveries/bulk-assign/."""
+
+    url = '/api/course-deliveries/bulk-assign/'
+
+    def setUp(self):
+        super().setUp()
+        self.other_section = Section.objects.create(
+            name="B",
+            intake=self.intake,
+            campus="Segovia",
+            course_year=1,
+            program=self.program,
+            joined_academic_year=self.joined_academic_year
+        )
+        self.deliveries = [CourseDelivery.objects.create(course=self.course) for _ in range(3)]
+        for delivery in self.deliveries:
+            delivery.sections.add(self.section)
+
+    def test_assigns_professors_and_sections(self):
+        first, second, third = self.deliveries
+        payload = [
+            {'delivery_id': first.id, 'professor_id': self.professor.id},
+            {'delivery_id': second.id, 'sections_ids': [self.other_section.id]},
+            {'delivery_id': third.id, 'professor_id': None},
+            {'delivery_id': 999999, 'professor_id': self.professor.id},
+        ]
+        history_before = CourseDelivery.history.count()
+        response = self.client.post(self.url, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['unchanged'], 1)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertEqual(
+            [result['status'] for result in response.data['results']],
+            ['updated', 'updated', 'unchanged', 'error']
+        )
+        first.refresh_from_db()
+        self.assertEqual(first.professor, self.professor)
+        self.assertEqual(list(second.sections.values_list('id', flat=True)), [self.other_section.id])
+        self.assertEqual(CourseDelivery.history.count(), history_before + 2)
+        self.assertEqual(CourseDelivery.history.latest().history_user, self.user)
+
+    def test_reports_unknown_references(self):
+        payload = [{'delivery_id': self.deliveries[0].id, 'professor_id': 999999, 'sections_ids': [999998]}]
+        response = self.client.post(self.url, payload, format='json')
+        result = response.data['results'][0]
+        self.assertEqual(result['status'], 'error')
+        self.assertEqual(set(result['errors']), {'professor_id', 'sections_ids'})
+        self.assertIsNone(CourseDelivery.objects.get(pk=self.deliveries[0].id).professor)
+
+    def test_rejects_malformed_payload(self):
+        response = self.client.post(self.url, [{'professor_id': self.professor.id}], format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        professors = [
+            Professor.objects.create(name=f"Professor {index}", last_name="Test", email=f"professor{index}@example.com")
+            for index in range(20)
+        ]
+
+        def queries_for(deliveries):
+            # A different professor per delivery, as in a real staffing batch
+            payload = [
+                {'delivery_id': delivery.id, 'professor_id': professor.id, 'sections_ids': [self.other_section.id]}
+                for delivery, professor in zip(deliveries, professors)
+            ]
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.post(self.url, payload, format='json')
+            self.assertEqual(response.data['updated'], len(deliveries))
+            return len(context.captured_queries)
+
+        small = queries_for(self.deliveries[:1])
+        more = [CourseDelivery.objects.create(course=self.course) for _ in range(20)]
+        for delivery in more:
+            delivery.sections.add(self.section)
+        self.assertEqual(queries_for(more), small)
+        self.assertEqual(
+            {delivery.professor_id for delivery in CourseDelivery.objects.filter(pk__in=[d.pk for d in more])},
+            {professor.pk for professor in professors},
+        )
+
+
+class AssignmentRecommendationTest(AuthenticatedAPITestCase):
+    """Test recommend_assignments and /api/intakes/<id>/recommend-assignments/."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = f'/api/intakes/{self.intake.id}/recommend-assignments/'
+        self.professor.minimum_number_of_sessions = 24
+        self.professor.save()
+        ProfessorCoursePossibility.objects.create(professor=self.professor, course=self.course)
+        madrid = Professor.objects.create(
+            name="Jane", last_name="Roe", email="jane.roe@example.com",
+            campuses=["Madrid A"], availabilities=["morning"], minimum_number_of_sessions=120,
+        )
+        ProfessorCoursePossibility.objects.create(professor=madrid, course=self.course)
+        self.deliveries = [CourseDelivery.objects.create(course=self.course) for _ in range(3)]
+        for delivery in self.deliveries:
+            delivery.sections.add(self.section)
+
+    def create_professor(self, name, courses, minimum=12, **fields):
+        professor = Professor.objects.create(
+            name=name, last_name="Test", email=f"{name}@example.com",
+            campuses=["Segovia"], availabilities=["morning"], minimum_number_of_sessions=minimum, **fields
+        )
+        for course in courses:
+            ProfessorCoursePossibility.objects.create(professor=professor, course=course)
+        return professor
+
+    def test_respects_campus_and_sessions(self):
+        orphan = CourseDelivery.objects.create(course=Course.objects.create(
+            code="CS999", name="Nobody Teaches This", course_type="BA", credits=3.0, sessions=12,
+        ))
+        orphan.sections.add(self.section)
+
+        recommendation = recommend_assignments(self.intake)
+
+        self.assertEqual(
+            [(proposal['delivery_id'], proposal['professor_id']) for proposal in recommendation['proposals']],
+            [(self.deliveries[0].id, self.professor.id), (self.deliveries[1].id, self.professor.id)],
+        )
+        self.assertEqual(recommendation['unassigned'], [
+            {'delivery_id': self.deliveries[2].id, 'reason': 'no_capacity'},
+            {'delivery_id': orphan.id, 'reason': 'no_candidates'},
+        ])
+        self.assertEqual(len(recommend_assignments(self.intake, extra_sessions=12)['proposals']), 3)
+
+    def test_counts_current_deliveries_and_time_slots(self):
+        madrid_section = Section.objects.create(
+            name="M", intake=self.intake, campus="Madrid A", course_year=1,
+            program=self.program, joined_academic_year=self.joined_academic_year,
+        )
+        taught = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        taught.sections.add(madrid_section)
+        self.professor.campuses = ["Segovia", "Madrid A"]
+        self.professor.save()
+
+        # Busy in Madrid A in the only slot declared
+        self.assertEqual(recommend_assignments(self.intake)['proposals'], [])
+
+        # A second slot for Segovia, with 12 of the 24 PDP sessions already taught
+        self.professor.availabilities = ["morning", "afternoon"]
+        self.professor.save()
+        proposals = recommend_assignments(self.intake)['proposals']
+        self.assertEqual([proposal['delivery_id'] for proposal in proposals], [self.deliveries[0].id])
+
+    def test_fills_the_largest_pdp_gap_first(self):
+        CourseDelivery.objects.filter(pk__in=[delivery.pk for delivery in self.deliveries[1:]]).delete()
+        keen = self.create_professor("keen", [self.course], minimum=60)
+        proposals = recommend_assignments(self.intake)['proposals']
+        self.assertEqual([proposal['professor_id'] for proposal in proposals], [keen.id])
+
+    def test_moves_earlier_proposals_to_make_room(self):
+        CourseDelivery.objects.filter(pk__in=[delivery.pk for delivery in self.deliveries[1:]]).delete()
+        self.professor.minimum_number_of_sessions = 12
+        self.professor.save()
+        other_course = Course.objects.create(code="CS102", name="Data Structures", course_type="BA", credits=3.0, sessions=12)
+        ProfessorCoursePossibility.objects.create(professor=self.professor, course=other_course)
+        spare = self.create_professor("spare", [self.course])
+        self.create_professor("full", [other_course], minimum=0)
+        other = CourseDelivery.objects.create(course=other_course)
+        other.sections.add(self.section)
+
+        # The first delivery goes to self.professor (tie, lower id), then moves to
+        # the spare professor so the only one who can teach the second takes it
+        recommendation = recommend_assignments(self.intake)
+        self.assertEqual(
+            {proposal['delivery_id']: proposal['professor_id'] for proposal in recommendation['proposals']},
+            {self.deliveries[0].id: spare.id, other.id: self.professor.id},
+        )
+        self.assertEqual(recommendation['unassigned'], [])
+
+    def test_get_proposes_without_writing(self):
+        response = self.client.get(self.url, {'extra_sessions': 12})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['proposals']), 3)
+        self.assertEqual(response.data['proposals'][0]['professor_name'], "John Doe")
+        self.assertEqual(response.data['proposals'][0]['course_code'], "CS101")
+        self.assertFalse(CourseDelivery.objects.filter(professor__isnull=False).exists())
+
+        response = self.client.get(self.url, {'extra_sessions': -1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_applies_the_reviewed_proposals(self):
+        first, second, third = self.deliveries
+        reviewed = {'delivery_id': second.id, 'professor_id': self.professor.id}
+        response = self.client.post(self.url, {'proposals': [reviewed]}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(CourseDelivery.objects.get(pk=second.pk).professor, self.professor)
+        self.assertIsNone(CourseDelivery.objects.get(pk=first.pk).professor)
+        self.assertEqual(CourseDelivery.history.latest().history_change_reason, "Recommended assignment")
+
+        proposals = self.client.get(self.url).data['proposals']
+        response = self.client.post(self.url, {'proposals': proposals}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['unassigned'], [{'delivery_id': third.id, 'reason': 'no_capacity'}])
+        self.assertEqual(CourseDelivery.objects.filter(professor=self.professor).count(), 2)
+
+        response = self.client.post(self.url, {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_post_rejects_proposals_the_recommendation_no_longer_makes(self):
+        first, second, third = self.deliveries
+        proposals = self.client.get(self.url).data['proposals']
+        self.assertEqual([proposal['delivery_id'] for proposal in proposals], [first.id, second.id])
+        # The professor's capacity is taken after the review
+        third.professor = self.professor
+        third.save()
+
+        response = self.client.post(self.url, {'proposals': proposals}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['stale'], [
+            {'delivery_id': second.id, 'professor_id': self.professor.id, 'recommended_professor_id': None},
+        ])
+        self.assertFalse(CourseDelivery.objects.filter(pk__in=[first.pk, second.pk], professor__isnull=False).exists())
+
+    def test_admin_action(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('admin:university_intake_changelist'), {
+            'action': 'assign_recommended_professors', '_selected_action': [self.intake.id],
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(CourseDelivery.objects.filter(professor=self.professor).count(), 2)
+
+
+class ProgramDeliveryOverviewTest(AuthenticatedAPITestCase):
+    """Test GET /api/program-delivery/<program_id>/<intake_id>/."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('program-delivery-overview', args=[self.program.id, self.intake.id])
+        self.delivery = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        self.delivery.sections.add(self.section)
+
+    def test_groups_deliveries_by_section(self):
+        empty_section = Section.objects.create(
+            name="B",
+            intake=self.intake,
+            campus="Segovia",
+            course_year=2,
+            program=self.program,
+            joined_academic_year=self.joined_academic_year
+        )
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        sections = response.data['sections']
+        self.assertEqual([section['id'] for section in sections], [self.section.id, empty_section.id])
+        self.assertEqual(sections[1]['course_deliveries'], [])
+        self.assertEqual(sections[0]['course_deliveries'], [{
+            'id': self.delivery.id,
+            'course': {
+                'id': self.course.id,
+                'name': self.course.name,
+                'code': 'CS101',
+                'credits': 3.0,
+                'sessions': 12,
+                'course_type_display': self.course.get_course_type_display(),
+            },
+            'professor': {
+                'id': self.professor.id,
+                'name': 'John',
+                'last_name': 'Doe',
+                'corporate_email': 'john.doe@university.edu',
+            },
+        }])
+
+    def test_query_count_does_not_grow_with_deliveries(self):
+        def queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(self.url)
+            return len(context.captured_queries), response
+
+        small, _ = queries()
+        for name in "BCDE":
+            section = Section.objects.create(
+                name=name,
+                intake=self.intake,
+                campus="Segovia",
+                course_year=1,
+                program=self.program,
+                joined_academic_year=self.joined_academic_year
+            )
+            for _ in range(10):
+                CourseDelivery.objects.create(course=self.course).sections.add(section, self.section)
+        large, response = queries()
+
+        self.assertEqual(large, small)
+        self.assertEqual(len(response.data['sections'][0]['course_deliveries']), 41)
+
+
+class DeliveryOverviewTest(AuthenticatedAPITestCase):
+    """Test GET /api/delivery-overview/."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('delivery-overview')
+        self.professor.availabilities = ["morning", "afternoon"]
+        self.professor.save()
+        self.other_program = Program.objects.create(name="Law", school="law", code="LAW", type="ba")
+        self.other_section = Section.objects.create(
+            name="B",
+            intake=self.intake,
+            campus="Madrid A",
+            course_year=2,
+            program=self.other_program,
+            joined_academic_year=self.joined_academic_year
+        )
+        self.other_course = Course.objects.create(code="CS102", name="Algorithms", course_type="OB", credits=6.0, sessions=30, area=self.area)
+        self.delivery = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        self.delivery.sections.add(self.section, self.other_section)
+        self.unassigned = CourseDelivery.objects.create(course=self.other_course)
+        self.unassigned.sections.add(self.section)
+        CourseDelivery.objects.create().sections.add(self.section)
+
+    def test_builds_year_section_course_tree(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        years = response.data['years']
+        self.assertEqual(list(years), [1, 2])
+        first_year_section = years[1]['sections'][0]
+        self.assertEqual(first_year_section['section_info']['name'], "A")
+        self.assertEqual(first_year_section['section_info']['program']['code'], "CS")
+        self.assertEqual(first_year_section['section_info']['intake']['semester_display'], "Fall")
+        self.assertEqual([course['course']['code'] for course in first_year_section['courses']], ["CS101", "CS102"])
+
+        course = first_year_section['courses'][0]
+        self.assertEqual(course['course']['area'], {'id': self.area.id, 'name': "Computer Science"})
+        self.assertEqual(course['assignments']['Segovia']['afternoon'], [{
+            'id': self.professor.id,
+            'name': "John Doe",
+            'email': "john.doe@university.edu",
+            'type': "Faculty",
+            'section_name': "A",
+            'delivery_id': self.delivery.id,
+        }])
+        self.assertEqual(course['assignments']['Segovia']['morning'], [])
+        self.assertEqual(first_year_section['courses'][1]['assignments']['Segovia'], {'morning': [], 'afternoon': []})
+        self.assertEqual(years[2]['sections'][0]['courses'][0]['assignments']['Madrid A']['afternoon'][0]['section_name'], "B")
+
+    def test_filter_keeps_all_sections_of_matching_deliveries(self):
+        response = self.client.get(self.url, {'program': self.other_program.id})
+
+        years = response.data['years']
+        self.assertEqual(list(years), [1, 2])
+        self.assertEqual([course['course']['code'] for course in years[1]['sections'][0]['courses']], ["CS101"])
+
+    def test_query_count_does_not_grow_with_deliveries(self):
+        def queries():
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(self.url)
+            return len(context.captured_queries)
+
+        self.client.get(self.url)  # warm the reference-data cache
+        small = queries()
+        for _ in range(20):
+            CourseDelivery.objects.create(course=self.other_course, professor=self.professor).sections.add(
+                self.section, self.other_section
+            )
+        self.assertEqual(queries(), small)
+
+
+class ReferenceDataTest(AuthenticatedAPITestCase):
+    """Test GET /api/reference-data/ and its use by the delivery overview."""
+
+    url = '/api/reference-data/'
+
+    def test_returns_versioned_bundle(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['ETag'], f'"{response.data["version"]}"')
+        data = response.data['data']
+        self.assertEqual([program['code'] for program in data['programs']], ["CS"])
+        self.assertEqual([intake['name'] for intake in data['intakes']], ["Fall 2025"])
+        self.assertEqual([area['name'] for area in data['areas']], ["Computer Science"])
+        self.assertEqual(data['universities'][0]['name'], "Test University")
+        self.assertEqual(data['joined_academic_years'][0]['name'], "2025-2026")
+        self.assertIn({'value': 'fall', 'display': 'Fall'}, data['choices']['SemesterType'])
+        self.assertIn('ProfessorType', data['choices'])
+
+    def test_not_modified_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_saving_reference_model_changes_version(self):
+        version = self.client.get(self.url).data['version']
+        self.program.name = "Computer Science and AI"
+        self.program.save()
+        self.assertNotEqual(self.client.get(self.url).data['version'], version)
+
+    def test_delivery_overview_skips_filters_for_current_version(self):
+        overview = reverse('delivery-overview')
+        response = self.client.get(overview)
+        version = response.data['reference_data_version']
+        self.assertEqual([program['code'] for program in response.data['filters']['programs']], ["CS"])
+
+        response = self.client.get(overview, {'reference_version': version})
+        self.assertNotIn('filters', response.data)
+        self.assertEqual(response.data['reference_data_version'], version)
+
+
+class MissingProfessorCountersTest(AuthenticatedAPITestCase):
+    """Test the counters behind GET /api/current-intakes/."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('current-intakes')
+        self.other_section = Section.objects.create(
+            name="B",
+            intake=self.intake,
+            campus="Segovia",
+            course_year=1,
+            program=self.program,
+            joined_academic_year=self.joined_academic_year
+        )
+        self.delivery = CourseDelivery.objects.create(course=self.course)
+        self.delivery.sections.add(self.section, self.other_section)
+
+    def counters(self):
+        self.intake.refresh_from_db()
+        self.section.refresh_from_db()
+        program_counter = IntakeProgramCounter.objects.get(intake=self.intake, program=self.program)
+        return self.intake.missing_professors, self.section.missing_professors, program_counter.missing_professors
+
+    def assertCountersMatchRebuild(self):
+        maintained = self.counters()
+        call_command('rebuild_missing_professor_counters', stdout=StringIO())
+        self.assertEqual(self.counters(), maintained)
+
+    def test_counters_follow_assignments_and_sections(self):
+        self.assertEqual(self.counters(), (1, 1, 2))
+
+        self.delivery.professor = self.professor
+        self.delivery.save()
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+        self.delivery.professor = None
+        self.delivery.save()
+        self.delivery.sections.remove(self.other_section)
+        self.assertEqual(self.counters(), (1, 1, 1))
+        self.assertCountersMatchRebuild()
+
+        self.section.coursedelivery_set.clear()
+        self.assertEqual(self.counters(), (0, 0, 0))
+        self.assertCountersMatchRebuild()
+
+    def test_bulk_assignment_and_delete_refresh_counters(self):
+        self.client.post('/api/course-deliveries/bulk-assign/', [
+            {'delivery_id': self.delivery.id, 'professor_id': self.professor.id},
+        ], format='json')
+        self.assertEqual(self.counters(), (0, 0, 0))
+
+        unassigned = CourseDelivery.objects.create(course=self.course)
+        unassigned.sections.add(self.section)
+        self.assertEqual(self.counters(), (1, 1, 1))
+        unassigned.delete()
+        self.assertEqual(self.counters(), (0, 0, 0))
+        self.assertCountersMatchRebuild()
+
+    def test_program_counters_are_updated_in_place(self):
+        counter = IntakeProgramCounter.objects.get(intake=self.intake, program=self.program)
+        self.delivery.professor = self.professor
+        self.delivery.save()
+        self.assertEqual(IntakeProgramCounter.objects.get(pk=counter.pk).missing_professors, 0)
+
+        # The pair goes once the intake has no section of the program left
+        self.section.delete()
+        self.assertTrue(IntakeProgramCounter.objects.filter(pk=counter.pk).exists())
+        self.other_section.delete()
+        self.assertFalse(IntakeProgramCounter.objects.filter(intake=self.intake).exists())
+
+    def test_current_intakes_reads_counters(self):
+        # Intakes, program counters, delivery links for double bookings
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'date': '2025-10-01'})
+
+        intake = response.data['intakes'][0]
+        self.assertEqual(intake['missing_professors'], 1)
+        self.assertEqual(intake['missing_programs'], [{
+            'sections__intake__id': self.intake.id,
+            'course__programs__name': self.program.name,
+            'program__name': self.program.name,
+            'missing_count': 2,
+        }])
+
+
+class ConflictDetectorTest(AuthenticatedAPITestCase):
+    """Test find_conflicts and where double bookings are reported."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.madrid_section = Section.objects.create(
+            name="M", intake=self.intake, campus="Madrid A", course_year=1,
+            program=self.program, joined_academic_year=self.joined_academic_year,
+        )
+        self.other_section = Section.objects.create(
+            name="B", intake=self.intake, campus="Segovia", course_year=1,
+            program=self.program, joined_academic_year=self.joined_academic_year,
+        )
+        self.segovia = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        self.segovia.sections.add(self.section, self.other_section)
+        self.madrid = CourseDelivery.objects.create(course=self.course)
+        self.madrid.sections.add(self.madrid_section)
+
+    def assign_madrid(self):
+        return self.client.post('/api/course-deliveries/bulk-assign/', [
+            {'delivery_id': self.madrid.id, 'professor_id': self.professor.id},
+        ], format='json')
+
+    def test_campuses_over_time_slots(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(find_conflicts(), [])
+
+        self.madrid.professor = self.professor
+        self.madrid.save()
+        # Delivery links, then only the professors and intakes on several campuses
+        with self.assertNumQueries(3):
+            conflicts = find_conflicts(intakes=[self.intake.id])
+        self.assertEqual(conflicts, [{
+            'professor_id': self.professor.id,
+            'professor_name': "John Doe",
+            'intake_id': self.intake.id,
+            'intake_name': self.intake.name,
+            'slots': ['morning'],
+            'campuses': [
+                {'campus': 'Madrid A', 'delivery_ids': [self.madrid.id]},
+                {'campus': 'Segovia', 'delivery_ids': [self.segovia.id]},
+            ],
+        }])
+        self.assertEqual(find_conflicts(professors=[self.professor.id + 1]), [])
+
+        self.professor.availabilities = ["afternoon", "morning"]
+        self.professor.save()
+        self.assertEqual(find_conflicts(), [])
+
+    def test_bulk_assignment_reports_conflicts(self):
+        response = self.assign_madrid()
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual([conflict['professor_id'] for conflict in response.data['conflicts']], [self.professor.id])
+
+    def test_intake_endpoint_and_dashboards(self):
+        url = f'/api/intakes/{self.intake.id}/conflicts/'
+        self.assertEqual(self.client.get(url).data['count'], 0)
+        self.assign_madrid()
+        response = self.client.get(url)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['conflicts'][0]['professor_id'], self.professor.id)
+
+        intakes = self.client.get(reverse('current-intakes'), {'date': '2025-10-01'}).data['intakes']
+        self.assertEqual(intakes[0]['double_booked_professors'], 1)
+
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:university_intake_current_intake_landing'), {'date': '2025-10-01'})
+        self.assertContains(response, "Double-booked Professors")
+        self.assertContains(response, reverse('admin:university_professor_change', args=[self.professor.id]))
+
+
+@override_settings(PAYLOAD_CACHE_ENABLED=True)
+class ProfessorWorkloadTest(AuthenticatedAPITestCase):
+    """Test professor_workload, /api/professor-workload/ and the professor admin column."""
+
+    url = '/api/professor-workload/'
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.intake.active = True
+        self.intake.save()
+        self.professor.minimum_number_of_sessions = 40
+        self.professor.save()
+        other_section = Section.objects.create(
+            name="B", intake=self.intake, campus="Segovia", course_year=1,
+            program=self.program, joined_academic_year=self.joined_academic_year,
+        )
+        self.shared = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        self.shared.sections.add(self.section, other_section)
+        self.later_intake = Intake.objects.create(
+            name="Spring 2026", start_time=date(2026, 2, 1), end_time=date(2026, 6, 30), semester="spring", active=False,
+        )
+        later_section = Section.objects.create(
+            name="A", intake=self.later_intake, campus="Segovia", course_year=1,
+            program=self.program, joined_academic_year=self.joined_academic_year,
+        )
+        for _ in range(2):
+            CourseDelivery.objects.create(course=self.course, professor=self.professor).sections.add(later_section)
+
+    def test_groups_per_professor_and_intake(self):
+        # The delivery shared by two sections of the fall intake counts once
+        with self.assertNumQueries(1):
+            rows = professor_workload(professor_id=self.professor.id)
+        self.assertEqual(
+            [(row['intake_id'], row['deliveries'], row['sessions'], row['credits'], row['missing_sessions']) for row in rows],
+            [(self.later_intake.id, 2, 24, 6.0, 16), (self.intake.id, 1, 12, 3.0, 28)],
+        )
+        self.assertEqual(rows[0]['professor_name'], "John Doe")
+        self.assertEqual(rows[0]['minimum_sessions'], 40)
+        self.assertEqual([row['intake_id'] for row in professor_workload(semester='fall')], [self.intake.id])
+        self.assertEqual([row['intake_id'] for row in professor_workload(active=True)], [self.intake.id])
+
+    def test_endpoint_is_cached_until_deliveries_change(self):
+        response = self.client.get(self.url, {'intake': self.intake.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['sessions'], 12)
+        # Only the ETag validator aggregate
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'intake': self.intake.id})
+
+        self.client.post('/api/course-deliveries/bulk-assign/', [
+            {'delivery_id': self.shared.id, 'professor_id': None},
+        ], format='json')
+        self.assertEqual(self.client.get(self.url, {'intake': self.intake.id}).data['count'], 0)
+
+        self.assertEqual(self.client.get(self.url, {'active': 'false'}).data['count'], 1)
+        self.assertEqual(self.client.get(self.url, {'semester': 'summer'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_endpoint_is_paginated_and_validated(self):
+        with mock.patch.object(PageNumberPagination, 'page_size', 1):
+            response = self.client.get(self.url)
+            self.assertEqual(response.data['count'], 2)
+            self.assertEqual([row['intake_id'] for row in response.data['results']], [self.later_intake.id])
+            self.assertIsNotNone(response.data['next'])
+
+            response = self.client.get(self.url, {'page': 2})
+            self.assertEqual([row['intake_id'] for row in response.data['results']], [self.intake.id])
+
+            response = self.client.get(self.url, {'page': 2}, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_admin_column(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:university_professor_changelist'), {'o': '-6'})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "12 / 40")
+
+        # The change form does not compute the column
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('admin:university_professor_change', args=[self.professor.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(any('SUM(' in query['sql'] for query in queries))
+
+
+@override_settings(PAYLOAD_CACHE_ENABLED=True)
+class PayloadCacheTest(AuthenticatedAPITestCase):
+    """Test the shared payload cache behind the overview and current-intake endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.url = reverse('program-delivery-overview', args=[self.program.id, self.intake.id])
+        self.delivery = CourseDelivery.objects.create(course=self.course)
+        self.delivery.sections.add(self.section)
+
+    def test_second_request_is_served_from_cache(self):
+        misses = payload_cache_stats['program-delivery', 'miss']
+        hits = payload_cache_stats['program-delivery', 'hit']
+        first = self.client.get(self.url)
+        # Only the two ETag validator aggregates
+        with self.assertNumQueries(2):
+            second = self.client.get(self.url)
+
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(payload_cache_stats['program-delivery', 'miss'], misses + 1)
+        self.assertEqual(payload_cache_stats['program-delivery', 'hit'], hits + 1)
+
+    def test_model_changes_invalidate_cached_payloads(self):
+        self.client.get(self.url)
+        self.delivery.professor = self.professor
+        self.delivery.save()
+        delivery = self.client.get(self.url).data['sections'][0]['course_deliveries'][0]
+        self.assertEqual(delivery['professor']['id'], self.professor.id)
+
+        other_section = Section.objects.create(
+            name="B",
+            intake=self.intake,
+            campus="Segovia",
+            course_year=1,
+            program=self.program,
+            joined_academic_year=self.joined_academic_year
+        )
+        self.delivery.sections.add(other_section)
+        sections = self.client.get(self.url).data['sections']
+        self.assertEqual([len(section['course_deliveries']) for section in sections], [1, 1])
+
+    def test_history_rows_do_not_bump_the_generation(self):
+        generation = get_generation()
+        self.professor.save()
+        self.assertEqual(get_generation(), generation + 1)
+
+    def test_counter_refresh_bumps_the_generation_once(self):
+        generation = get_generation()
+        with self.assertNumQueries(1):
+            # A fast delete: no receiver is listening to the counters
+            IntakeProgramCounter.objects.all().delete()
+        refresh_missing_professor_counters()
+        self.assertEqual(get_generation(), generation + 1)
+
+    def test_bulk_assignment_invalidates_current_intakes(self):
+        url = reverse('current-intakes')
+        self.assertEqual(self.client.get(url, {'date': '2025-10-01'}).data['intakes'][0]['missing_professors'], 1)
+        self.client.post('/api/course-deliveries/bulk-assign/', [
+            {'delivery_id': self.delivery.id, 'professor_id': self.professor.id},
+        ], format='json')
+        self.assertEqual(self.client.get(url, {'date': '2025-10-01'}).data['intakes'][0]['missing_professors'], 0)
+
+
+@override_settings(PAYLOAD_CACHE_ENABLED=True)
+class ConditionalGetTest(AuthenticatedAPITestCase):
+    """Test ETag / 304 handling on viewsets and APIViews."""
+
+    def setUp(self):
+        super().setUp()
+        self.delivery = CourseDelivery.objects.create(course=self.course)
+        self.delivery.sections.add(self.section)
+
+    def assertNotModified(self, url, params=None, queries=1):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        # Only the validator aggregate runs
+        with self.assertNumQueries(queries):
+            not_modified = self.client.get(url, params, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(not_modified['ETag'], response['ETag'])
+        return response['ETag']
+
+    def test_list_not_modified_until_a_row_changes(self):
+        url = '/api/course-deliveries/'
+        etag = self.assertNotModified(url)
+        self.assertIn('Last-Modified', self.client.get(url))
+
+        self.delivery.professor = self.professor
+        self.delivery.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_deleting_a_row_changes_the_etag(self):
+        url = '/api/course-deliveries/'
+        etag = self.client.get(url)['ETag']
+        CourseDelivery.objects.create(course=self.course).delete()
+        self.delivery.delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_retrieve_and_filtered_list(self):
+        self.assertNotModified(f'/api/course-deliveries/{self.delivery.id}/')
+        # + the filter's lookup of the course
+        self.assertNotModified('/api/course-deliveries/', {'course': self.course.id}, queries=2)
+
+    def test_current_intakes_not_modified(self):
+        self.assertNotModified(reverse('current-intakes'), {'date': '2025-10-01'})
+
+    def test_unassigning_changes_current_intakes_etag(self):
+        url = reverse('current-intakes')
+        etag = self.client.get(url, {'date': '2025-10-01'})['ETag']
+        self.delivery.professor = self.professor
+        self.delivery.save()
+        response = self.client.get(url, {'date': '2025-10-01'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['intakes'][0]['missing_professors'], 0)
+
+    @override_settings(PAYLOAD_CACHE_ENABLED=False)
+    def test_no_validator_without_shared_generation(self):
+        # Another worker's per-process generation would miss this worker's changes
+        response = self.client.get(reverse('current-intakes'), {'date': '2025-10-01'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('ETag', response)
+
+
+class CourseDeliveryExportTest(AuthenticatedAPITestCase):
+    """Test GET /api/course-deliveries/export/."""
+
+    url = '/api/course-deliveries/export/'
+
+    def setUp(self):
+        super().setUp()
+        self.other_section = Section.objects.create(
+            name="B",
+            intake=self.intake,
+            campus="Madrid A",
+            course_year=2,
+            program=self.program,
+            joined_academic_year=self.joined_academic_year
+        )
+        self.assigned = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        self.assigned.sections.add(self.section, self.other_section)
+        self.unassigned = CourseDelivery.objects.create(course=self.course)
+
+    def test_csv_has_one_row_per_delivery_and_section(self):
+        response = self.client.get(self.url, {'format': 'csv'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertTrue(response['Content-Type'].startswith('text/csv'))
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(
+            [(row['delivery_id'], row['section_name']) for row in rows],
+            # Same default ordering as the list: newest first
+            [(str(self.unassigned.id), ""), (str(self.assigned.id), "A"), (str(self.assigned.id), "B")]
+        )
+        self.assertEqual(rows[1]['course_code'], "CS101")
+        self.assertEqual(rows[1]['professor_corporate_email'], "john.doe@university.edu")
+        self.assertEqual(rows[2]['section_campus'], "Madrid A")
+
+    def test_ndjson_applies_list_filters(self):
+        response = self.client.get(self.url, {'format': 'ndjson', 'professor': self.professor.id})
+
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual({row['delivery_id'] for row in rows}, {self.assigned.id})
+        self.assertEqual(rows[0]['professor_name'], "John")
+
+        response = self.client.get(self.url, {'format': 'ndjson', 'sections__in': str(self.other_section.id)})
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([row['section_id'] for row in rows], [self.section.id, self.other_section.id])
+
+    def test_without_server_side_cursors_reads_in_chunks(self):
+        expected = b''.join(self.client.get(self.url, {'format': 'csv'}).streaming_content)
+
+        with mock.patch.dict(connection.settings_dict, {'DISABLE_SERVER_SIDE_CURSORS': True}), \
+                mock.patch('api.exports.EXPORT_CHUNK_SIZE', 2):
+            response = self.client.get(self.url, {'format': 'csv'})
+            with CaptureQueriesContext(connection) as queries:
+                body = b''.join(response.streaming_content)
+
+        self.assertEqual(body, expected)
+        # One query per chunk of two rows, the last one short
+        self.assertEqual(body.count(b'\n'), 4)
+        self.assertEqual(len(queries), 2)
+        self.assertTrue(all('LIMIT 2' in query['sql'] for query in queries))
+
+
+class SearchTest(AuthenticatedAPITestCase):
+    """Test the ?search= lookups backed by the trigram indexes."""
+
+    def test_search_matches_inside_words_ignoring_case(self):
+        response = self.client.get('/api/courses/?search=DUCTION to')
+        self.assertEqual([course['code'] for course in response.data['results']], ['CS101'])
+
+        response = self.client.get('/api/courses/?search=s10')
+        self.assertEqual(len(response.data['results']), 1)
+
+        response = self.client.get('/api/professors/?search=DOE@UNIV')
+        self.assertEqual([professor['id'] for professor in response.data['results']], [self.professor.id])
+
+        response = self.client.get('/api/sections/?search=zzz')
+        self.assertEqual(response.data['results'], [])
+
+    def test_related_fields_are_matched_by_key(self):
+        other_area = Area.objects.create(name="Marketing")
+        Course.objects.create(code="MK101", name="Brand basics", credits=3.0, sessions=12, area=other_area)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/courses/?search=marketing')
+        self.assertEqual([course['code'] for course in response.data['results']], ['MK101'])
+        # The areas are searched on their own, the courses by area_id
+        area_searches = [query['sql'] for query in queries if 'UPPER("university_area"."name' in query['sql']]
+        self.assertEqual(len(area_searches), 1)
+        self.assertNotIn('university_course', area_searches[0])
+
+        response = self.client.get('/api/sections/?search=cs a')
+        self.assertEqual([section['id'] for section in response.data['results']], [self.section.id])
+
+    def test_many_related_matches_fall_back_to_the_join(self):
+        with mock.patch('api.filters.MAX_RELATED_IDS', 0):
+            response = self.client.get('/api/courses/?search=computer')
+        self.assertEqual([course['code'] for course in response.data['results']], ['CS101'])
+
+
+class EstimatedCountPaginatorTest(AuthenticatedAPITestCase):
+    """Test the admin changelist paginator."""
+
+    def setUp(self):
+        super().setUp()
+        for index in range(3):
+            CourseDelivery.objects.create(course=self.course)
+
+    def test_small_results_are_counted_exactly(self):
+        paginator = EstimatedCountPaginator(CourseDelivery.objects.order_by('pk'), 2)
+        self.assertFalse(paginator.estimated)
+        self.assertEqual(paginator.count, 3)
+        self.assertEqual(len(paginator.page(2).object_list), 1)
+        with self.assertRaises(EmptyPage):
+            paginator.page(3)
+
+    def test_estimated_count_serves_pages_past_the_estimate(self):
+        paginator = EstimatedCountPaginator(CourseDelivery.objects.filter(professor__isnull=True).order_by('pk'), 2)
+        paginator.exact_count_threshold = -1
+        self.assertTrue(paginator.estimated)
+        self.assertEqual(paginator.count, paginator.estimated_count)
+        self.assertEqual(len(paginator.page(2).object_list), 1)
+        # Past both the real rows (2 pages) and the estimate, which can be lower
+        self.assertEqual(list(paginator.page(max(paginator.num_pages, 2) + 1).object_list), [])
+        with self.assertRaises(EmptyPage):
+            paginator.page(0)
+
+    def test_admin_changelist(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:university_professor_changelist'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.context['cl'].paginator, EstimatedCountPaginator)
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+
+class SectionExistsFilterTest(AuthenticatedAPITestCase):
+    """Test the EXISTS-based "has a section matching" filters."""
+
+    def setUp(self):
+        super().setUp()
+        self.other_section = Section.objects.create(
+            name="B", intake=self.intake, campus="Madrid A", course_year=1, program=self.program
+        )
+        self.delivery = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        self.delivery.sections.add(self.section, self.other_section)
+
+    def test_with_section_does_not_repeat_deliveries(self):
+        deliveries = CourseDelivery.objects.with_section(intake__active=True)
+        self.assertEqual(list(deliveries), [self.delivery])
+        self.assertNotIn('DISTINCT', str(deliveries.query))
+        self.assertFalse(CourseDelivery.objects.with_section(intake__active=False).exists())
+
+    def test_sections_in_filter(self):
+        ids = f'{self.section.id},{self.other_section.id}'
+        response = self.client.get('/api/course-deliveries/', {'sections__in': ids})
+        self.assertEqual([item['id'] for item in response.data['results']], [self.delivery.id])
+        self.assertEqual(response.data['count'], 1)
+
+    def test_admin_active_filter(self):
+        self.user.is_staff = self.user.is_superuser = True
+        self.user.save()
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('admin:university_coursedelivery_changelist'))
+        self.assertEqual(list(response.context['cl'].result_list), [self.delivery])
+        response = self.client.get(reverse('admin:university_coursedelivery_changelist'), {'active_status': 'inactive'})
+        self.assertEqual(list(response.context['cl'].result_list), [])
+
+
+class SyntheticDataTest(AuthenticatedAPITestCase):
+    """Test the synthetic data generator."""
+
+    options = {
+        'professors': 20, 'programs': 2, 'intakes': 2, 'courses_per_year': 3, 'sections_per_campus': 2,
+        'universities': 3, 'areas': 2, 'today': date(2025, 10, 1),
+    }
+
+    def test_generates_seeded_population(self):
+        call_command('generate_synthetic_data', '--size', 'small', '--tag', 'T', '--professors', '5', stdout=StringIO())
+        self.assertEqual(Professor.objects.filter(corporate_email__startswith='t.').count(), 5)
+
+        counts = generate_synthetic_data(tag='A', unassigned_rate=1, **self.options)
+        self.assertEqual(counts['university.Professor'], 20)
+        intakes = Intake.objects.filter(name__startswith='A ').order_by('start_time')
+        self.assertEqual([intake.semester for intake in intakes], ['spring', 'fall'])
+        self.assertTrue(intakes.last().start_time <= date(2025, 10, 1) <= intakes.last().end_time)
+
+        deliveries = CourseDelivery.objects.filter(course__code__startswith='A')
+        self.assertEqual(deliveries.count(), counts['university.CourseDelivery'])
+        self.assertFalse(deliveries.filter(professor__isnull=False).exists())
+        self.assertFalse(CourseDelivery.history.filter(course__code__startswith='A').exists())
+        # Counters are rebuilt even though no signals ran
+        self.assertEqual(
+            sum(intakes.values_list('missing_professors', flat=True)),
+            deliveries.count(),
+        )
+
+        generate_synthetic_data(tag='B', seed=0, unassigned_rate=0, **self.options)
+        self.assertEqual(
+            list(Professor.objects.filter(corporate_email__startswith='a.').values_list('name', flat=True).order_by('pk')),
+            list(Professor.objects.filter(corporate_email__startswith='b.').values_list('name', flat=True).order_by('pk')),
+        )
+        self.assertFalse(CourseDelivery.objects.filter(course__code__startswith='B', professor__isnull=True).exists())
+
+
+class EndpointBudgetTest(APITestCase):
+    """Test the budget check of the endpoint benchmark."""
+
+    options = {'query_slack': 0, 'time_factor': 2.0, 'size_factor': 1.25}
+    budget = {'status': 200, 'queries': 3, 'sql_ms': 2.0, 'wall_ms': 10.0, 'bytes': 1000}
+
+    def check(self, **current):
+        return list(BenchmarkEndpointsCommand().over_budget({**self.budget, **current}, self.budget, self.options))
+
+    def test_within_budget(self):
+        self.assertEqual(self.check(wall_ms=60.0, bytes=1200), [])
+
+    def test_extra_query_fails(self):
+        self.assertEqual(self.check(queries=4), ['4 queries (budget 3)'])
+
+    def test_errors_and_size_fail(self):
+        problems = self.check(status=500, bytes=2000, wall_ms=100.0)
+        self.assertEqual(len(problems), 3)
+        self.assertEqual(problems[0], 'status 500')
+
+
+class RequestInstrumentationTest(AuthenticatedAPITestCase):
+    """Test the Server-Timing header and request log of the instrumentation middleware."""
+
+    def test_server_timing_and_log_line(self):
+        with self.assertLogs('ie_professor_management.requests', level='INFO') as logs:
+            response = self.client.get('/api/professors/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", serialize;dur=[\d.]+, render;dur=[\d.]+, total;dur=[\d.]+$')
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['route'], 'professor-list')
+        self.assertEqual(entry['status'], 200)
+        self.assertEqual(entry['bytes'], len(response.content))
+        self.assertGreater(entry['queries'], 0)
+        self.assertIn('serialize_ms', entry)
+        self.assertNotIn('flags', entry)
+
+    @override_settings(SLOW_REQUEST_QUERIES=0, SERVER_TIMING_HEADER=False)
+    def test_flags_requests_over_thresholds(self):
+        with self.assertLogs('ie_professor_management.requests', level='INFO') as logs:
+            response = self.client.get('/api/professors/')
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        self.assertEqual(json.loads(logs.records[0].getMessage())['flags'], ['queries'])
+
+    def test_streaming_response_is_logged_after_the_body(self):
+        CourseDelivery.objects.create(course=self.course)
+        with self.assertLogs('ie_professor_management.requests', level='INFO') as logs:
+            response = self.client.get('/api/course-deliveries/export/', {'format': 'csv'})
+            self.assertEqual(logs.records, [])
+            body = b''.join(response.streaming_content)
+
+        entry = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(entry['route'], 'coursedelivery-export')
+        self.assertEqual(entry['bytes'], len(body))
+
+    async def test_async_middleware_chain_counts_queries(self):
+        # The ASGI handler runs the whole chain async; the view's queries run on another thread
+        with self.assertLogs('ie_professor_management.requests', level='INFO') as logs:
+            response = await self.async_client.get('/api/readiness/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="[1-9]\d* queries"')
+        entry = json.loads(logs.records[0].getMessage())
+        self.assertEqual(entry['route'], 'readiness-check')
+        self.assertGreater(entry['queries'], 0)
+
+
+@override_settings(PAYLOAD_CACHE_ENABLED=True)
+class MetricsTest(AuthenticatedAPITestCase):
+    """Test GET /api/metrics/."""
+
+    url = '/api/metrics/'
+
+    def sample(self, text, name):
+        for line in text.splitlines():
+            if line.startswith(name + ' '):
+                return float(line.rsplit(' ', 1)[1])
+        return None
+
+    def test_requests_cache_and_intake_metrics(self):
+        cache.clear()
+        CourseDelivery.objects.create(course=self.course).sections.add(self.section)
+        before = self.sample(self.client.get(self.url).content.decode(),
+                             'ie_http_requests_total{method="GET",route="current-intakes",status="200"}') or 0
+        self.client.get('/api/current-intakes/', {'date': '2025-10-01'})
+        self.client.get('/api/current-intakes/', {'date': '2025-10-01'}, HTTP_IF_NONE_MATCH='"other"')
+
+        response = self.client.get(self.url)
+        text = response.content.decode()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertEqual(
+            self.sample(text, 'ie_http_requests_total{method="GET",route="current-intakes",status="200"}'), before + 2
+        )
+        self.assertIn('ie_http_request_duration_seconds_bucket{le="0.005",method="GET",route="current-intakes"}', text)
+        self.assertIn('ie_http_request_queries_count{route="current-intakes"}', text)
+        self.assertIsNotNone(self.sample(text, 'ie_payload_cache_hit_ratio{payload="current-intakes"}'))
+        self.assertEqual(self.sample(text, 'ie_intake_unassigned_deliveries{intake="Fall 2025"}'), 1)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_token(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class ReadinessTest(APITestCase):
+    """Test GET /api/readiness/ with the cached migration state."""
+
+    url = '/api/readiness/'
+
+    def test_serves_cached_migration_state(self):
+        migration_state(refresh=True)
+        with mock.patch('django.db.migrations.executor.MigrationExecutor') as executor:
+            response = self.client.get(self.url)
+
+        executor.assert_not_called()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        checks = response.json()['checks']
+        self.assertEqual(checks['migrations']['status'], 'up_to_date')
+        self.assertEqual(checks['database']['status'], 'ready')
+        self.assertIn('pooled', checks['database']['pool'])
+        # The probe itself is not counted
+        self.assertEqual(checks['workers']['requests_in_progress'], 0)
+        self.assertEqual(checks['workers']['saturation'], 0.0)
+
+    @override_settings(READINESS_MIGRATION_INTERVAL=0)
+    def test_rechecks_after_interval(self):
+        with mock.patch('django.db.migrations.executor.MigrationExecutor') as executor:
+            executor.return_value.migration_plan.return_value = [('migration', False)]
+            response = self.client.get(self.url)
+        self.addCleanup(migration_state, refresh=True)
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.json()['checks']['migrations']['pending_migrations'], 1)
+
+
+class DatabaseProbeTest(APITestCase):
+    """Test the first-use database probe behind the health check."""
+
+    def setUp(self):
+        super().setUp()
+        db_probes.clear()
+        self.addCleanup(db_probes.clear)
+
+    def test_success_is_cached(self):
+        self.assertTrue(database_available())
+        with mock.patch.object(connection.Database, 'connect') as connect:
+            self.assertTrue(database_available())
+        connect.assert_not_called()
+
+    @override_settings(DATABASE_PROBE_RETRY=60)
+    def test_unreachable_database_falls_back_to_no_database_mode(self):
+        with mock.patch.object(connection.Database, 'connect', side_effect=OperationalError('timeout expired')) as connect, \
+                self.assertLogs('general.db', level='WARNING'):
+            self.assertFalse(database_available())
+            self.assertFalse(database_available())
+            response = self.client.get('/api/healthz/')
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['checks']['database']['status'], 'skipped')
+
+
+class AsyncDashboardViewTest(AuthenticatedAPITestCase):
+    """Test the async dashboard views against their sync versions."""
+
+    def setUp(self):
+        super().setUp()
+        self.factory = APIRequestFactory()
+        delivery = CourseDelivery.objects.create(course=self.course, professor=self.professor)
+        delivery.sections.add(self.section)
+        CourseDelivery.objects.create(course=self.course).sections.add(self.section)
+
+    def call(self, view_class, path, user=None, **kwargs):
+        request = self.factory.get(path)
+        force_authenticate(request, user or self.user)
+        response = async_to_sync(view_class.as_view())(request, **kwargs)
+        return response.render()
+
+    def assertSameAsSync(self, view_class, path, **kwargs):
+        cache.clear()
+        expected = self.client.get(path)
+        cache.clear()
+        response = self.call(view_class, path, **kwargs)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(json.loads(response.content), json.loads(expected.content))
+        return response
+
+    def test_current_intakes(self):
+        response = self.assertSameAsSync(AsyncCurrentIntakeAPIView, '/api/current-intakes/?date=2025-10-01')
+        self.assertEqual(response.data['intakes'][0]['missing_professors'], 1)
+
+    def test_program_delivery_overview(self):
+        path = f'/api/program-delivery/{self.program.id}/{self.intake.id}/'
+        self.assertSameAsSync(AsyncProgramDeliveryOverviewAPIView, path, program_id=self.program.id, intake_id=self.intake.id)
+        path = f'/api/program-delivery/{self.program.id}/0/'
+        response = self.assertSameAsSync(AsyncProgramDeliveryOverviewAPIView, path, program_id=self.program.id, intake_id=0)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_delivery_overview(self):
+        self.assertSameAsSync(AsyncDeliveryOverviewAPIView, f'/api/delivery-overview/?program={self.program.id}')
+
+    @override_settings(PAYLOAD_CACHE_ENABLED=True)
+    def test_authentication_and_conditional_get(self):
+        request = self.factory.get('/api/current-intakes/')
+        response = async_to_sync(AsyncCurrentIntakeAPIView.as_view())(request)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        etag = self.call(AsyncCurrentIntakeAPIView, '/api/current-intakes/')['ETag']
+        request = self.factory.get('/api/current-intakes/', HTTP_IF_NONE_MATCH=etag)
+        force_authenticate(request, self.user)
+        response = async_to_sync(AsyncCurrentIntakeAPIView.as_view())(request)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+@override_settings(ASYNC_QUERY_CONN_MAX_AGE=0)
+class GatherQueriesTest(TransactionTestCase):
+    """Test ``gather_queries`` outside a transaction, where each callable gets its own connection."""
+
+    def setUp(self):
+        University.objects.create(name="First", country="US")
+        University.objects.create(name="Second", country="ES")
+        # Worker threads close their connections after each call instead of keeping them
+        patcher = mock.patch.dict(connections.settings['default'], {'CONN_MAX_AGE': 0})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_runs_on_other_connections_with_the_callers_wrappers(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def names(country):
+            # Both callables must be running at the same time to pass the barrier
+            barrier.wait()
+            return threading.get_ident(), list(University.objects.filter(country=country).values_list('name', flat=True))
+
+        recorder = BenchmarkQueryRecorder()
+        with connection.execute_wrapper(recorder):
+            results = async_to_sync(gather_queries)(lambda: names("US"), lambda: names("ES"))
+
+        self.assertEqual([result[1] for result in results], [["First"], ["Second"]])
+        self.assertNotEqual(results[0][0], results[1][0])
+        self.assertNotIn(threading.get_ident(), {result[0] for result in results})
+        self.assertEqual(recorder.count, 2)
+
+    def test_query_threads_keep_their_connection(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        self.addCleanup(lambda: executor.submit(lambda: connections['default'].close()).result())
+
+        def backend():
+            University.objects.exists()
+            return connections['default'].connection
+
+        with mock.patch('general.db._query_executor', executor), \
+                override_settings(ASYNC_QUERY_CONN_MAX_AGE=300):
+            (first,) = async_to_sync(gather_queries)(backend)
+            (second,) = async_to_sync(gather_queries)(backend)
+
+        self.assertIsNotNone(first)
+        self.assertIs(first, second)
+
+
+class ReplicaRoutingTest(AuthenticatedAPITestCase):
+    """Test which requests ``ReplicaRoutingMiddleware`` sends to the replica."""
+
+    def setUp(self):
+        super().setUp()
+        # Record the alias each read is routed to, but run the query on default
+        self.routed = []
+        route = ReplicaRouter.db_for_read
+
+        def record(router, model, **hints):
+            self.routed.append(route(router, model, **hints))
+
+        for patcher in (
+            mock.patch.object(ReplicaRouter, 'db_for_read', record),
+            mock.patch('ie_professor_management.middleware.replica_alias', return_value='replica'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_safe_api_requests_read_from_the_replica(self):
+        response = self.client.get('/api/universities/')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(self.routed), {'replica'})
+        self.assertNotIn(settings.DATABASE_REPLICA_STICKY_COOKIE, response.cookies)
+
+    def test_writes_make_the_client_read_from_default(self):
+        response = self.client.post('/api/universities/', {'name': 'New', 'country': 'GB'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertNotIn('replica', self.routed)
+        cookie = response.cookies[settings.DATABASE_REPLICA_STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+        self.routed.clear()
+        self.client.get('/api/universities/')
+        self.assertNotIn('replica', self.routed)
+
+    def test_failed_writes_do_not_stick(self):
+        response = self.client.post('/api/universities/', {}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn(settings.DATABASE_REPLICA_STICKY_COOKIE, response.cookies)
+
+    def test_streaming_exports_read_from_the_replica(self):
+        CourseDelivery.objects.create(course=self.course)
+        response = self.client.get('/api/course-deliveries/export/', {'format': 'csv'})
+        self.routed.clear()
+        b''.join(response.streaming_content)
+
+        self.assertEqual(set(self.routed), {'replica'})
+
+    @override_settings(PAYLOAD_CACHE_ENABLED=True)
+    def test_replica_reads_carry_no_etag(self):
+        response = self.client.get('/api/universities/')
+        self.assertNotIn('ETag', response)
+
+        self.client.cookies[settings.DATABASE_REPLICA_STICKY_COOKIE] = '1'
+        response = self.client.get('/api/universities/')
+        self.assertIn('ETag', response)
+
+    @override_settings(PAYLOAD_CACHE_ENABLED=True)
+    def test_cached_payloads_are_built_from_default(self):
+        cache.clear()
+        with reads_from('replica'):
+            cached_payload('replica-test', lambda: list(University.objects.all()))
+            list(University.objects.all())
+
+        self.assertEqual(self.routed, ['default', 'replica'])
+
+
+SEPARATE_TEST_REPLICA = (
+    settings.DATABASE_REPLICA in settings.DATABASES
+    and not settings.DATABASES[settings.DATABASE_REPLICA]['TEST'].get('MIRROR')
+)
+
+
+@skipUnless(SEPARATE_TEST_REPLICA, "needs a replica with its own test database (DB_REPLICA_NAME, DB_REPLICA_TEST_MIRROR=false)")
+class ReplicaDatabaseTest(AuthenticatedAPITestCase):
+    """Test the routing against two databases; the test replica does not replicate, so each holds its own rows."""
+
+    databases = {'default', settings.DATABASE_REPLICA} if SEPARATE_TEST_REPLICA else {'default'}
+
+    def test_reads_follow_the_replica_until_the_client_writes(self):
+        University.objects.using(settings.DATABASE_REPLICA).create(name="Replica University", country="ES")
+
+        response = self.client.get('/api/universities/')
+        self.assertEqual([university['name'] for university in response.data['results']], ["Replica University"])
+
+        self.client.post('/api/universities/', {'name': 'New University', 'country': 'GB'}, format='json')
+        response = self.client.get('/api/universities/')
+        self.assertEqual(
+            sorted(university['name'] for university in response.data['results']),
+            ["New University", "Test University"],
+        )
+        self.assertFalse(University.objects.using(settings.DATABASE_REPLICA).filter(name="New University").exists())
+
+
+class ConnectionPoolTest(SimpleTestCase):
+    """Test a psycopg pool (``DB_POOL``) on a connection to the test database outside ``connections``."""
+
+    def setUp(self):
+        settings_dict = {
+            **connection.settings_dict,
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {**connection.settings_dict['OPTIONS'], 'pool': {'min_size': 0, 'max_size': 1, 'timeout': 2}},
+        }
+        self.pooled = connections['default'].__class__(settings_dict, alias='pooled')
+        self.addCleanup(self.pooled.close_pool)
+        self.addCleanup(self.pooled.close)
+        db_probes.clear()
+        self.addCleanup(db_probes.clear)
+
+    def test_closed_connections_go_back_to_the_pool(self):
+        self.pooled.ensure_connection()
+        backend = self.pooled.connection
+        self.pooled.close()
+        self.pooled.ensure_connection()
+
+        self.assertIs(self.pooled.connection, backend)
+        self.assertEqual(self.pooled.pool.get_stats()['pool_size'], 1)
+
+    def test_probe_does_not_take_a_pool_connection(self):
+        with mock.patch('general.db.connections', {'pooled': self.pooled}):
+            self.assertTrue(database_available('pooled'))
+
+        # The pool's only connection is still free
+        self.pooled.ensure_connection()
+        self.assertTrue(self.pooled.is_usable())
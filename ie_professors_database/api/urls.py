@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import (
@@ -5,9 +6,13 @@ from .views import (
     AreaViewSet, UniversityViewSet, DegreeViewSet, IntakeViewSet,
     CourseDeliveryViewSet, ProfessorDegreeViewSet, ProfessorCoursePossibilityViewSet,
     JoinedAcademicYearViewSet, CourseDeliverySectionViewSet,
-    CurrentIntakeAPIView, ProgramDeliveryOverviewAPIView, DeliveryOverviewAPIView
+    CurrentIntakeAPIView, ProgramDeliveryOverviewAPIView, DeliveryOverviewAPIView,
+    ProfessorWorkloadAPIView, ReferenceDataAPIView
 )
-from .health_views import health_check, readiness_check, liveness_check
+from .async_views import (
+    AsyncCurrentIntakeAPIView, AsyncDeliveryOverviewAPIView, AsyncProgramDeliveryOverviewAPIView
+)
+from .health_views import health_check, readiness_check, liveness_check, metrics
 
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
@@ -33,16 +38,34 @@ router.register(r"professor-course-possibilities", ProfessorCoursePossibilityVie
 router.register(r"course-deliveries", CourseDeliveryViewSet)
 router.register(r"course-delivery-sections", CourseDeliverySectionViewSet)
 
+# Dashboards that run their independent queries concurrently (ASGI deployment mode)
+ASYNC = settings.ASYNC_VIEWS
+
 urlpatterns = [
     path("", include(router.urls)),
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
-    path("current-intakes/", CurrentIntakeAPIView.as_view(), name="current-intakes"),
-    path("program-delivery/<int:program_id>/<int:intake_id>/", ProgramDeliveryOverviewAPIView.as_view(), name="program-delivery-overview"),
-    path("delivery-overview/", DeliveryOverviewAPIView.as_view(), name="delivery-overview"),
+    path(
+        "current-intakes/",
+        (AsyncCurrentIntakeAPIView if ASYNC else CurrentIntakeAPIView).as_view(),
+        name="current-intakes",
+    ),
+    path(
+        "program-delivery/<int:program_id>/<int:intake_id>/",
+        (AsyncProgramDeliveryOverviewAPIView if ASYNC else ProgramDeliveryOverviewAPIView).as_view(),
+        name="program-delivery-overview",
+    ),
+    path(
+        "delivery-overview/",
+        (AsyncDeliveryOverviewAPIView if ASYNC else DeliveryOverviewAPIView).as_view(),
+        name="delivery-overview",
+    ),
+    path("reference-data/", ReferenceDataAPIView.as_view(), name="reference-data"),
+    path("professor-workload/", ProfessorWorkloadAPIView.as_view(), name="professor-workload"),
     
     # Health check endpoints
     path("healthz/", health_check, name="health-check"),
     path("readiness/", readiness_check, name="readiness-check"),
     path("liveness/", liveness_check, name="liveness-check"),
+    path("metrics/", metrics, name="metrics"),
 ]
@@ -1,17 +1,21 @@
 from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action, api_view
 from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import GenericAPIView
+from rest_framework.pagination import PageNumberPagination
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from django_filters import FilterSet, CharFilter
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.utils.cache import get_conditional_response
+from django.db.models import Prefetch
 from collections import defaultdict
 from datetime import datetime
 from university.models import (
     Professor, Course, Section, Program, Area, University, Degree, 
     Intake, CourseDelivery, ProfessorDegree, ProfessorCoursePossibility,
-    JoinedAcademicYear, CourseDeliverySection, CampusChoices, AvailabilityChoices, SemesterType
+    JoinedAcademicYear, CourseDeliverySection, IntakeProgramCounter
 )
 from rest_framework.permissions import IsAuthenticated
 from .serializers import (
@@ -19,8 +23,55 @@ from .serializers import (
     AreaSerializer, UniversitySerializer, DegreeSerializer, IntakeSerializer,
     CourseDeliverySerializer, ProfessorDegreeSerializer, ProfessorCoursePossibilitySerializer,
     JoinedAcademicYearSerializer, ProfessorSimpleSerializer, CourseSimpleSerializer,
-    CourseDeliverySectionSerializer
+    CourseDeliverySectionSerializer, BulkAssignmentItemSerializer, AssignmentRecommendationSerializer,
+    ProfessorWorkloadFilterSerializer
 )
+from university.services import (
+    apply_bulk_assignments, delivery_overview, overview_deliveries, program_section_deliveries,
+    find_conflicts, professor_workload, recommend_assignments, workload_deliveries,
+)
+from general.cache import cached_payload
+from .exports import COURSE_DELIVERY_COLUMNS, CSVRenderer, NDJSONRenderer, streaming_export
+from .filters import SearchFilter
+from .mixins import ConditionalGetMixin, SerializationTimingMixin, SparseFieldsetMixin
+from .reference_data import get_reference_data
+
+
+def sections_prefetch(lookup='sections'):
+    """Sections together with the FKs SectionSerializer nests, in a single query."""
+    return Prefetch(
+        lookup,
+        queryset=Section.objects.select_related('intake', 'program', 'joined_academic_year'),
+    )
+
+
+def nested_lookups(prefix, lookups):
+    return [f"{prefix}__{lookup}" for lookup in lookups]
+
+
+# Relations rendered by the nested ProfessorSerializer
+PROFESSOR_PREFETCH = ['degrees__university', 'courses__area', 'courses__programs']
+
+
+def bulk_summary(results):
+    """
+    Counts per status of ``apply_bulk_assignments`` results, the results, and
+    the double bookings of the professors of the updated deliveries.
+    """
+    summary = defaultdict(int)
+    for result in results:
+        summary[result['status']] += 1
+    updated = [result['delivery_id'] for result in results if result['status'] == 'updated']
+    return {
+        'updated': summary['updated'],
+        'unchanged': summary['unchanged'],
+        'failed': summary['error'],
+        'results': results,
+        'conflicts': find_conflicts(
+            professors=CourseDelivery.objects.filter(pk__in=updated).values('professor_id')
+        ) if updated else [],
+    }
+
 
 class CourseDeliveryFilter(FilterSet):
     sections__in = CharFilter(method='filter_sections_in')
@@ -28,93 +79,149 @@ class CourseDeliveryFilter(FilterSet):
     def filter_sections_in(self, queryset, name, value):
         if value:
             section_ids = [int(id.strip()) for id in value.split(',') if id.strip().isdigit()]
-            return queryset.filter(sections__in=section_ids).distinct()
+            return queryset.with_section(id__in=section_ids)
         return queryset
     
     class Meta:
         model = CourseDelivery
         fields = ['course', 'professor']
 
-class UniversityViewSet(viewsets.ModelViewSet):
+class UniversityViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = University.objects.all()
     serializer_class = UniversitySerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'country']
     filterset_fields = ['country']
     ordering_fields = ['name', 'created_at']
     ordering = ['-created_at']
 
-class DegreeViewSet(viewsets.ModelViewSet):
+class DegreeViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
-    queryset = Degree.objects.select_related('university').all()
+    queryset = Degree.objects.all()
     serializer_class = DegreeSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    select_related_plan = {'university': ['university']}
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'university__name']
     filterset_fields = ['degree_type', 'university']
     ordering_fields = ['name', 'created_at']
     ordering = ['-created_at']
 
-class AreaViewSet(viewsets.ModelViewSet):
+class AreaViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
     queryset = Area.objects.all()
     serializer_class = AreaSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['name']
     ordering = ['name']
 
-class ProgramViewSet(viewsets.ModelViewSet):
+class ProgramViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
     queryset = Program.objects.all()
     serializer_class = ProgramSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'code']
     filterset_fields = ['school', 'type']
     ordering_fields = ['name', 'code', 'created_at']
     ordering = ['-created_at']
     permission_classes = [IsAuthenticated]
 
-class IntakeViewSet(viewsets.ModelViewSet):
+class IntakeViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
     queryset = Intake.objects.all()
     serializer_class = IntakeSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
     filterset_fields = ['semester', 'active']
     ordering_fields = ['start_time', 'end_time', 'created_at']
     ordering = ['-start_time']
     permission_classes = [IsAuthenticated]
 
-class JoinedAcademicYearViewSet(viewsets.ModelViewSet):
+    @action(detail=True, methods=['get', 'post'], url_path='recommend-assignments')
+    def recommend_assignments(self, request, pk=None):
+        """
+        GET proposes a professor for each delivery of the intake without one
+        (``?extra_sessions=`` allows that many sessions over the PDP). POST
+        applies the reviewed ``proposals`` (``delivery_id``/``professor_id``
+        pairs from a GET) through the bulk assignment service, unless the
+        recommendation has changed since: then nothing is written and the
+        409 lists the pairs that no longer match.
+        """
+        intake = self.get_object()
+        data = request.query_params if request.method == 'GET' else request.data
+        serializer = AssignmentRecommendationSerializer(data=data)
+        serializer.is_valid(raise_exception=True)
+        recommendation = recommend_assignments(intake, serializer.validated_data.get('extra_sessions'))
+
+        if request.method == 'GET':
+            proposals = recommendation['proposals']
+            professors = Professor.objects.filter(
+                pk__in={proposal['professor_id'] for proposal in proposals}
+            ).in_bulk()
+            courses = Course.objects.filter(pk__in={proposal['course_id'] for proposal in proposals}).in_bulk()
+            for proposal in proposals:
+                professor = professors[proposal['professor_id']]
+                proposal['professor_name'] = f"{professor.name} {professor.last_name}"
+                proposal['course_code'] = courses[proposal['course_id']].code
+            return Response({'intake': intake.pk, **recommendation})
+
+        reviewed = serializer.validated_data.get('proposals')
+        if reviewed is None:
+            raise ValidationError({'proposals': ["This field is required."]})
+        recommended = {proposal['delivery_id']: proposal['professor_id'] for proposal in recommendation['proposals']}
+        stale = [
+            {**proposal, 'recommended_professor_id': recommended.get(proposal['delivery_id'])}
+            for proposal in reviewed
+            if recommended.get(proposal['delivery_id']) != proposal['professor_id']
+        ]
+        if stale:
+            return Response(
+                {'error': 'The recommendation has changed', 'stale': stale},
+                status=status.HTTP_409_CONFLICT,
+            )
+        results = apply_bulk_assignments(
+            [dict(proposal) for proposal in reviewed],
+            user=request.user if request.user.is_authenticated else None,
+            change_reason="Recommended assignment",
+        )
+        return Response({**bulk_summary(results), 'unassigned': recommendation['unassigned']})
+
+    @action(detail=True, methods=['get'])
+    def conflicts(self, request, pk=None):
+        """Professors of the intake teaching on more campuses than they have time slots."""
+        intake = self.get_object()
+        conflicts = cached_payload('intake-conflicts', lambda: find_conflicts(intakes=[intake.pk]), intake.pk)
+        return Response({'intake': intake.pk, 'count': len(conflicts), 'conflicts': conflicts})
+
+class JoinedAcademicYearViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
     queryset = JoinedAcademicYear.objects.all()
     serializer_class = JoinedAcademicYearSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name']
     ordering_fields = ['start_date', 'created_at']
     ordering = ['-start_date']
     permission_classes = [IsAuthenticated]
 
-class SectionViewSet(viewsets.ModelViewSet):
-    queryset = Section.objects.select_related(
-        'intake', 
-        'program', 
-        'joined_academic_year'
-    ).prefetch_related(
-        'coursedelivery_set__course',
-        'coursedelivery_set__course__area',
-        'coursedelivery_set__professor'
-    ).all()
+class SectionViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
+    queryset = Section.objects.all()
     serializer_class = SectionSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    select_related_plan = {
+        'intake': ['intake'],
+        'program': ['program'],
+        'joined_academic_year': ['joined_academic_year'],
+    }
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'program__name', 'program__code']
     filterset_fields = ['name', 'campus', 'course_year', 'program', 'intake']
     ordering_fields = ['name', 'course_year', 'created_at']
     ordering = ['-created_at']
     permission_classes = [IsAuthenticated]
 
-class CourseViewSet(viewsets.ModelViewSet):
-    queryset = Course.objects.prefetch_related('programs').select_related('area').all()
+class CourseViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
+    queryset = Course.objects.all()
     serializer_class = CourseSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    select_related_plan = {'area': ['area']}
+    prefetch_related_plan = {'programs': ['programs']}
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'code', 'area__name']
     filterset_fields = ['course_type', 'area', 'programs']
     ordering_fields = ['name', 'code', 'credits', 'sessions']
@@ -122,109 +229,181 @@ class CourseViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
 
 
-class ProfessorViewSet(viewsets.ModelViewSet):
-    queryset = Professor.objects.prefetch_related(
-        'degrees__degree__university', 
-        'courses__area',
-        'coursedelivery_set__course',
-        'coursedelivery_set__sections'
-    ).all()
+class ProfessorViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
+    queryset = Professor.objects.all()
     serializer_class = ProfessorSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    prefetch_related_plan = {
+        'degrees': ['degrees__university'],
+        'courses': ['courses__area', 'courses__programs'],
+    }
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     search_fields = ['name', 'last_name', 'email', 'corporate_email']
     filterset_fields = ['professor_type', 'gender', 'accredited', 'joined_year']
     ordering_fields = ['name', 'last_name', 'joined_year', 'created_at']
     ordering = ['last_name', 'name']
     permission_classes = [IsAuthenticated]
 
-class ProfessorDegreeViewSet(viewsets.ModelViewSet):
-    queryset = ProfessorDegree.objects.select_related('professor', 'degree', 'degree__university').all()
+class ProfessorDegreeViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
+    queryset = ProfessorDegree.objects.all()
     serializer_class = ProfessorDegreeSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    select_related_plan = {
+        'professor': ['professor'],
+        'degree': ['degree__university'],
+    }
+    prefetch_related_plan = {'professor': nested_lookups('professor', PROFESSOR_PREFETCH)}
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     filterset_fields = ['professor', 'degree', 'degree__degree_type']
     ordering_fields = ['created_at']
     ordering = ['-created_at']
     permission_classes = [IsAuthenticated]
 
-class ProfessorCoursePossibilityViewSet(viewsets.ModelViewSet):
-    queryset = ProfessorCoursePossibility.objects.select_related('professor', 'course').all()
+class ProfessorCoursePossibilityViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
+    queryset = ProfessorCoursePossibility.objects.all()
     serializer_class = ProfessorCoursePossibilitySerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    select_related_plan = {
+        'professor': ['professor'],
+        'course': ['course__area'],
+    }
+    prefetch_related_plan = {
+        'professor': nested_lookups('professor', PROFESSOR_PREFETCH),
+        'course': ['course__programs'],
+    }
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     filterset_fields = ['professor', 'course']
     ordering_fields = ['created_at']
     ordering = ['-created_at']
     permission_classes = [IsAuthenticated]
 
-class CourseDeliveryViewSet(viewsets.ModelViewSet):
-    queryset = CourseDelivery.objects.with_full_relations().all()
+class CourseDeliveryViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
+    queryset = CourseDelivery.objects.all()
     serializer_class = CourseDeliverySerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    select_related_plan = {
+        'course': ['course__area'],
+        'professor': ['professor'],
+    }
+    prefetch_related_plan = {
+        'course': ['course__programs'],
+        'professor': nested_lookups('professor', PROFESSOR_PREFETCH),
+        'sections': [sections_prefetch()],
+    }
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     filterset_class = CourseDeliveryFilter
     search_fields = ['course__name', 'course__code', 'professor__name', 'professor__last_name']
     ordering_fields = ['created_at']
     ordering = ['-created_at']
     permission_classes = [IsAuthenticated]
 
-class CourseDeliverySectionViewSet(viewsets.ModelViewSet):
-    queryset = CourseDeliverySection.objects.select_related('course_delivery', 'section').all()
+    @action(detail=False, methods=['post'], url_path='bulk-assign')
+    def bulk_assign(self, request):
+        """
+        Applies a list of ``{delivery_id, professor_id, sections_ids}`` in one
+        transaction and returns a compact result per item.
+        """
+        serializer = BulkAssignmentItemSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        results = apply_bulk_assignments(
+            serializer.validated_data,
+            user=request.user if request.user.is_authenticated else None,
+        )
+        return Response(bulk_summary(results))
+
+    @action(detail=False, methods=['get'], renderer_classes=[CSVRenderer, NDJSONRenderer])
+    def export(self, request):
+        """
+        Streams every matching delivery (same filters, search and ordering as
+        the list) as CSV or NDJSON, one row per delivery and section.
+        """
+        matching = self.filter_queryset(self.get_queryset())
+        # Filter by id so a section filter does not also narrow the exported sections
+        queryset = CourseDelivery.objects.filter(pk__in=matching.order_by().values('pk'))
+        return streaming_export(
+            queryset.order_by(*matching.query.order_by, 'pk', 'sections__id'),
+            COURSE_DELIVERY_COLUMNS,
+            request.accepted_renderer.format,
+            filename='course-deliveries',
+        )
+
+class CourseDeliverySectionViewSet(ConditionalGetMixin, SparseFieldsetMixin, SerializationTimingMixin, viewsets.ModelViewSet):
+    queryset = CourseDeliverySection.objects.all()
     serializer_class = CourseDeliverySectionSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    select_related_plan = {
+        'course_delivery': ['course_delivery__course__area', 'course_delivery__professor'],
+        'section': ['section__intake', 'section__program', 'section__joined_academic_year'],
+    }
+    prefetch_related_plan = {
+        'course_delivery': [
+            'course_delivery__course__programs',
+            sections_prefetch('course_delivery__sections'),
+            *nested_lookups('course_delivery__professor', PROFESSOR_PREFETCH),
+        ],
+    }
+    filter_backends = [DjangoFilterBackend, SearchFilter, filters.OrderingFilter]
     filterset_fields = ['course_delivery', 'section']
     ordering_fields = ['id']
     ordering = ['id']
     permission_classes = [IsAuthenticated]
 
 # Business Logic API Views
-class CurrentIntakeAPIView(APIView):
+class CurrentIntakeAPIView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
     """
     API endpoint for current intake information with missing professors statistics.
     """
-    def get(self, request):
+    def get_selected_date(self, request):
         date_param = request.GET.get('date')
         if date_param:
             try:
-                selected_date = datetime.strptime(date_param, "%Y-%m-%d").date()
+                return datetime.strptime(date_param, "%Y-%m-%d").date()
             except ValueError:
-                selected_date = timezone.now().date()
-        else:
-            selected_date = timezone.now().date()
-
-        # Optimize: Get active intakes with proper prefetching
-        intakes = (
-            Intake.get_active_at(selected_date)
-            .prefetch_related(
-                'section_set__coursedelivery_set__professor',
-                'section_set__coursedelivery_set__course__programs',
-                'section_set__program'
-            )
-            .annotate(
-                missing_professors=Count(
-                    "section__coursedelivery",
-                    filter=Q(section__coursedelivery__professor__isnull=True),
-                    distinct=True
-                )
-            )
-        )
+                pass
+        return timezone.now().date()
 
-        # Optimize: Get missing deliveries with single query
-        missing_by_program = (
-            CourseDelivery.objects
-            .filter(
-                professor__isnull=True,
-                sections__intake__in=intakes
-            )
-            .select_related('course')
-            .prefetch_related('course__programs', 'sections__intake')
-            .values("sections__intake__id", "course__programs__name")
-            .annotate(missing_count=Count("id"))
-            .order_by("sections__intake__id", "course__programs__name")
-        )
+    def get_validator_querysets(self, request, *args, **kwargs):
+        return [Intake.get_active_at(self.get_selected_date(request))]
+
+    def get(self, request):
+        selected_date = self.get_selected_date(request)
+        return Response({
+            'selected_date': selected_date,
+            'intakes': cached_payload('current-intakes', lambda: self.get_intakes(selected_date), selected_date)
+        })
+
+    def get_intakes(self, selected_date):
+        return self.build_intakes(*[query() for query in self.intake_queries(selected_date)])
+
+    def intake_queries(self, selected_date):
+        """
+        The independent queries behind the payload: the active intakes, their
+        per-program counters and their double-booked professors.
+        """
+        intakes = Intake.get_active_at(selected_date)
+        return [
+            lambda: list(intakes),
+            # Maintained per-program counters (see refresh_missing_professor_counters)
+            lambda: list(
+                IntakeProgramCounter.objects
+                .filter(intake__in=intakes, missing_professors__gt=0)
+                .order_by('intake_id', 'program__name')
+                .values('intake_id', 'program__name', 'missing_professors')
+            ),
+            lambda: find_conflicts(intakes=intakes.values('pk')),
+        ]
+
+    def build_intakes(self, intakes, missing_by_program, conflicts):
+        conflicts_by_intake = defaultdict(int)
+        for conflict in conflicts:
+            conflicts_by_intake[conflict['intake_id']] += 1
 
         grouped_by_intake = defaultdict(list)
         for entry in missing_by_program:
-            grouped_by_intake[entry["sections__intake__id"]].append(entry)
+            grouped_by_intake[entry['intake_id']].append({
+                'sections__intake__id': entry['intake_id'],
+                # Kept for existing consumers; the entries group by the section's program
+                'course__programs__name': entry['program__name'],
+                'program__name': entry['program__name'],
+                'missing_count': entry['missing_professors'],
+            })
 
         # Serialize the data efficiently
         intake_data = []
@@ -237,68 +416,50 @@ class CurrentIntakeAPIView(APIView):
                 'semester': intake.semester,
                 'semester_display': intake.get_semester_display(),
                 'missing_professors': intake.missing_professors,
-                'missing_programs': grouped_by_intake.get(intake.id, [])
+                'missing_programs': grouped_by_intake.get(intake.id, []),
+                'double_booked_professors': conflicts_by_intake[intake.id],
             }
             intake_data.append(intake_info)
-
-        return Response({
-            'selected_date': selected_date,
-            'intakes': intake_data
-        })
+        return intake_data
 
 
-class ProgramDeliveryOverviewAPIView(APIView):
+class ProgramDeliveryOverviewAPIView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_validator_querysets(self, request, program_id, intake_id):
+        return [
+            Section.objects.filter(program_id=program_id, intake_id=intake_id),
+            CourseDelivery.objects.with_section(program_id=program_id, intake_id=intake_id),
+        ]
+
     def get(self, request, program_id, intake_id):
         """
         API endpoint for program delivery overview.
         """
-        try:
-            program = Program.objects.get(pk=program_id)
-            intake = Intake.objects.get(pk=intake_id)
-        except (Program.DoesNotExist, Intake.DoesNotExist):
+        payload = cached_payload(
+            'program-delivery', lambda: self.get_payload(program_id, intake_id), program_id, intake_id
+        )
+        if payload is None:
             return Response({'error': 'Program or Intake not found'}, status=status.HTTP_404_NOT_FOUND)
-
-        # Get all sections for this program and intake
-        sections = Section.objects.filter(
-            program=program,
-            intake=intake
-        ).order_by('course_year', 'name')
-
-        # Get all course deliveries that are assigned to any of these sections
-        course_deliveries = CourseDelivery.objects.with_full_relations().filter(
-            sections__program=program,
-            sections__intake=intake
-        ).distinct()
-
-        # Create a mapping of section -> course deliveries
-        section_deliveries_map = {}
-        for section in sections:
-            section_deliveries_map[section.id] = []
-
-        # Populate the mapping
-        for delivery in course_deliveries:
-            for section in delivery.sections.filter(program=program, intake=intake):
-                if section.id in section_deliveries_map:
-                    delivery_data = {
-                        'id': delivery.id,
-                        'course': {
-                            'id': delivery.course.id if delivery.course else None,
-                            'name': delivery.course.name if delivery.course else None,
-                            'code': delivery.course.code if delivery.course else None,
-                            'credits': delivery.course.credits if delivery.course else None,
-                            'sessions': delivery.course.sessions if delivery.course else None,
-                            'course_type_display': delivery.course.get_course_type_display() if delivery.course and delivery.course.course_type else None,
-                        } if delivery.course else None,
-                        'professor': {
-                            'id': delivery.professor.id if delivery.professor else None,
-                            'name': delivery.professor.name if delivery.professor else None,
-                            'last_name': delivery.professor.last_name if delivery.professor else None,
-                            'corporate_email': delivery.professor.corporate_email if delivery.professor else None,
-                        } if delivery.professor else None
-                    }
-                    section_deliveries_map[section.id].append(delivery_data)
+        return Response(payload)
+
+    def get_payload(self, program_id, intake_id):
+        return self.build_payload(*[query() for query in self.payload_queries(program_id, intake_id)])
+
+    def payload_queries(self, program_id, intake_id):
+        """The independent queries behind the payload: program, intake, sections and their deliveries."""
+        return [
+            lambda: Program.objects.filter(pk=program_id).first(),
+            lambda: Intake.objects.filter(pk=intake_id).first(),
+            # Get all sections for this program and intake
+            lambda: list(Section.objects.filter(program_id=program_id, intake_id=intake_id).order_by('course_year', 'name')),
+            # Section -> deliveries map from one query over the through table
+            lambda: program_section_deliveries(program_id, intake_id),
+        ]
+
+    def build_payload(self, program, intake, sections, section_deliveries_map):
+        if program is None or intake is None:
+            return None
 
         # Build the sections data
         sections_data = []
@@ -309,10 +470,10 @@ class ProgramDeliveryOverviewAPIView(APIView):
                 'campus': section.campus,
                 'campus_display': section.get_campus_display(),
                 'course_year': section.course_year,
-                'course_deliveries': section_deliveries_map[section.id]
+                'course_deliveries': section_deliveries_map.get(section.id, [])
             })
 
-        return Response({
+        return {
             'program': {
                 'id': program.id,
                 'name': program.name,
@@ -329,158 +490,98 @@ class ProgramDeliveryOverviewAPIView(APIView):
                 'semester_display': intake.get_semester_display()
             },
             'sections': sections_data
-        })
+        }
 
 
-class DeliveryOverviewAPIView(APIView):
+class DeliveryOverviewAPIView(ConditionalGetMixin, APIView):
     permission_classes = [IsAuthenticated]
 
+    def get_validator_querysets(self, request, *args, **kwargs):
+        return [overview_deliveries(*self.get_filters(request))]
+
     def get(self, request):
         """
         Comprehensive delivery overview endpoint that aggregates data similar to Excel structure.
         Supports filtering by program, intake, and semester.
         """
         # Get query parameters
-        program_id = request.GET.get('program')
-        intake_id = request.GET.get('intake')
-        semester = request.GET.get('semester')
+        program_id, intake_id, semester = self.get_filters(request)
         
-        # Base queryset for course deliveries
-        deliveries_query = CourseDelivery.objects.select_related(
-            'course', 'professor', 'course__area'
-        ).prefetch_related(
-            'sections__intake', 'sections__program', 'sections__joined_academic_year'
+        # Flat rows ordered by year/section/course, assembled into the tree as they stream
+        years = cached_payload(
+            'delivery-overview', lambda: delivery_overview(program_id, intake_id, semester),
+            program_id, intake_id, semester
         )
-        
-        # Apply filters
-        if program_id:
-            deliveries_query = deliveries_query.filter(sections__program_id=program_id)
-        if intake_id:
-            deliveries_query = deliveries_query.filter(sections__intake_id=intake_id)
-        if semester:
-            deliveries_query = deliveries_query.filter(sections__intake__semester=semester)
-            
-        # Get all deliveries
-        deliveries = deliveries_query.distinct()
-        
-        # Group data by section year and section info for proper organization
-        sections_by_year = {}
-        
-        for delivery in deliveries:
-            if not delivery.course:
-                continue
-                
-            # Process each section assignment
-            for section in delivery.sections.all():
-                year_key = section.course_year
-                section_key = f"{section.name}_{section.campus}_{section.intake.id if section.intake else 'no_intake'}"
-                
-                if year_key not in sections_by_year:
-                    sections_by_year[year_key] = {}
-                
-                if section_key not in sections_by_year[year_key]:
-                    sections_by_year[year_key][section_key] = {
-                        'section_info': {
-                            'name': section.name,
-                            'campus': section.campus,
-                            'campus_display': section.get_campus_display(),
-                            'intake': {
-                                'id': section.intake.id if section.intake else None,
-                                'name': section.intake.name if section.intake else None,
-                                'semester_display': section.intake.get_semester_display() if section.intake else 'Unknown'
-                            },
-                            'program': {
-                                'id': section.program.id if section.program else None,
-                                'name': section.program.name if section.program else None,
-                                'code': section.program.code if section.program else None,
-                            }
-                        },
-                        'courses': {}
-                    }
-                
-                course_code = delivery.course.code
-                if course_code not in sections_by_year[year_key][section_key]['courses']:
-                    sections_by_year[year_key][section_key]['courses'][course_code] = {
-                        'course': {
-                            'id': delivery.course.id,
-                            'code': delivery.course.code,
-                            'name': delivery.course.name,
-                            'type': delivery.course.course_type,
-                            'type_display': delivery.course.get_course_type_display() if delivery.course.course_type else '',
-                            'credits': delivery.course.credits,
-                            'sessions': delivery.course.sessions,
-                            'area': {
-                                'id': delivery.course.area.id if delivery.course.area else None,
-                                'name': delivery.course.area.name if delivery.course.area else '',
-                            } if delivery.course.area else None,
-                        },
-                        'assignments': {
-                            'Segovia': {'morning': [], 'afternoon': []},
-                            'Madrid A': {'morning': [], 'afternoon': []},
-                            'Madrid B': {'morning': [], 'afternoon': []}
-                        }
-                    }
-                
-                # Add professor assignment
-                if delivery.professor:
-                    prof_data = {
-                        'id': delivery.professor.id,
-                        'name': f"{delivery.professor.name} {delivery.professor.last_name}",
-                        'email': delivery.professor.corporate_email or delivery.professor.email,
-                        'type': delivery.professor.get_professor_type_display(),
-                        'section_name': section.name,
-                        'delivery_id': delivery.id
-                    }
-                    
-                    # Check professor's availability to determine time slot
-                    time_slot = 'morning'
-                    if delivery.professor.availabilities:
-                        if 'afternoon' in delivery.professor.availabilities:
-                            time_slot = 'afternoon'
-                    
-                    campus_key = section.campus
-                    sections_by_year[year_key][section_key]['courses'][course_code]['assignments'][campus_key][time_slot].append(prof_data)
-        
-        # Convert sections_by_year to the expected format
-        years_data = {}
-        for year, sections in sections_by_year.items():
-            years_data[year] = {
-                'year': year,
-                'sections': []
-            }
-            
-            for section_key, section_data in sections.items():
-                section_info = {
-                    'section_info': section_data['section_info'],
-                    'courses': list(section_data['courses'].values())
-                }
-                years_data[year]['sections'].append(section_info)
-        
-        # Sort years
-        sorted_years = sorted(years_data.items(), key=lambda x: x[0])
-        
-        # Get available programs for filtering
-        programs = Program.objects.all().values('id', 'name', 'code')
-        
-        # Get available intakes for filtering
-        intakes = Intake.objects.all().values('id', 'name', 'semester', 'start_time', 'end_time')
-        
-        return Response({
-            'years': dict(sorted_years),
-            'filters': {
-                'programs': list(programs),
-                'intakes': list(intakes),
-                'semesters': [
-                    {'value': semester[0], 'display': semester[1]} 
-                    for semester in SemesterType.choices
+        return Response(self.build_response(request, years, get_reference_data()))
+
+    def get_filters(self, request):
+        return request.GET.get('program'), request.GET.get('intake'), request.GET.get('semester')
+
+    def build_response(self, request, years, reference_data):
+        # Filter options come from the cached reference-data bundle; clients that
+        # already hold the current version get only the version back
+        response = {
+            'years': years,
+            'reference_data_version': reference_data['version'],
+        }
+        if request.GET.get('reference_version') != reference_data['version']:
+            data = reference_data['data']
+            choices = data['choices']
+            response['filters'] = {
+                'programs': [
+                    {'id': program['id'], 'name': program['name'], 'code': program['code']}
+                    for program in data['programs']
                 ],
-                'campuses': [
-                    {'value': campus[0], 'display': campus[1]} 
-                    for campus in CampusChoices.choices
+                'intakes': [
+                    {key: intake[key] for key in ('id', 'name', 'semester', 'start_time', 'end_time')}
+                    for intake in data['intakes']
                 ],
-                'time_slots': [
-                    {'value': slot[0], 'display': slot[1]} 
-                    for slot in AvailabilityChoices.choices
-                ]
+                'semesters': choices['SemesterType'],
+                'campuses': choices['CampusChoices'],
+                'time_slots': choices['AvailabilityChoices'],
             }
-        })
\ No newline at end of file
+        return response
+
+
+class ProfessorWorkloadAPIView(ConditionalGetMixin, GenericAPIView):
+    permission_classes = [IsAuthenticated]
+    # The rows are grouped, not model instances, so pages go by number (no ?cursor=)
+    pagination_class = PageNumberPagination
+
+    def get_filters(self, request):
+        serializer = ProfessorWorkloadFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return [serializer.validated_data.get(key) for key in ('professor', 'intake', 'semester', 'active')]
+
+    def get_validator_querysets(self, request, *args, **kwargs):
+        return [workload_deliveries(*self.get_filters(request))]
+
+    def get(self, request):
+        """
+        Deliveries, sessions and credits per professor and intake against the
+        professor's PDP, a page at a time. Filters: ``professor``, ``intake``,
+        ``semester`` and ``active`` (``true``/``false``, the intake's flag).
+        """
+        filters = self.get_filters(request)
+        rows = cached_payload('professor-workload', lambda: professor_workload(*filters), *filters)
+        return self.get_paginated_response(self.paginate_queryset(rows))
+
+
+class ReferenceDataAPIView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        """
+        Programs, intakes, areas, universities, joined academic years and choice
+        lists in one versioned payload. Answers 304 when ``If-None-Match`` holds
+        the current version.
+        """
+        reference_data = get_reference_data()
+        etag = f'"{reference_data["version"]}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(reference_data)
+        response['ETag'] = etag
+        return response
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_probes = {}
+
+# Threads (and so database connections) available to ``gather_queries`` in each process
+_query_executor = ThreadPoolExecutor(max_workers=settings.ASYNC_QUERY_THREADS, thread_name_prefix='query')
+
+
+def estimate_count(queryset):
+    """
+    Row count the PostgreSQL planner expects ``queryset`` to return.
+
+    Reads the estimate from ``EXPLAIN`` instead of running ``COUNT(*)``, so the
+    cost does not grow with the table. Other backends get an exact count.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+
+    sql, params = queryset.order_by().query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def estimate_table_rows(model, using='default'):
+    """
+    Row count of ``model``'s table from ``pg_class.reltuples``, as of the last
+    VACUUM/ANALYZE. ``None`` when unknown: not PostgreSQL, or never analyzed.
+    """
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def database_available(using='default'):
+    """
+    Whether the ``using`` database can be reached, probed with a short-lived
+    connection the first time it is asked rather than when settings are
+    imported. A success is kept for the life of the process, a failure for
+    ``DATABASE_PROBE_RETRY`` seconds. Without a configured database (the
+    no-database mode) this is ``False`` without probing.
+    """
+    connection = connections[using]
+    if connection.settings_dict['ENGINE'] == 'django.db.backends.dummy':
+        return False
+    available, checked_at = _probes.get(using, (None, 0.0))
+    if available or (available is False and time.monotonic() - checked_at < settings.DATABASE_PROBE_RETRY):
+        return available
+
+    params = connection.get_connection_params()
+    if connection.vendor == 'postgresql':
+        params['connect_timeout'] = settings.DATABASE_PROBE_TIMEOUT
+    try:
+        # Straight to the server, bypassing the pool (which would keep the slot)
+        connection.Database.connect(**params).close()
+        available = True
+    except Exception as e:
+        logger.warning("Database %r unreachable, running in no-database mode: %s", using, e)
+        available = False
+    _probes[using] = (available, time.monotonic())
+    return available
+
+
+def _connection_state(using):
+    connection = connections[using]
+    return connection.in_atomic_block, list(connection.execute_wrappers)
+
+
+def _on_own_connection(function, using, wrappers):
+    def run():
+        connection = connections[using]
+        # Same connection lifecycle as a request: drop it when broken or past its age
+        connection.close_if_unusable_or_obsolete()
+        opened = connection.connection is None
+        try:
+            with ExitStack() as stack:
+                for wrapper in wrappers:
+                    # Wrappers kept on every connection are already here
+                    if wrapper not in connection.execute_wrappers:
+                        stack.enter_context(connection.execute_wrapper(wrapper))
+                return function()
+        finally:
+            if opened and connection.connection is not None:
+                # The pool threads outlive requests, so their connections are kept
+                # even when CONN_MAX_AGE is 0 for the request threads (ASGI)
+                max_age = settings.ASYNC_QUERY_CONN_MAX_AGE
+                connection.close_at = None if max_age is None else time.monotonic() + max_age
+            connection.close_if_unusable_or_obsolete()
+    return run
+
+
+async def gather_queries(*functions, using=DEFAULT_DB_ALIAS):
+    """
+    Runs the independent, synchronous ORM callables ``functions`` at the same
+    time and returns their results in order.
+
+    Each one runs on a thread of a small pool (``ASYNC_QUERY_THREADS``), on
+    that thread's own connection, with the caller's execute wrappers (such as
+    a benchmark's query recorder) and context variables (so the request
+    instrumentation still counts the queries). Inside a transaction the
+    other connections would not see its uncommitted rows, so the callables then
+    run one after another on the caller's connection.
+    """
+    in_atomic_block, wrappers = await sync_to_async(_connection_state)(using)
+    if in_atomic_block:
+        return [await sync_to_async(function)() for function in functions]
+    return await asyncio.gather(*(
+        sync_to_async(_on_own_connection(function, using, wrappers), thread_sensitive=False, executor=_query_executor)()
+        for function in functions
+    ))
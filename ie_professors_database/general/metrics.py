@@ -0,0 +1,107 @@
+"""
+Prometheus metrics of the application.
+
+Request metrics are recorded by ``RequestInstrumentationMiddleware`` and the
+payload cache lookups by ``cached_payload``. Under gunicorn every worker keeps
+its own values; with ``PROMETHEUS_MULTIPROC_DIR`` set (see ``gunicorn.conf.py``)
+they are written to that directory and ``exposition()`` adds them up, so any
+worker answering the scrape reports the totals of all of them.
+"""
+import glob
+import os
+from collections import defaultdict
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+REQUEST_LATENCY = Histogram(
+    'ie_http_request_duration_seconds', 'Request latency per route.', ['route', 'method'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS = Counter('ie_http_requests', 'Requests per route and status.', ['route', 'method', 'status'])
+REQUEST_QUERIES = Histogram(
+    'ie_http_request_queries', 'Database queries per request.', ['route'],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+REQUEST_DB_TIME = Histogram(
+    'ie_http_request_db_seconds', 'Database time per request.', ['route'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    'ie_http_requests_in_progress', 'Requests being handled by the views.', multiprocess_mode='livesum',
+)
+PAYLOAD_CACHE_LOOKUPS = Counter(
+    'ie_payload_cache_lookups', 'Payload cache lookups per payload and result (hit or miss).', ['payload', 'result'],
+)
+
+
+def record_request(route, method, status, duration, queries, db_seconds):
+    REQUEST_LATENCY.labels(route, method).observe(duration)
+    REQUESTS.labels(route, method, status).inc()
+    REQUEST_QUERIES.labels(route).observe(queries)
+    REQUEST_DB_TIME.labels(route).observe(db_seconds)
+
+
+def _recorded():
+    """Registry with the recorded metrics, of every worker in multiprocess mode."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def requests_in_progress():
+    """Requests being handled right now, by every worker in multiprocess mode."""
+    directory = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if directory:
+        # Only the live-sum gauge files, not every metric of every worker
+        families = multiprocess.MultiProcessCollector.merge(
+            glob.glob(os.path.join(directory, 'gauge_livesum_*.db')), accumulate=False,
+        )
+    else:
+        families = REQUESTS_IN_PROGRESS.collect()
+    return sum(
+        sample.value
+        for family in families if family.name == 'ie_http_requests_in_progress'
+        for sample in family.samples
+    )
+
+
+class _Exposition:
+    """
+    The recorded metrics followed by the payload cache hit ratio and the
+    ``extra`` families computed per scrape.
+    """
+
+    def __init__(self, extra):
+        self.source = _recorded()
+        self.extra = extra
+
+    def collect(self):
+        lookups = defaultdict(lambda: {'hit': 0.0, 'miss': 0.0})
+        for family in self.source.collect():
+            if family.name == 'ie_payload_cache_lookups':
+                for sample in family.samples:
+                    if sample.name.endswith('_total'):
+                        lookups[sample.labels['payload']][sample.labels['result']] += sample.value
+            yield family
+
+        ratio = GaugeMetricFamily(
+            'ie_payload_cache_hit_ratio', 'Share of payload cache lookups served from the cache.', labels=['payload'],
+        )
+        for payload, counts in sorted(lookups.items()):
+            total = counts['hit'] + counts['miss']
+            if total:
+                ratio.add_metric([payload], counts['hit'] / total)
+        yield ratio
+        for collect in self.extra:
+            yield from collect()
+
+
+def exposition(*extra):
+    """
+    The metrics in the Prometheus text format. ``extra`` are callables
+    returning metric families, evaluated on each call.
+    """
+    return generate_latest(_Exposition(extra))
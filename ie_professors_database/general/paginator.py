@@ -0,0 +1,66 @@
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from .db import estimate_count, estimate_table_rows
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the row count from the PostgreSQL statistics.
+
+    An unfiltered queryset reads ``pg_class.reltuples``; a filtered (or
+    ``distinct()``) one reads the planner estimate from ``EXPLAIN``. Only when
+    the estimate is at most ``exact_count_threshold`` rows is the real
+    ``COUNT(*)`` run, so small results keep exact counts and page links.
+
+    With an estimated count, pages past the estimate are still served (they
+    may be empty) instead of raising ``EmptyPage``, since the estimate can be
+    lower than the real count.
+    """
+    exact_count_threshold = 5000
+
+    @cached_property
+    def estimated_count(self):
+        """The estimate when it is used as the count, otherwise ``None``."""
+        estimate = self.estimate_count()
+        if estimate is None or estimate <= self.exact_count_threshold:
+            return None
+        return estimate
+
+    @property
+    def estimated(self):
+        return self.estimated_count is not None
+
+    @cached_property
+    def count(self):
+        if self.estimated:
+            return self.estimated_count
+        return super().count
+
+    def estimate_count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet) or connections[queryset.db].vendor != 'postgresql':
+            return None
+        query = queryset.query
+        if not query.where and not query.distinct and not query.combinator:
+            estimate = estimate_table_rows(queryset.model, queryset.db)
+            if estimate is not None:
+                return estimate
+        return estimate_count(queryset)
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if not self.estimated or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        if not self.estimated:
+            return super().page(number)
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        return self._get_page(self.object_list[bottom:bottom + self.per_page], number, self)
@@ -0,0 +1,71 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` marks the safe-method requests under
+``DATABASE_REPLICA_PATHS`` (the API, so the dashboards and exports) as
+replica reads, unless the client wrote something in the last
+``DATABASE_REPLICA_STICKY_SECONDS``. ``ReplicaRouter`` then sends their reads
+to ``DATABASE_REPLICA``; everything else, and every write, uses ``default``.
+Without a replica alias in ``DATABASES`` all reads stay on ``default``.
+
+The choice is kept in a context variable, so it follows the request into the
+``gather_queries`` threads and the async views.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_read_alias = ContextVar('read_alias', default=None)
+
+
+def replica_alias():
+    """
+    The replica alias if one is configured, else ``None``. A replica that is
+    the primary database itself, like a test mirror, counts as none.
+    """
+    alias = settings.DATABASE_REPLICA
+    if not alias or alias not in settings.DATABASES:
+        return None
+    replica, primary = connections[alias].settings_dict, connections[DEFAULT_DB_ALIAS].settings_dict
+    if all(replica.get(key) == primary.get(key) for key in ('HOST', 'PORT', 'NAME')):
+        return None
+    return alias
+
+
+@contextmanager
+def reads_from(alias):
+    """Routes the reads made inside the block to ``alias`` (``None``: the default routing)."""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def reading_from_replica():
+    """Whether the reads made here go to the replica."""
+    return _read_alias.get() not in (None, DEFAULT_DB_ALIAS)
+
+
+def primary_reads():
+    """
+    Reads made inside the block go to ``default``, for results that outlive
+    the request (shared caches) and must not be built from a lagging replica.
+    """
+    return reads_from(DEFAULT_DB_ALIAS)
+
+
+class ReplicaRouter:
+    """Sends reads to the alias chosen for the current request, writes to ``default``."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
@@ -0,0 +1,43 @@
+"""
+Gunicorn settings read from the working directory on start.
+
+Each worker records its Prometheus metrics in PROMETHEUS_MULTIPROC_DIR, which
+/api/metrics/ adds up across workers. The directory is emptied when the master
+starts, and the files of a worker that exits are marked dead so its gauges go.
+The worker and thread counts are passed on to the workers for the readiness
+probe, and each worker checks the migrations once it has loaded the app.
+
+SERVER_MODE=asgi serves the ASGI application with uvicorn workers instead of
+the WSGI one with sync workers (see settings.SERVER_MODE).
+"""
+import os
+import shutil
+import tempfile
+
+from prometheus_client import multiprocess
+
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "ie-prometheus"))
+
+if os.getenv("SERVER_MODE", "wsgi").lower() == "asgi":
+    wsgi_app = "ie_professor_management.asgi:application"
+    worker_class = "uvicorn.workers.UvicornWorker"
+else:
+    wsgi_app = "ie_professor_management.wsgi:application"
+
+
+def on_starting(server):
+    directory = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+    os.environ["GUNICORN_WORKERS"] = str(server.cfg.workers)
+    os.environ["GUNICORN_THREADS"] = str(server.cfg.threads)
+
+
+def post_worker_init(worker):
+    from api.health_views import migration_state
+
+    migration_state()
+
+
+def child_exit(server, worker):
+    multiprocess.mark_process_dead(worker.pid)
@@ -1,7 +1,305 @@
-class DebugHostMiddleware:
-    def __init__(self, get_response): 
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from rest_framework.permissions import SAFE_METHODS
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from general.metrics import REQUESTS_IN_PROGRESS, record_request
+from general.routers import reads_from, replica_alias
+
+logger = logging.getLogger("ie_professor_management.requests")
+
+# The RequestMetrics of the request being handled in this context
+_request_metrics = ContextVar("request_metrics", default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Execute wrapper kept on every connection: hands the query to the metrics of
+    the current request, if any. Context variables follow the request into
+    ``sync_to_async`` threads, where thread-local connection wrappers would not.
+    """
+    metrics = _request_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    return metrics(execute, sql, params, many, context)
+
+
+def _instrument(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    _instrument(connection)
+
+
+class RequestMetrics:
+    """
+    Query count, database time, serialization and render time and size of
+    one request.
+
+    ``track()`` makes the instance the current request's metrics, which
+    ``record_query`` reports every query to, on whichever thread and
+    connection it runs (including those run concurrently by
+    ``general.db.gather_queries``).
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.render_started = None
+        self.render_seconds = 0.0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            with self.lock:
+                self.queries += 1
+                self.db_seconds += time.perf_counter() - started
+
+    @contextmanager
+    def track(self):
+        # Connections opened before this module was loaded did not get the wrapper
+        for alias in connections:
+            _instrument(connections[alias])
+        token = _request_metrics.set(self)
+        try:
+            yield self
+        finally:
+            _request_metrics.reset(token)
+
+    def timed_serialization(self, to_representation):
+        """Wraps a serializer's ``to_representation`` to add its time to ``serialize_seconds``."""
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return to_representation(*args, **kwargs)
+            finally:
+                self.serialize_seconds += time.perf_counter() - started
+        return timed
+
+    def rendered(self, response):
+        self.render_seconds += time.perf_counter() - self.render_started
+
+    @property
+    def duration_ms(self):
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self):
+        return (
+            f'db;dur={self.db_seconds * 1000:.1f};desc="{self.queries} queries", '
+            f'serialize;dur={self.serialize_seconds * 1000:.1f}, '
+            f'render;dur={self.render_seconds * 1000:.1f}, '
+            f'total;dur={self.duration_ms:.1f}'
+        )
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Per-request instrumentation: query count, database time, serialization
+    time (DRF serializers turning objects into primitives, see
+    ``api.mixins.SerializationTimingMixin``), render time (encoding a DRF
+    response or rendering a template response) and response size.
+
+    Each request adds a ``Server-Timing`` header (``SERVER_TIMING_HEADER``)
+    and one JSON log line on ``ie_professor_management.requests``. The line is
+    logged as a warning when the request takes longer than ``SLOW_REQUEST_MS``
+    or runs more than ``SLOW_REQUEST_QUERIES`` queries. Streaming responses
+    are logged once their content has been sent, including the queries run
+    while streaming. The same numbers feed the Prometheus request metrics.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
         self.get_response = get_response
-    
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
     def __call__(self, request):
-        print("HOST:", request.get_host())
-        return self.get_response(request)
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request.metrics = RequestMetrics()
+        with metrics.track(), REQUESTS_IN_PROGRESS.track_inprogress():
+            response = self.get_response(request)
+        return self.instrument_response(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        with metrics.track(), REQUESTS_IN_PROGRESS.track_inprogress():
+            response = await self.get_response(request)
+        return self.instrument_response(request, response, metrics)
+
+    def instrument_response(self, request, response, metrics):
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = metrics.server_timing()
+        if response.streaming:
+            stream = self.astream if response.is_async else self.stream
+            response.streaming_content = stream(request, response, response.streaming_content, metrics)
+        else:
+            metrics.bytes = len(response.content)
+            self.finish(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        metrics = getattr(request, "metrics", None)
+        if metrics is not None:
+            metrics.render_started = time.perf_counter()
+            response.add_post_render_callback(metrics.rendered)
+        return response
+
+    def stream(self, request, response, content, metrics):
+        with metrics.track():
+            for chunk in content:
+                metrics.bytes += len(chunk)
+                yield chunk
+        self.finish(request, response, metrics)
+
+    async def astream(self, request, response, content, metrics):
+        with metrics.track():
+            async for chunk in content:
+                metrics.bytes += len(chunk)
+                yield chunk
+        self.finish(request, response, metrics)
+
+    def finish(self, request, response, metrics):
+        match = request.resolver_match
+        route = match.view_name if match else None
+        record_request(
+            route or "unmatched", request.method, response.status_code,
+            metrics.duration_ms / 1000, metrics.queries, metrics.db_seconds,
+        )
+        entry = {
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "status": response.status_code,
+            "duration_ms": round(metrics.duration_ms, 1),
+            "db_ms": round(metrics.db_seconds * 1000, 1),
+            "queries": metrics.queries,
+            "serialize_ms": round(metrics.serialize_seconds * 1000, 1),
+            "render_ms": round(metrics.render_seconds * 1000, 1),
+            "bytes": metrics.bytes,
+        }
+        flags = []
+        if entry["duration_ms"] > settings.SLOW_REQUEST_MS:
+            flags.append("slow")
+        if entry["queries"] > settings.SLOW_REQUEST_QUERIES:
+            flags.append("queries")
+        if flags:
+            entry["flags"] = flags
+        logger.log(logging.WARNING if flags else logging.INFO, json.dumps(entry))
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Sends the reads of safe-method requests under ``DATABASE_REPLICA_PATHS``
+    to the read replica (see ``general.routers``), including those made while
+    a streaming response is sent.
+
+    A successful write sets the ``DATABASE_REPLICA_STICKY_COOKIE`` cookie for
+    ``DATABASE_REPLICA_STICKY_SECONDS``; while it is present the client reads
+    from ``default``, so it sees its own changes before the replica has them.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        alias = self.read_alias(request)
+        with reads_from(alias):
+            response = self.get_response(request)
+        return self.route_response(request, response, alias)
+
+    async def __acall__(self, request):
+        alias = self.read_alias(request)
+        with reads_from(alias):
+            response = await self.get_response(request)
+        return self.route_response(request, response, alias)
+
+    def route_response(self, request, response, alias):
+        if alias is not None and response.streaming:
+            stream = self.astream if response.is_async else self.stream
+            response.streaming_content = stream(response.streaming_content, alias)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            response.set_cookie(
+                settings.DATABASE_REPLICA_STICKY_COOKIE, "1",
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                secure=request.is_secure(), httponly=True, samesite="Lax",
+            )
+        return response
+
+    def read_alias(self, request):
+        alias = replica_alias()
+        if (
+            alias is None
+            or request.method not in SAFE_METHODS
+            or settings.DATABASE_REPLICA_STICKY_COOKIE in request.COOKIES
+            or not request.path_info.startswith(tuple(settings.DATABASE_REPLICA_PATHS))
+        ):
+            return None
+        return alias
+
+    def stream(self, content, alias):
+        with reads_from(alias):
+            yield from content
+
+    async def astream(self, content, alias):
+        with reads_from(alias):
+            async for chunk in content:
+                yield chunk
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise's middleware, async-capable. WhiteNoise's own is sync-only,
+    which in ASGI mode turned every middleware above it sync as well and cost
+    each request two thread switches around it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return self.serve(static_file, request)
+        return await self.get_response(request)
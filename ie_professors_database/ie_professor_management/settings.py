@@ -77,10 +77,11 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
-    'ie_professor_management.middleware.DebugHostMiddleware',
+    'ie_professor_management.middleware.RequestInstrumentationMiddleware',
+    'ie_professor_management.middleware.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'ie_professor_management.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -124,79 +125,102 @@ DB_USER = os.getenv("DB_USER") or os.getenv("RDS_USERNAME") or "postgres"
 DB_PORT = os.getenv("DB_PORT") or os.getenv("RDS_PORT") or "5432"
 DB_PASSWORD = os.getenv("DB_PASSWORD") or os.getenv("RDS_PASSWORD")
 
-print(f"🔍 Database Configuration Debug:")
-print(f"  DB_HOST: {DB_HOST}")
-print(f"  DB_NAME: {DB_NAME}")
-print(f"  DB_USER: {DB_USER}")
-print(f"  DB_PORT: {DB_PORT}")
-print(f"  DB_PASSWORD: {'***' if DB_PASSWORD else 'Not set'}")
-
-# Database connection strategy: PostgreSQL first, then graceful fallback to no database
-DATABASE_AVAILABLE = False
-
+# Nothing here connects to the database: settings are imported by every
+# manage.py command, worker boot and test run. Whether PostgreSQL can actually
+# be reached is probed on first use (general.db.database_available), and the
+# health check and entrypoint fall back to no-database mode when it cannot.
 if DB_HOST and DB_HOST.strip() and DB_NAME and DB_USER and DB_PASSWORD:
-    # Test PostgreSQL connectivity before configuring
-    try:
-        import psycopg2
-        print(f"🔍 Testing PostgreSQL connection to {DB_HOST}:{DB_PORT}...")
-        
-        # Quick connection test with short timeout
-        conn = psycopg2.connect(
-            host=DB_HOST,
-            port=DB_PORT,
-            database=DB_NAME,
-            user=DB_USER,
-            password=DB_PASSWORD,
-            connect_timeout=5
-        )
-        conn.close()
-        
-        # PostgreSQL is available - configure it
-        print(f"✅ PostgreSQL database connected at {DB_HOST}:{DB_PORT}")
-        DATABASE_AVAILABLE = True
-        DATABASES = {
-            'default': {
-                'ENGINE': 'django.db.backends.postgresql',
-                'NAME': DB_NAME,       
-                'USER': DB_USER,           
-                'PASSWORD': DB_PASSWORD,   
-                'HOST': DB_HOST,
-                'PORT': DB_PORT,
-                'OPTIONS': {
-                    'connect_timeout': 10,
-                    'sslmode': 'prefer',  # AWS RDS supports SSL
-                },
-                'CONN_MAX_AGE': 300,  # Connection pooling - keep connections for 5 minutes
-            }
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': DB_NAME,       
+            'USER': DB_USER,           
+            'PASSWORD': DB_PASSWORD,   
+            'HOST': DB_HOST,
+            'PORT': DB_PORT,
+            'OPTIONS': {
+                'connect_timeout': 10,
+                'sslmode': 'prefer',  # AWS RDS supports SSL
+            },
+            'CONN_MAX_AGE': 300,  # Connection pooling - keep connections for 5 minutes
         }
-        
-    except Exception as e:
-        print(f"⚠️  PostgreSQL connection failed: {e}")
-        print("🔄 Falling back to no-database mode for graceful startup")
-        DATABASE_AVAILABLE = False
-        DATABASES = {}
-        
+    }
+# Use SQLite fallback only in DEBUG mode for local development
+elif DEBUG or os.getenv("ALLOW_SQLITE_FALLBACK", "false").lower() == "true":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
 else:
-    print("⚠️  PostgreSQL environment variables not configured")
-    print(f"   Missing vars: DB_HOST={bool(DB_HOST)}, DB_NAME={bool(DB_NAME)}, DB_USER={bool(DB_USER)}, DB_PASSWORD={bool(DB_PASSWORD)}")
-    
-    # Use SQLite fallback only in DEBUG mode for local development
-    if DEBUG or os.getenv("ALLOW_SQLITE_FALLBACK", "false").lower() == "true":
-        print("🔄 Using SQLite database for local development")
-        DATABASE_AVAILABLE = True
-        DATABASES = {
-            'default': {
-                'ENGINE': 'django.db.backends.sqlite3',
-                'NAME': BASE_DIR / 'db.sqlite3',
-            }
+    # No-database mode for graceful startup
+    DATABASES = {}
+
+# Connection pooling (psycopg 3): DB_POOL=true replaces the persistent
+# connections with a pool per worker process and alias, opened on first use
+# with DB_POOL_MIN_SIZE connections and growing up to DB_POOL_MAX_SIZE. Size it
+# to the threads sharing it: the gunicorn threads per worker, plus
+# ASYNC_QUERY_THREADS in ASGI mode. A request waits up to DB_POOL_TIMEOUT
+# seconds for a free connection; idle ones close after DB_POOL_MAX_IDLE and
+# every connection is replaced after DB_POOL_MAX_LIFETIME, so restarts and
+# spikes reuse connections instead of opening a burst of new TLS ones.
+# DB_HEALTH_CHECKS (on by default with the pool) checks a connection before
+# reusing it.
+#
+# DB_TRANSACTION_POOLING=true is for a transaction-mode pooler in front of
+# PostgreSQL (pgbouncer, RDS Proxy): consecutive transactions may run on
+# different server connections, so there are no server-side cursors (exports
+# read in chunks instead, see api.exports) and no prepared statements (off by
+# default with psycopg 3). The app keeps no other session state.
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+DB_TRANSACTION_POOLING = os.getenv("DB_TRANSACTION_POOLING", "false").lower() == "true"
+if DATABASES.get('default', {}).get('ENGINE') == 'django.db.backends.postgresql':
+    DATABASES['default']['CONN_HEALTH_CHECKS'] = os.getenv("DB_HEALTH_CHECKS", str(DB_POOL)).lower() == "true"
+    if DB_POOL:
+        DATABASES['default']['CONN_MAX_AGE'] = 0  # Pooling replaces persistent connections
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+            'max_size': int(os.getenv("DB_POOL_MAX_SIZE", "8")),
+            'timeout': float(os.getenv("DB_POOL_TIMEOUT", "10")),
+            'max_idle': float(os.getenv("DB_POOL_MAX_IDLE", "300")),
+            'max_lifetime': float(os.getenv("DB_POOL_MAX_LIFETIME", "1800")),
         }
-    else:
-        print("🔄 Running in no-database mode for graceful startup")
-        DATABASE_AVAILABLE = False
-        DATABASES = {}
+    if DB_TRANSACTION_POOLING:
+        DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = True
+
+# Read replica (general.routers): safe-method requests under
+# DATABASE_REPLICA_PATHS read from the DATABASE_REPLICA alias, except for
+# DATABASE_REPLICA_STICKY_SECONDS after the client wrote something. Unset
+# DB_REPLICA_* variables take the primary's values, so DB_REPLICA_NAME alone
+# points it at a second local database. Test runs mirror it to default unless
+# DB_REPLICA_TEST_MIRROR=false gives it its own test database.
+DATABASE_REPLICA = os.getenv("DATABASE_REPLICA", "replica")
+DB_REPLICA_HOST = os.getenv("DB_REPLICA_HOST")
+DB_REPLICA_NAME = os.getenv("DB_REPLICA_NAME")
+if 'default' in DATABASES and DATABASE_REPLICA and (DB_REPLICA_HOST or DB_REPLICA_NAME):
+    primary = DATABASES['default']
+    DATABASES[DATABASE_REPLICA] = {
+        **primary,
+        'HOST': DB_REPLICA_HOST or primary.get('HOST', ''),
+        'NAME': DB_REPLICA_NAME or primary['NAME'],
+        'PORT': os.getenv("DB_REPLICA_PORT") or primary.get('PORT', ''),
+        'USER': os.getenv("DB_REPLICA_USER") or primary.get('USER', ''),
+        'PASSWORD': os.getenv("DB_REPLICA_PASSWORD") or primary.get('PASSWORD', ''),
+        'TEST': (
+            {} if os.getenv("DB_REPLICA_TEST_MIRROR", "true").lower() == "false"
+            else {'MIRROR': 'default'}
+        ),
+    }
+DATABASE_ROUTERS = ['general.routers.ReplicaRouter']
+DATABASE_REPLICA_PATHS = ["/api/"]
+DATABASE_REPLICA_STICKY_COOKIE = "ie_primary_reads"
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv("DATABASE_REPLICA_STICKY_SECONDS", "10"))
 
-# Export database availability for use by entrypoint and health checks
-os.environ['DATABASE_AVAILABLE'] = str(DATABASE_AVAILABLE)
+# Connect timeout of the first-use probe, and how long an unreachable database
+# is reported as such before probing again.
+DATABASE_PROBE_TIMEOUT = int(os.getenv("DATABASE_PROBE_TIMEOUT", "5"))
+DATABASE_PROBE_RETRY = int(os.getenv("DATABASE_PROBE_RETRY", "30"))
 
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
 EMAIL_HOST = "smtp.gmail.com"
@@ -225,7 +249,7 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 REST_FRAMEWORK = {
-    "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
+    "DEFAULT_PAGINATION_CLASS": "api.pagination.StandardResultsPagination",
     "PAGE_SIZE": 50,
     "DEFAULT_AUTHENTICATION_CLASSES": [
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -358,6 +382,12 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        # One line per request from RequestInstrumentationMiddleware
+        'ie_professor_management.requests': {
+            'handlers': ['console'],
+            'level': os.getenv("REQUEST_LOG_LEVEL", "INFO"),
+            'propagate': False,
+        },
     },
 }
 
@@ -531,14 +561,83 @@ UNFOLD = {
 
 # Debug Toolbar disabled - performance optimization complete
 
-# Caching Configuration for better performance
-CACHES = {
-    'default': {
+# Caching Configuration
+# One cache shared by all gunicorn workers: CACHE_BACKEND=redis (REDIS_URL, any
+# Redis-protocol server), file (CACHE_LOCATION directory) or db (run
+# ``manage.py createcachetable``). Without either it falls back to a
+# per-process LocMemCache.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "locmem").lower()
+CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", "300"))  # 5 minutes
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "ie-professors")
+
+if CACHE_BACKEND == "redis":
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.getenv("REDIS_URL", "redis://127.0.0.1:6379/1"),
+    }
+elif CACHE_BACKEND == "file":
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv("CACHE_LOCATION", "/tmp/ie-professors-cache"),
+    }
+elif CACHE_BACKEND == "db":
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': os.getenv("CACHE_LOCATION", "django_cache"),
+    }
+else:
+    _cache = {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         'LOCATION': 'unique-snowflake',
-        'TIMEOUT': 300,  # 5 minutes
         'OPTIONS': {
             'MAX_ENTRIES': 1000,
         }
     }
-}
\ No newline at end of file
+
+CACHES = {
+    'default': {
+        **_cache,
+        'TIMEOUT': CACHE_TIMEOUT,
+        'KEY_PREFIX': CACHE_KEY_PREFIX,
+    }
+}
+
+# View payloads are only cached in a shared cache: a per-process cache would
+# keep serving data another worker has already changed.
+PAYLOAD_CACHE_ENABLED = os.getenv("PAYLOAD_CACHE_ENABLED", str(CACHE_BACKEND != "locmem")).lower() == "true"
+
+# Request instrumentation (RequestInstrumentationMiddleware): a Server-Timing
+# header on every response, and requests slower or chattier than these limits
+# are logged as warnings.
+SERVER_TIMING_HEADER = os.getenv("SERVER_TIMING_HEADER", "True").lower() == "true"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", "50"))
+
+# Bearer token required by /api/metrics/ (open when empty). Under gunicorn the
+# worker metrics are shared through PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Readiness probe: seconds between migration plan checks, and between retries
+# while migrations are pending or the check failed.
+READINESS_MIGRATION_INTERVAL = int(os.getenv("READINESS_MIGRATION_INTERVAL", "300"))
+READINESS_RETRY_INTERVAL = int(os.getenv("READINESS_RETRY_INTERVAL", "10"))
+
+# Server mode: "wsgi" (gunicorn sync workers) or "asgi" (gunicorn with uvicorn
+# workers, see gunicorn.conf.py). ASGI serves the async dashboard views, whose
+# independent queries run concurrently on up to ASYNC_QUERY_THREADS extra
+# connections per process. Persistent connections are not reused safely
+# across ASGI requests, which each run on a new thread, so they are turned off
+# there; the query threads live as long as the process and keep theirs for
+# ASYNC_QUERY_CONN_MAX_AGE seconds (the configured CONN_MAX_AGE).
+SERVER_MODE = os.getenv("SERVER_MODE", "wsgi").lower()
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", str(SERVER_MODE == "asgi")).lower() == "true"
+ASYNC_QUERY_THREADS = int(os.getenv("ASYNC_QUERY_THREADS", "4"))
+ASYNC_QUERY_CONN_MAX_AGE = DATABASES.get('default', {}).get('CONN_MAX_AGE', 0)
+if SERVER_MODE == "asgi":
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 0
+
+# Assignment recommender (university.services.recommend_assignments): sessions
+# a proposal may give a professor in an intake beyond their PDP
+# (minimum_number_of_sessions).
+ASSIGNMENT_EXTRA_SESSIONS = int(os.getenv("ASSIGNMENT_EXTRA_SESSIONS", "0"))
@@ -46,9 +46,10 @@ else:
 " 2>/dev/null || echo "Superuser creation skipped or failed"
 fi
 
-# Start Gunicorn with production settings
+# Start Gunicorn with production settings; the application (WSGI or ASGI)
+# comes from gunicorn.conf.py, following SERVER_MODE
 echo "Starting Gunicorn with ${GUNICORN_WORKERS:-3} workers..."
-exec poetry run gunicorn ie_professor_management.wsgi:application \
+exec poetry run gunicorn \
     --bind 0.0.0.0:8000 \
     --workers "${GUNICORN_WORKERS:-3}" \
     --timeout "${GUNICORN_TIMEOUT:-60}" \
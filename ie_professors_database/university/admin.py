@@ -27,6 +27,8 @@ from unfold.contrib.filters.admin import (
     DropdownFilter,
     AutocompleteSelectMultipleFilter
 )
+from general.paginator import EstimatedCountPaginator
+from university.services import apply_bulk_assignments, recommend_assignments, sessions_taught
 from university.inlines import CourseDeliveryInline, CourseDeliveryForCourseInline, ActiveCourseDeliveryInline
 from university.filters import (
     ProfessorIsNullFilter, 
@@ -61,9 +63,11 @@ class IntakeAdmin(SimpleHistoryAdmin,ModelAdmin,ImportExportModelAdmin):
     export_form_class = ExportForm
     list_display = ("name", "start_time", "end_time", "semester","active")
     search_fields = ("name",)
+    actions = ["assign_recommended_professors"]
     actions_row = ["view_sections_action"]
     list_per_page = 50
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     fieldsets = (
         (None, {
@@ -83,6 +87,23 @@ class IntakeAdmin(SimpleHistoryAdmin,ModelAdmin,ImportExportModelAdmin):
             f"?intake__id__exact={object_id}"
         )
         return redirect(url)
+
+    @admin.action(description=_("Assign recommended professors"), permissions=["change"])
+    def assign_recommended_professors(self, request, queryset):
+        for intake in queryset:
+            recommendation = recommend_assignments(intake)
+            results = apply_bulk_assignments(
+                [
+                    {"delivery_id": proposal["delivery_id"], "professor_id": proposal["professor_id"]}
+                    for proposal in recommendation["proposals"]
+                ],
+                user=request.user,
+                change_reason="Recommended assignment",
+            )
+            assigned = sum(result["status"] == "updated" for result in results)
+            self.message_user(request, _("%(intake)s: %(assigned)d deliveries assigned, %(left)d left without professor.") % {
+                "intake": intake, "assigned": assigned, "left": len(recommendation["unassigned"]),
+            })
     
     def get_urls(self):
         return super().get_urls() + [
@@ -131,6 +152,7 @@ class CourseAdmin(ModelAdmin,TabbedTranslationAdmin,ImportExportModelAdmin,Simpl
     list_filter_submit = True
     list_per_page = 25  # Reduce for better performance with many-to-many relationships
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     fieldsets = (
         (None, {
@@ -197,7 +219,7 @@ class ProfessorAdmin(ModelAdmin,ImportExportModelAdmin,SimpleHistoryAdmin):
     export_form_class = ExportForm
 
     inlines = [ProfessorDegreeInline, ProfessorCoursePossibilityInLine, ActiveCourseDeliveryInline]
-    list_display = ("name","last_name", "email", "get_campuses", "professor_type")
+    list_display = ("name","last_name", "email", "get_campuses", "professor_type", "get_workload")
     search_fields = ("name", "email", "last_name","corporate_email")
     list_filter = [
         "professor_type",
@@ -216,15 +238,25 @@ class ProfessorAdmin(ModelAdmin,ImportExportModelAdmin,SimpleHistoryAdmin):
     list_filter_submit = True
     list_per_page = 50  # Reduce pagination load
     show_full_result_count = False  # Avoid expensive COUNT(*) queries
+    paginator = EstimatedCountPaginator
     
     def get_queryset(self, request):
-        return super().get_queryset(request).prefetch_related(
-            'degrees__degree__university',
+        queryset = super().get_queryset(request).prefetch_related(
+            'degrees__university',
             'courses__area',
             'coursedelivery_set__course',
             'coursedelivery_set__sections__program',
             'coursedelivery_set__sections__intake'
         )
+        resolver_match = getattr(request, 'resolver_match', None)
+        if resolver_match and resolver_match.url_name == f"{self.opts.app_label}_{self.opts.model_name}_changelist":
+            # Only the list shows (and sorts by) the workload, not autocomplete, the change form or delete
+            queryset = queryset.annotate(active_sessions=sessions_taught(active=True))
+        return queryset
+
+    @admin.display(description=_("Sessions / PDP (active intakes)"), ordering="active_sessions")
+    def get_workload(self, obj: Professor):
+        return f"{obj.active_sessions} / {obj.minimum_number_of_sessions}"
 
     def get_campuses(self, obj:Professor):
         if not obj.campuses:
@@ -297,6 +329,7 @@ class CourseDeliveryAdmin(ModelAdmin,SimpleHistoryAdmin,ImportExportModelAdmin):
     list_filter_submit = True
     list_per_page = 25  # Reduce page size for better performance
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
     fieldsets = (
         (None, {
@@ -350,6 +383,7 @@ class ProgramAdmin(ModelAdmin,SimpleHistoryAdmin,ImportExportModelAdmin):
     autocomplete_fields = ["academic_director"]
     list_per_page = 50
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('academic_director')
@@ -363,6 +397,7 @@ class SectionAdmin(ModelAdmin,SimpleHistoryAdmin,ImportExportModelAdmin):
     list_filter = ("campus", "intake")
     list_per_page = 50
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     def get_queryset(self, request):
         return super().get_queryset(request).select_related(
@@ -415,3 +450,4 @@ class JoinedAcademicYearAdmin(ModelAdmin,SimpleHistoryAdmin,ImportExportModelAdm
     search_fields = ["name","start_date"]
     list_per_page = 50
     show_full_result_count = False
+    paginator = EstimatedCountPaginator
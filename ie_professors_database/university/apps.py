@@ -7,6 +7,7 @@ class UniversityConfig(AppConfig):
 
     def ready(self):
         import university.translation  # noqa
+        import university.signals  # noqa
         
         from simple_history import register
         from university.models import Course,Area
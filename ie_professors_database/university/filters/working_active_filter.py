@@ -15,14 +15,14 @@ class WorkingActiveFilter(SimpleListFilter):
 
     def queryset(self, request, queryset):
         if self.value() == 'active':
-            return queryset.filter(sections__intake__active=True).distinct()
+            return queryset.with_section(intake__active=True)
         elif self.value() == 'inactive':
-            return queryset.filter(sections__intake__active=False).distinct()
+            return queryset.with_section(intake__active=False)
         elif self.value() == 'all':
-            return queryset.distinct()
+            return queryset
         else:
             # Default to active when no value is set
-            return queryset.filter(sections__intake__active=True).distinct()
+            return queryset.with_section(intake__active=True)
 
     def choices(self, changelist):
         for lookup, title in self.lookup_choices:
@@ -14,9 +14,9 @@ class ActiveCourseDeliveryInline(TabularInline):
     
     def get_queryset(self, request):
         queryset = super().get_queryset(request)
-        return queryset.filter(
-            sections__intake__active=True
-        ).distinct().select_related('course', 'course__area').prefetch_related('sections__program', 'sections__intake')
+        return queryset.with_section(
+            intake__active=True
+        ).select_related('course', 'course__area').prefetch_related('sections__program', 'sections__intake')
     
     def has_add_permission(self, request, obj=None):
         return False
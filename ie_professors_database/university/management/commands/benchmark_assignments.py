@@ -0,0 +1,34 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from university.models import CourseDelivery, Intake
+from university.services import recommend_assignments
+
+
+class Command(BaseCommand):
+    help = (
+        "Times recommend_assignments on the active intakes (or --intake) of the current database, "
+        "e.g. after generate_synthetic_data --size large. Nothing is written."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--intake", type=int, action="append", help="Intake id (repeatable; default the active intakes).")
+        parser.add_argument("--extra-sessions", type=int, help="Sessions allowed over the PDP (default ASSIGNMENT_EXTRA_SESSIONS).")
+        parser.add_argument("--repeat", type=int, default=3, help="Timed runs per intake (default 3).")
+
+    def handle(self, *args, **options):
+        intakes = Intake.objects.filter(pk__in=options["intake"]) if options["intake"] else Intake.objects.filter(active=True)
+        self.stdout.write(f"  {'intake':<24} {'unassigned':>10} {'proposed':>10} {'left':>8} {'median ms':>10}")
+        for intake in intakes.order_by("start_time", "pk"):
+            pending = CourseDelivery.objects.filter(professor=None).with_section(intake=intake).count()
+            samples = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                recommendation = recommend_assignments(intake, options["extra_sessions"])
+                samples.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"  {intake.name[:24]:<24} {pending:>10} {len(recommendation['proposals']):>10} "
+                f"{len(recommendation['unassigned']):>8} {statistics.median(samples):>10.1f}"
+            )
@@ -0,0 +1,139 @@
+import random
+import statistics
+import time
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from rest_framework import filters
+from rest_framework.request import Request
+
+from api.views import CourseViewSet, ProfessorViewSet, SectionViewSet
+from university.models import Area, Course, Intake, Professor, Program, Section
+
+TRIGRAM_INDEXES = import_module("university.migrations.0056_search_trigram_indexes").TRIGRAM_INDEXES
+
+SYLLABLES = [consonant + vowel for consonant in "bcdfghjlmnprstvz" for vowel in "aeiou"]
+
+# (label, API viewset whose search_fields are measured, term)
+SEARCHES = [
+    ("professor", ProfessorViewSet, "losena"),
+    ("course", CourseViewSet, "lebici"),
+    ("section", SectionViewSet, "BADE"),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures icontains search latency on professors, courses and sections with and "
+        "without the trigram indexes. Synthetic rows and index drops are rolled back at the end, "
+        "but the tables are locked while it runs: use a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=50_000, help="Synthetic rows per table (default 50000).")
+        parser.add_argument("--repeat", type=int, default=15, help="Timed runs per query (default 15).")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("The trigram indexes only exist on PostgreSQL; nothing to benchmark.")
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_indexes WHERE indexname = %s", [TRIGRAM_INDEXES[0][0]])
+            if cursor.fetchone() is None:
+                raise CommandError("The trigram indexes are missing: migrate on a server with pg_trgm available.")
+
+        self.rng = random.Random(options["seed"])
+        try:
+            with transaction.atomic():
+                self.populate(options["rows"])
+                indexed = self.measure(options["repeat"])
+                with connection.cursor() as cursor:
+                    for name, _, _ in TRIGRAM_INDEXES:
+                        cursor.execute(f'DROP INDEX IF EXISTS "{name}"')
+                plain = self.measure(options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(f"{'search':<10} {'plan (indexed)':<18} {'indexed ms':>11} {'seq scan ms':>12} {'rows':>7}")
+        for label, *_ in SEARCHES:
+            (plan, indexed_ms, rows), (_, plain_ms, _) = indexed[label], plain[label]
+            self.stdout.write(f"{label:<10} {plan:<18} {indexed_ms:>11.2f} {plain_ms:>12.2f} {rows:>7}")
+
+    def word(self, syllables=3):
+        return "".join(self.rng.choice(SYLLABLES) for _ in range(syllables))
+
+    def populate(self, rows):
+        intake = Intake.objects.create(
+            name=f"benchmark-{self.rng.random()}", start_time="2000-01-01", end_time="2000-06-30", semester="fall",
+        )
+        # The course and section searches also match the area and program names
+        areas = Area.objects.bulk_create([Area(name=self.word().title()) for _ in range(100)])
+        programs = Program.objects.bulk_create(
+            [Program(name=self.word(4).title(), code=f"BP{i:05d}") for i in range(100)]
+        )
+        Professor.objects.bulk_create(
+            [
+                Professor(
+                    name=self.word().title(),
+                    last_name=f"{self.word().title()} {self.word().title()}",
+                    email=f"{self.word()}.{i}@example.com",
+                    corporate_email=f"bench{i}@ie.example",
+                    campuses=[],
+                    availabilities=[],
+                )
+                for i in range(rows)
+            ],
+            batch_size=5000,
+        )
+        Course.objects.bulk_create(
+            [
+                Course(
+                    code=f"B{i:08d}", name_en=self.word(4).title(), name_es=self.word(4).title(), credits=6, sessions=30,
+                    area=self.rng.choice(areas),
+                )
+                for i in range(rows)
+            ],
+            batch_size=5000,
+        )
+        Section.objects.bulk_create(
+            [
+                Section(name=f"{self.word(2).upper()}-{i}", intake=intake, campus="Segovia", program=self.rng.choice(programs))
+                for i in range(rows)
+            ],
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            # VACUUM cannot run in a transaction: flush the GIN pending lists by hand
+            for name, _, _ in TRIGRAM_INDEXES:
+                cursor.execute("SELECT gin_clean_pending_list(%s::regclass)", [name])
+            for model in (Professor, Course, Section, Area, Program):
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+    def measure(self, repeat):
+        results = {}
+        for label, viewset, term in SEARCHES:
+            plan = self.search(viewset, term).explain()
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                # What a paginated list does: filter, a count and the first page
+                queryset = self.search(viewset, term)
+                rows = queryset.count()
+                list(queryset.order_by("pk")[:50])
+                timings.append((time.perf_counter() - started) * 1000)
+            kind = "bitmap index scan" if "Bitmap Index Scan" in plan else "seq scan"
+            results[label] = (kind, statistics.median(timings), rows)
+        return results
+
+    def search(self, viewset, term):
+        """``?search=term`` through the viewset's own search backend and ``search_fields``."""
+        backend = next(backend for backend in viewset.filter_backends if issubclass(backend, filters.SearchFilter))
+        request = Request(RequestFactory().get("/", {"search": term}))
+        return backend().filter_queryset(request, viewset.queryset.model.objects.all(), viewset())
@@ -0,0 +1,128 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from university.models import Course, CourseDelivery, Intake, Program, Section
+from university.services import overview_deliveries
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the \"has a section matching\" filters as JOIN + DISTINCT and as EXISTS "
+        "(CourseDelivery.objects.with_section) on synthetic deliveries. The rows are rolled "
+        "back at the end: use a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--deliveries", type=int, default=50_000, help="Synthetic deliveries (default 50000).")
+        parser.add_argument("--repeat", type=int, default=9, help="Timed runs per query (default 9).")
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options["seed"])
+        try:
+            with transaction.atomic():
+                self.populate(options["deliveries"])
+                self.report(options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def populate(self, count):
+        intakes = [
+            Intake.objects.create(
+                name=f"benchmark-{index}-{self.rng.random()}",
+                start_time=f"{2000 + index}-09-01",
+                end_time=f"{2001 + index}-01-31",
+                semester="fall" if index % 2 else "spring",
+                active=index >= 8,
+            )
+            for index in range(10)
+        ]
+        programs = Program.objects.bulk_create(
+            [Program(name=f"Benchmark {index}", school="business", code=f"BM{self.rng.randrange(10**6)}")
+             for index in range(10)]
+        )
+        sections = Section.objects.bulk_create(
+            [
+                Section(name=f"S{index}", intake=intake, program=program, campus="Segovia", course_year=1 + index % 4)
+                for intake in intakes for program in programs for index in range(20)
+            ]
+        )
+        courses = Course.objects.bulk_create(
+            [Course(code=f"BM{index:06d}", name=f"Benchmark {index}", credits=6, sessions=30) for index in range(500)]
+        )
+        deliveries = CourseDelivery.objects.bulk_create(
+            [CourseDelivery(course=self.rng.choice(courses)) for _ in range(count)], batch_size=5000,
+        )
+        link = CourseDelivery.sections.through
+        links = []
+        for delivery in deliveries:
+            # Deliveries are shared by a few sections of the same intake and program
+            first = self.rng.randrange(len(sections) // 20) * 20
+            for offset in self.rng.sample(range(20), 3):
+                links.append(link(coursedelivery_id=delivery.pk, section_id=sections[first + offset].pk))
+        link.objects.bulk_create(links, batch_size=10000)
+
+        self.sections = sections
+        self.active_intake, self.program = intakes[-1], programs[0]
+        with connection.cursor() as cursor:
+            for model in (Intake, Program, Section, Course, CourseDelivery, link):
+                cursor.execute(f'ANALYZE "{model._meta.db_table}"')
+
+    def cases(self):
+        base = CourseDelivery.objects.select_related("course", "professor").prefetch_related(None).order_by("-created_at")
+        section_ids = [section.pk for section in self.sections[-40:]]
+        yield (
+            "admin active filter",
+            25,
+            base.filter(sections__intake__active=True).distinct(),
+            base.with_section(intake__active=True),
+        )
+        yield (
+            "api sections__in",
+            50,
+            base.filter(sections__in=section_ids).distinct(),
+            base.with_section(id__in=section_ids),
+        )
+        # The delivery overview rows: every section link of the matching deliveries
+        links = CourseDelivery.sections.through.objects.order_by("coursedelivery_id", "section_id")
+        yield (
+            "overview rows",
+            10**6,
+            links.filter(coursedelivery_id__in=CourseDelivery.objects
+                         .filter(sections__program_id=self.program.pk)
+                         .filter(sections__intake_id=self.active_intake.pk)
+                         .filter(sections__intake__semester=self.active_intake.semester)
+                         .values("pk")),
+            links.filter(coursedelivery_id__in=overview_deliveries(
+                self.program.pk, self.active_intake.pk, self.active_intake.semester,
+            ).values("pk")),
+        )
+
+    def report(self, repeat):
+        self.stdout.write(f"{'query':<22} {'join+distinct ms':>17} {'exists ms':>10} {'rows':>7}")
+        for label, page_size, legacy, exists in self.cases():
+            legacy_ms, legacy_rows = self.measure(legacy, page_size, repeat)
+            exists_ms, exists_rows = self.measure(exists, page_size, repeat)
+            if legacy_rows != exists_rows:
+                self.stderr.write(f"{label}: {legacy_rows} rows with JOIN + DISTINCT, {exists_rows} with EXISTS")
+            self.stdout.write(f"{label:<22} {legacy_ms:>17.2f} {exists_ms:>10.2f} {exists_rows:>7}")
+
+    @staticmethod
+    def measure(queryset, page_size, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = queryset.count()
+            # A changelist / API page: the count plus the first page
+            list(queryset[:page_size])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), rows
@@ -0,0 +1,54 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from university.models import Intake
+from university.services.synthetic_data import SIZES, generate_synthetic_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Fills the database with a seeded synthetic population (universities, programs, intakes, sections, "
+        "courses, professors with degrees and course possibilities, and deliveries) for load and scale testing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", choices=sorted(SIZES), default="medium", help="Preset to start from (default medium).")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--tag", default="SYN", help="Prefix of every unique name and code (default SYN, max 4 characters).")
+        parser.add_argument("--professors", type=int)
+        parser.add_argument("--programs", type=int)
+        parser.add_argument("--intakes", type=int)
+        parser.add_argument("--active-intakes", type=int)
+        parser.add_argument("--courses-per-year", type=int)
+        parser.add_argument("--sections-per-campus", type=int)
+        parser.add_argument("--possibilities-per-professor", type=int)
+        parser.add_argument("--unassigned-rate", type=float, help="Share of deliveries left without professor (0-1).")
+
+    def handle(self, *args, **options):
+        if len(options["tag"]) > 4:
+            raise CommandError("--tag can be at most 4 characters long (course codes are limited to 10).")
+        if Intake.objects.filter(name__startswith=f"{options['tag']} ").exists():
+            raise CommandError(f"There is already synthetic data tagged {options['tag']!r}; pick another --tag.")
+        unassigned_rate = options["unassigned_rate"]
+        if unassigned_rate is not None and not 0 <= unassigned_rate <= 1:
+            raise CommandError("--unassigned-rate must be between 0 and 1.")
+
+        parameters = dict(SIZES[options["size"]])
+        for name in (
+            "professors", "programs", "intakes", "active_intakes", "courses_per_year", "sections_per_campus",
+            "possibilities_per_professor", "unassigned_rate",
+        ):
+            if options[name] is not None:
+                parameters[name] = options[name]
+
+        started = time.monotonic()
+        counts = generate_synthetic_data(
+            seed=options["seed"], tag=options["tag"], log=self.stdout.write if options["verbosity"] > 1 else None,
+            **parameters,
+        )
+        for label, count in counts.items():
+            self.stdout.write(f"  {label}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {sum(counts.values())} rows in {time.monotonic() - started:.1f}s."
+        ))
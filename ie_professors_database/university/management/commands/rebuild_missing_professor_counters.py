@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from university.models import Intake, IntakeProgramCounter, Section
+from university.services import refresh_missing_professor_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the missing-professor counters of sections, intakes and programs within intakes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--intake",
+            type=int,
+            action="append",
+            dest="intakes",
+            help="Only rebuild the counters of this intake id (repeatable).",
+        )
+
+    def handle(self, *args, **options):
+        intake_ids = options["intakes"]
+        if intake_ids:
+            section_ids = Section.objects.filter(intake_id__in=intake_ids).values_list("pk", flat=True)
+            refresh_missing_professor_counters(section_ids=list(section_ids), intake_ids=intake_ids)
+        else:
+            refresh_missing_professor_counters()
+
+        intakes = Intake.objects.filter(pk__in=intake_ids) if intake_ids else Intake.objects.all()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt counters for {intakes.count()} intake(s) and "
+            f"{IntakeProgramCounter.objects.filter(intake__in=intakes).count()} program row(s)."
+        ))
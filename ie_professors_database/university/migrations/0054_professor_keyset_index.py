@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0053_add_performance_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='professor',
+            index=models.Index(fields=['last_name', 'name', 'id'], name='university__last_na_21949f_idx'),
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.6 on 2026-10-17 01:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def rebuild_counters(apps, schema_editor):
+    Section = apps.get_model('university', 'Section')
+    Intake = apps.get_model('university', 'Intake')
+    IntakeProgramCounter = apps.get_model('university', 'IntakeProgramCounter')
+    Through = apps.get_model('university', 'CourseDelivery').sections.through
+
+    def unassigned(group_by, distinct=False):
+        return Coalesce(Subquery(
+            Through.objects.filter(coursedelivery__professor__isnull=True, **{group_by: OuterRef('pk')})
+            .values(group_by).annotate(total=Count('coursedelivery_id', distinct=distinct)).values('total')
+        ), 0)
+
+    Section.objects.update(missing_professors=unassigned('section_id'))
+    Intake.objects.update(missing_professors=unassigned('section__intake_id', distinct=True))
+    IntakeProgramCounter.objects.bulk_create([
+        IntakeProgramCounter(intake_id=row['intake_id'], program_id=row['program_id'], missing_professors=row['total'])
+        for row in Section.objects.filter(program__isnull=False).values('intake_id', 'program_id')
+        .annotate(total=Sum('missing_professors')).order_by()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('university', '0054_professor_keyset_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IntakeProgramCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('missing_professors', models.PositiveIntegerField(default=0, verbose_name='Missing Professors')),
+            ],
+            options={
+                'verbose_name': 'Intake Program Counter',
+                'verbose_name_plural': 'Intake Program Counters',
+            },
+        ),
+        migrations.AddField(
+            model_name='historicalcurrentintake',
+            name='missing_professors',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Missing Professors'),
+        ),
+        migrations.AddField(
+            model_name='historicalintake',
+            name='missing_professors',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Missing Professors'),
+        ),
+        migrations.AddField(
+            model_name='historicalsection',
+            name='missing_professors',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Missing Professors'),
+        ),
+        migrations.AddField(
+            model_name='intake',
+            name='missing_professors',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Missing Professors'),
+        ),
+        migrations.AddField(
+            model_name='section',
+            name='missing_professors',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Missing Professors'),
+        ),
+        migrations.AddIndex(
+            model_name='section',
+            index=models.Index(fields=['intake', 'missing_professors'], name='university__intake__029b88_idx'),
+        ),
+        migrations.AddField(
+            model_name='intakeprogramcounter',
+            name='intake',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='university.intake', verbose_name='Intake'),
+        ),
+        migrations.AddField(
+            model_name='intakeprogramcounter',
+            name='program',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='university.program', verbose_name='Program'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='intakeprogramcounter',
+            unique_together={('intake', 'program')},
+        ),
+        migrations.RunPython(rebuild_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,53 @@
+from django.db import migrations
+
+# (index name, table, column) for the fields behind the API and admin
+# search_fields. The expression matches what ``icontains`` compiles to on
+# PostgreSQL, ``UPPER(column::text) LIKE UPPER('%term%')``, so those searches
+# can use the index instead of scanning the table.
+TRIGRAM_INDEXES = [
+    ("university_professor_name_trgm", "university_professor", "name"),
+    ("university_professor_last_name_trgm", "university_professor", "last_name"),
+    ("university_professor_email_trgm", "university_professor", "email"),
+    ("university_professor_corporate_email_trgm", "university_professor", "corporate_email"),
+    ("university_course_code_trgm", "university_course", "code"),
+    ("university_course_name_trgm", "university_course", "name"),
+    ("university_course_name_en_trgm", "university_course", "name_en"),
+    ("university_course_name_es_trgm", "university_course", "name_es"),
+    ("university_section_name_trgm", "university_section", "name"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            # Servers built without contrib keep searching with sequential scans
+            return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+            f'ON "{table}" USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('university', '0055_missing_professor_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
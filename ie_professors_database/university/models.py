@@ -24,6 +24,7 @@ class Intake(BaseModel):
     end_time = models.DateField(_("End Time"))
     semester = models.CharField(_("Semester"), max_length=10,choices=SemesterType.choices)
     active = models.BooleanField(_("Active"),default=True)
+    missing_professors = models.PositiveIntegerField(_("Missing Professors"), default=0, editable=False)
 
     def __str__(self):
         return f"{self.start_time} - {self.end_time} - {self.get_semester_display()}"
@@ -122,6 +123,7 @@ class Section(BaseModel):
     course_year = models.SmallIntegerField(_("Course Year"), default=1)
     program = models.ForeignKey(Program, verbose_name=_("Program"), on_delete=models.CASCADE, null=True, blank=True)
     joined_academic_year = models.ForeignKey(JoinedAcademicYear, verbose_name=_("Intake"),null=True,on_delete=models.CASCADE)
+    missing_professors = models.PositiveIntegerField(_("Missing Professors"), default=0, editable=False)
 
     def __str__(self):
         joined_year = self.joined_academic_year.name if self.joined_academic_year else "No Academic Year"
@@ -138,8 +140,23 @@ class Section(BaseModel):
             models.Index(fields=["intake", "program"]),
             models.Index(fields=["program", "course_year"]),
             models.Index(fields=["campus", "course_year"]),
+            models.Index(fields=["intake", "missing_professors"]),
         ]
 
+class IntakeProgramCounter(models.Model):
+    """Course deliveries without professor per program within an intake, kept up to date by signals."""
+    intake = models.ForeignKey(Intake, verbose_name=_("Intake"), on_delete=models.CASCADE)
+    program = models.ForeignKey(Program, verbose_name=_("Program"), on_delete=models.CASCADE)
+    missing_professors = models.PositiveIntegerField(_("Missing Professors"), default=0)
+
+    def __str__(self):
+        return f"{self.intake} - {self.program}"
+
+    class Meta:
+        unique_together = ("intake", "program")
+        verbose_name = _("Intake Program Counter")
+        verbose_name_plural = _("Intake Program Counters")
+
 class University(BaseModel):
     name = models.CharField(_("Name"), max_length=255, unique=True)
     country = CountryField(_("Country"))
@@ -209,6 +226,9 @@ class Professor(BaseModel):
     class Meta:
         verbose_name = _("Professor")
         verbose_name_plural = _("Professors")
+        indexes = [
+            models.Index(fields=["last_name", "name", "id"]),
+        ]
     
 class ProfessorDegree(BaseModel):
     professor = models.ForeignKey(Professor, verbose_name=_("Professor"), on_delete=models.CASCADE)
@@ -234,7 +254,25 @@ class ProfessorCoursePossibility(BaseModel):
         return f"{self.professor} - {self.course}"
 
 
-class CourseDeliveryManager(models.Manager):
+class CourseDeliveryQuerySet(models.QuerySet):
+    def with_section(self, **lookups):
+        """
+        Deliveries with at least one section matching all of ``lookups``
+        (Section lookups, e.g. ``intake__active=True``).
+
+        Compiled to a correlated ``EXISTS`` on the sections link table, so unlike
+        a ``sections__...`` filter it does not repeat a delivery per matching
+        section and needs no ``distinct()``. Chained calls may match different
+        sections, like chained ``filter()`` calls on a many-to-many relation.
+        """
+        links = CourseDelivery.sections.through.objects.filter(
+            coursedelivery_id=models.OuterRef('pk'),
+            **{f'section__{lookup}': value for lookup, value in lookups.items()},
+        )
+        return self.filter(models.Exists(links))
+
+
+class CourseDeliveryManager(models.Manager.from_queryset(CourseDeliveryQuerySet)):
     def get_queryset(self):
         return super().get_queryset().select_related('course', 'professor').prefetch_related('sections')
     
@@ -0,0 +1,8 @@
+from .bulk_assignment import apply_bulk_assignments
+from .program_delivery import program_section_deliveries
+from .delivery_overview import delivery_overview, overview_deliveries
+from .missing_professors import refresh_missing_professor_counters
+from .synthetic_data import generate_synthetic_data
+from .assignment import recommend_assignments
+from .workload import professor_workload, sessions_taught, workload_deliveries
+from .conflicts import find_conflicts
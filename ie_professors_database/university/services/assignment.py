@@ -0,0 +1,191 @@
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+
+from university.models import CourseDelivery, Professor, ProfessorCoursePossibility
+
+from .conflicts import time_slots
+
+NO_CANDIDATES = "no_candidates"
+NO_CAPACITY = "no_capacity"
+
+
+class _Professor:
+    """Load of one candidate professor in the intake while the matching is built."""
+
+    __slots__ = ("pk", "campuses", "slots", "minimum", "limit", "load", "used", "held")
+
+    def __init__(self, pk, campuses, availabilities, minimum, load, used, extra_sessions):
+        self.pk = pk
+        self.campuses = frozenset(campuses or ())
+        # One campus per time slot, as find_conflicts checks
+        self.slots = len(time_slots(availabilities))
+        self.minimum = minimum
+        self.limit = minimum + extra_sessions
+        self.load = load
+        self.used = used
+        self.held = {}  # Proposed deliveries, in proposal order
+
+    def fits(self, delivery, without=None):
+        """Whether the professor can take ``delivery``, after giving up ``without`` if set."""
+        load = self.load + delivery.sessions
+        used = self.used
+        if without is not None:
+            load -= without.sessions
+            used = used - Counter(without.campuses)
+        if load > self.limit:
+            return False
+        return len(delivery.campuses.union(+used)) <= self.slots
+
+    def cost(self, delivery):
+        """Sessions over the PDP, then the PDP gap left open: lower is better."""
+        gap = max(self.minimum - self.load, 0)
+        return max(delivery.sessions - gap, 0), -gap, self.pk
+
+    def take(self, delivery):
+        self.load += delivery.sessions
+        self.used.update(delivery.campuses)
+        self.held[delivery] = None
+
+    def give(self, delivery):
+        self.load -= delivery.sessions
+        self.used.subtract(delivery.campuses)
+        del self.held[delivery]
+
+
+class _Delivery:
+    __slots__ = ("pk", "course_id", "sessions", "campuses", "candidates", "professor")
+
+    def __init__(self, pk, course_id, sessions):
+        self.pk = pk
+        self.course_id = course_id
+        self.sessions = sessions or 0
+        self.campuses = set()
+        self.candidates = []
+        self.professor = None
+
+
+def recommend_assignments(intake, extra_sessions=None):
+    """
+    Proposes a professor for every delivery of ``intake`` without one and
+    returns ``{'proposals': [...], 'unassigned': [...]}``.
+
+    Each delivery is matched to one of the professors who can teach its course
+    (``ProfessorCoursePossibility``) and work on the campus of every section of
+    the intake it is delivered to. A professor is given at most their PDP
+    (``minimum_number_of_sessions``) plus ``extra_sessions`` sessions in the
+    intake, counting what they already teach there, and at most one campus per
+    declared availability (time slot). Within those limits the assignment
+    costs the sessions it puts a professor over their PDP, so the professors
+    furthest below it are filled first.
+
+    With sessions as capacities the exact optimum is a generalised assignment
+    problem, so the matching is built like a min-cost flow by successive
+    augmenting paths: most constrained delivery first, each takes its
+    cheapest professor with room left, and when none has room a breadth-first
+    path (each professor at most once) moves earlier proposals on to other
+    professors to make room.
+
+    The intake is read in three queries and nothing is written: apply the
+    proposals with ``apply_bulk_assignments``.
+    """
+    intake_id = getattr(intake, "pk", intake)
+    if extra_sessions is None:
+        extra_sessions = settings.ASSIGNMENT_EXTRA_SESSIONS
+
+    deliveries = {}
+    load = Counter()
+    used = defaultdict(Counter)
+    taught = set()
+    links = CourseDelivery.sections.through.objects.filter(section__intake_id=intake_id).values_list(
+        "coursedelivery_id", "coursedelivery__professor_id", "coursedelivery__course_id",
+        "coursedelivery__course__sessions", "section__campus",
+    )
+    for delivery_id, professor_id, course_id, sessions, campus in links.iterator(chunk_size=5000):
+        if professor_id is None:
+            delivery = deliveries.get(delivery_id) or deliveries.setdefault(
+                delivery_id, _Delivery(delivery_id, course_id, sessions)
+            )
+            delivery.campuses.add(campus)
+            continue
+        if (delivery_id, professor_id) not in taught:
+            taught.add((delivery_id, professor_id))
+            load[professor_id] += sessions or 0
+        used[professor_id][campus] += 1
+
+    course_professors = defaultdict(list)
+    for course_id, professor_id in ProfessorCoursePossibility.objects.filter(
+        course_id__in={delivery.course_id for delivery in deliveries.values()}
+    ).values_list("course_id", "professor_id").order_by("course_id", "professor_id"):
+        course_professors[course_id].append(professor_id)
+
+    professors = {
+        pk: _Professor(pk, campuses, availabilities, minimum, load[pk], +used[pk], extra_sessions)
+        for pk, campuses, availabilities, minimum in Professor.objects.filter(
+            pk__in={pk for pks in course_professors.values() for pk in pks}
+        ).values_list("pk", "campuses", "availabilities", "minimum_number_of_sessions")
+    }
+    for delivery in deliveries.values():
+        delivery.candidates = [
+            professors[pk] for pk in course_professors[delivery.course_id]
+            if delivery.campuses <= professors[pk].campuses
+        ]
+
+    unassigned = []
+    for delivery in sorted(deliveries.values(), key=lambda d: (len(d.candidates), -d.sessions, d.pk)):
+        if not delivery.candidates:
+            unassigned.append({"delivery_id": delivery.pk, "reason": NO_CANDIDATES})
+            continue
+        free = [professor for professor in delivery.candidates if professor.fits(delivery)]
+        if free:
+            _assign(delivery, min(free, key=lambda professor: professor.cost(delivery)))
+        elif not _augment(delivery):
+            unassigned.append({"delivery_id": delivery.pk, "reason": NO_CAPACITY})
+
+    proposals = [
+        {
+            "delivery_id": delivery.pk,
+            "professor_id": delivery.professor.pk,
+            "course_id": delivery.course_id,
+            "sessions": delivery.sessions,
+            "campuses": sorted(delivery.campuses),
+        }
+        for delivery in sorted(deliveries.values(), key=lambda d: d.pk)
+        if delivery.professor is not None
+    ]
+    unassigned.sort(key=lambda item: item["delivery_id"])
+    return {"proposals": proposals, "unassigned": unassigned}
+
+
+def _assign(delivery, professor):
+    if delivery.professor is not None:
+        delivery.professor.give(delivery)
+    professor.take(delivery)
+    delivery.professor = professor
+
+
+def _augment(root):
+    """
+    Finds a chain ``root -> P1 (gives up d1) -> d1 -> P2 ... -> Pk`` where Pk
+    has room for the last delivery, and shifts the proposals along it.
+    """
+    previous = {root: None}
+    visited = set()
+    queue = deque([root])
+    while queue:
+        delivery = queue.popleft()
+        for professor in delivery.candidates:
+            if professor.pk in visited:
+                continue
+            visited.add(professor.pk)
+            if professor.fits(delivery):
+                while delivery is not None:
+                    holder = delivery.professor
+                    _assign(delivery, professor)
+                    delivery, professor = previous[delivery], holder
+                return True
+            for held in professor.held:
+                if held not in previous and professor.fits(delivery, without=held):
+                    previous[held] = delivery
+                    queue.append(held)
+    return False
@@ -0,0 +1,123 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from university.models import CourseDelivery, Professor, Section
+
+from .missing_professors import refresh_missing_professor_counters
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+ERROR = "error"
+
+
+def apply_bulk_assignments(items, user=None, change_reason="Bulk assignment"):
+    """
+    Applies a batch of ``{delivery_id, professor_id, sections_ids}`` items in one
+    transaction and returns one ``{delivery_id, status[, errors]}`` result per item.
+
+    ``professor_id`` (``None`` unassigns) and ``sections_ids`` (replaces the set)
+    are optional: a missing key leaves that part of the delivery untouched.
+    The changed deliveries are written with a single UPDATE, sections with a
+    single DELETE and a single bulk INSERT on the through table, and the
+    history rows with one bulk INSERT. The missing-professor counters of the
+    touched sections are refreshed once. Invalid items are reported and skipped.
+    """
+    items = list(items)
+    Through = CourseDelivery.sections.through
+
+    with transaction.atomic():
+        delivery_ids = {item["delivery_id"] for item in items}
+        deliveries = (
+            CourseDelivery.objects.select_related(None).prefetch_related(None)
+            .select_for_update()
+            .in_bulk(delivery_ids)
+        )
+        professor_ids = {item["professor_id"] for item in items if item.get("professor_id") is not None}
+        known_professors = set(Professor.objects.filter(pk__in=professor_ids).values_list("pk", flat=True))
+        section_ids = {pk for item in items for pk in item.get("sections_ids") or ()}
+        known_sections = set(Section.objects.filter(pk__in=section_ids).values_list("pk", flat=True))
+
+        current_sections = defaultdict(dict)
+        for row_id, delivery_id, section_id in Through.objects.filter(
+            coursedelivery_id__in=list(deliveries)
+        ).values_list("id", "coursedelivery_id", "section_id"):
+            current_sections[delivery_id][section_id] = row_id
+
+        results = []
+        seen = set()
+        rows_to_delete, rows_to_add = [], []
+        changed = {}
+
+        for item in items:
+            delivery_id = item["delivery_id"]
+            result = {"delivery_id": delivery_id, "status": UNCHANGED}
+            results.append(result)
+
+            errors = _validate(item, deliveries, known_professors, known_sections, seen)
+            seen.add(delivery_id)
+            if errors:
+                result.update(status=ERROR, errors=errors)
+                continue
+
+            delivery = deliveries[delivery_id]
+            if "professor_id" in item and item["professor_id"] != delivery.professor_id:
+                delivery.professor_id = item["professor_id"]
+                changed[delivery_id] = delivery
+
+            if item.get("sections_ids") is not None:
+                existing = current_sections[delivery_id]
+                wanted = set(item["sections_ids"])
+                removed = [row_id for section_id, row_id in existing.items() if section_id not in wanted]
+                added = [section_id for section_id in wanted if section_id not in existing]
+                if removed or added:
+                    rows_to_delete += removed
+                    rows_to_add += [Through(coursedelivery_id=delivery_id, section_id=pk) for pk in added]
+                    changed[delivery_id] = delivery
+
+            if delivery_id in changed:
+                result["status"] = UPDATED
+
+        now = timezone.now()
+        for delivery in changed.values():
+            delivery.updated_at = now
+        if changed:
+            CourseDelivery.objects.bulk_update(changed.values(), ["professor", "updated_at"])
+        if rows_to_delete:
+            Through.objects.filter(pk__in=rows_to_delete).delete()
+        if rows_to_add:
+            Through.objects.bulk_create(rows_to_add)
+
+        if changed:
+            # The UPDATE above bypasses the signals that maintain the counters
+            touched_sections = {pk for delivery_id in changed for pk in current_sections[delivery_id]}
+            touched_sections |= {row.section_id for row in rows_to_add}
+            refresh_missing_professor_counters(section_ids=touched_sections)
+
+        if changed:
+            CourseDelivery.history.bulk_history_create(
+                list(changed.values()),
+                update=True,
+                default_user=user,
+                default_change_reason=change_reason,
+                default_date=now,
+            )
+
+    return results
+
+
+def _validate(item, deliveries, known_professors, known_sections, seen):
+    errors = {}
+    delivery_id = item["delivery_id"]
+    if delivery_id in seen:
+        errors["delivery_id"] = "Duplicated in this batch."
+    elif delivery_id not in deliveries:
+        errors["delivery_id"] = "Course delivery not found."
+    professor_id = item.get("professor_id")
+    if professor_id is not None and professor_id not in known_professors:
+        errors["professor_id"] = "Professor not found."
+    missing = sorted(set(item.get("sections_ids") or ()) - known_sections)
+    if missing:
+        errors["sections_ids"] = f"Sections not found: {', '.join(map(str, missing))}."
+    return errors
@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+from university.models import AvailabilityChoices, CourseDelivery, Intake, Professor
+
+
+def time_slots(availabilities):
+    """
+    The time slots a professor can teach in, in choice order. Undeclared
+    availability counts as the morning slot, as in the delivery overview.
+    """
+    declared = set(availabilities or ())
+    return [slot for slot in AvailabilityChoices.values if slot in declared] or [AvailabilityChoices.MORNING.value]
+
+
+def find_conflicts(intakes=None, professors=None):
+    """
+    Professors double-booked in an intake: teaching on more campuses there
+    than they have time slots, so two campuses share a slot.
+
+    ``intakes`` and ``professors`` (ids or querysets) narrow the check, e.g.
+    to the professors of a bulk assignment. Every delivery/section link in
+    scope is read in one query and grouped in one pass into a
+    ``(professor, intake) -> campus -> deliveries`` hash index; only the
+    professors on more than one campus are then looked up. Returns one entry
+    per professor and intake, ordered by intake and professor name.
+    """
+    lookups = {'coursedelivery__professor__isnull': False}
+    if intakes is not None:
+        lookups['section__intake__in'] = intakes
+    if professors is not None:
+        lookups['coursedelivery__professor__in'] = professors
+
+    placements = defaultdict(lambda: defaultdict(set))
+    links = CourseDelivery.sections.through.objects.filter(**lookups).values_list(
+        'coursedelivery__professor_id', 'section__intake_id', 'section__campus', 'coursedelivery_id',
+    )
+    for professor_id, intake_id, campus, delivery_id in links.iterator(chunk_size=5000):
+        placements[professor_id, intake_id][campus].add(delivery_id)
+
+    spread = {key: campuses for key, campuses in placements.items() if len(campuses) > 1}
+    if not spread:
+        return []
+    professor_rows = {
+        pk: (f"{name} {last_name}", time_slots(availabilities))
+        for pk, name, last_name, availabilities in Professor.objects.filter(
+            pk__in={professor_id for professor_id, _ in spread}
+        ).values_list('pk', 'name', 'last_name', 'availabilities')
+    }
+    intake_names = dict(
+        Intake.objects.filter(pk__in={intake_id for _, intake_id in spread}).values_list('pk', 'name')
+    )
+
+    conflicts = []
+    for (professor_id, intake_id), campuses in spread.items():
+        professor_name, slots = professor_rows[professor_id]
+        if len(campuses) <= len(slots):
+            continue
+        conflicts.append({
+            'professor_id': professor_id,
+            'professor_name': professor_name,
+            'intake_id': intake_id,
+            'intake_name': intake_names[intake_id],
+            'slots': slots,
+            'campuses': [
+                {'campus': campus, 'delivery_ids': sorted(campuses[campus])}
+                for campus in sorted(campuses, key=lambda campus: (-len(campuses[campus]), campus))
+            ],
+        })
+    conflicts.sort(key=lambda conflict: (conflict['intake_id'], conflict['professor_name'], conflict['professor_id']))
+    return conflicts
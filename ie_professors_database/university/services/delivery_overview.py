@@ -0,0 +1,160 @@
+from django.db.models import F
+from django.utils.encoding import force_str
+
+from university.models import (
+    AvailabilityChoices, CampusChoices, CourseDelivery, CourseTypes, ProfessorType, SemesterType,
+)
+from university.translation import localized
+
+ROW_CHUNK_SIZE = 2000
+
+
+def _choice_labels(choices):
+    return {value: force_str(label) for value, label in choices.choices}
+
+
+def overview_deliveries(program_id=None, intake_id=None, semester=None):
+    """
+    Deliveries shown in the overview: those with a course and, for each filter,
+    at least one section matching it.
+    """
+    deliveries = CourseDelivery.objects.filter(course__isnull=False)
+    if program_id:
+        deliveries = deliveries.with_section(program_id=program_id)
+    if intake_id:
+        deliveries = deliveries.with_section(intake_id=intake_id)
+    if semester:
+        deliveries = deliveries.with_section(intake__semester=semester)
+    return deliveries
+
+
+def delivery_overview_rows(program_id=None, intake_id=None, semester=None):
+    """
+    One flat row per (delivery, section) pair, ordered by year, section and course.
+
+    A delivery matches when any of its sections matches each filter; all of its
+    sections are then listed. Deliveries without a course are left out.
+    """
+    rows = CourseDelivery.sections.through.objects.all()
+    if program_id or intake_id or semester:
+        deliveries = overview_deliveries(program_id, intake_id, semester)
+        rows = rows.filter(coursedelivery_id__in=deliveries.values('pk'))
+    else:
+        rows = rows.filter(coursedelivery__course__isnull=False)
+
+    return (
+        rows
+        .order_by(
+            'section__course_year', 'section__name', 'section__campus', 'section__intake_id',
+            'coursedelivery__course__code', 'coursedelivery_id',
+        )
+        .values(
+            delivery_id=F('coursedelivery_id'),
+            year=F('section__course_year'),
+            section_name=F('section__name'),
+            campus=F('section__campus'),
+            intake_id=F('section__intake_id'),
+            intake_name=F('section__intake__name'),
+            semester=F('section__intake__semester'),
+            program_id=F('section__program_id'),
+            program_name=F('section__program__name'),
+            program_code=F('section__program__code'),
+            course_id=F('coursedelivery__course_id'),
+            course_code=F('coursedelivery__course__code'),
+            course_name=localized('coursedelivery__course__name'),
+            course_type=F('coursedelivery__course__course_type'),
+            credits=F('coursedelivery__course__credits'),
+            sessions=F('coursedelivery__course__sessions'),
+            area_id=F('coursedelivery__course__area_id'),
+            area_name=localized('coursedelivery__course__area__name'),
+            professor_id=F('coursedelivery__professor_id'),
+            professor_name=F('coursedelivery__professor__name'),
+            professor_last_name=F('coursedelivery__professor__last_name'),
+            professor_corporate_email=F('coursedelivery__professor__corporate_email'),
+            professor_email=F('coursedelivery__professor__email'),
+            professor_type=F('coursedelivery__professor__professor_type'),
+            availabilities=F('coursedelivery__professor__availabilities'),
+        )
+    )
+
+
+def build_delivery_overview(rows):
+    """
+    ``{year: {'year', 'sections': [...]}}`` assembled in one pass over ordered rows.
+
+    Sections (keyed by name, campus and intake) and courses (keyed by code) are
+    contiguous in the row order, so only the current section and course are
+    tracked and nothing is buffered beyond the output itself.
+    """
+    campuses = _choice_labels(CampusChoices)
+    semesters = _choice_labels(SemesterType)
+    course_types = _choice_labels(CourseTypes)
+    professor_types = _choice_labels(ProfessorType)
+
+    years = {}
+    section = course = None
+    section_key = course_key = None
+    for row in rows:
+        key = (row['year'], row['section_name'], row['campus'], row['intake_id'])
+        if key != section_key:
+            section_key, course_key = key, None
+            section = {
+                'section_info': {
+                    'name': row['section_name'],
+                    'campus': row['campus'],
+                    'campus_display': campuses.get(row['campus'], row['campus']),
+                    'intake': {
+                        'id': row['intake_id'],
+                        'name': row['intake_name'],
+                        'semester_display': semesters.get(row['semester'], row['semester']),
+                    },
+                    'program': {
+                        'id': row['program_id'],
+                        'name': row['program_name'],
+                        'code': row['program_code'],
+                    },
+                },
+                'courses': [],
+            }
+            years.setdefault(row['year'], {'year': row['year'], 'sections': []})['sections'].append(section)
+
+        if row['course_code'] != course_key:
+            course_key = row['course_code']
+            course = {
+                'course': {
+                    'id': row['course_id'],
+                    'code': row['course_code'],
+                    'name': row['course_name'],
+                    'type': row['course_type'],
+                    'type_display': course_types.get(row['course_type'], row['course_type']) if row['course_type'] else '',
+                    'credits': row['credits'],
+                    'sessions': row['sessions'],
+                    'area': {
+                        'id': row['area_id'],
+                        'name': row['area_name'] or '',
+                    } if row['area_id'] else None,
+                },
+                'assignments': {
+                    campus: {slot: [] for slot in AvailabilityChoices.values}
+                    for campus in CampusChoices.values
+                },
+            }
+            section['courses'].append(course)
+
+        if row['professor_id'] is None:
+            continue
+        time_slot = 'afternoon' if 'afternoon' in (row['availabilities'] or []) else 'morning'
+        course['assignments'][row['campus']][time_slot].append({
+            'id': row['professor_id'],
+            'name': f"{row['professor_name']} {row['professor_last_name']}",
+            'email': row['professor_corporate_email'] or row['professor_email'],
+            'type': professor_types.get(row['professor_type'], row['professor_type']),
+            'section_name': row['section_name'],
+            'delivery_id': row['delivery_id'],
+        })
+    return years
+
+
+def delivery_overview(program_id=None, intake_id=None, semester=None):
+    rows = delivery_overview_rows(program_id, intake_id, semester)
+    return build_delivery_overview(rows.iterator(chunk_size=ROW_CHUNK_SIZE))
@@ -0,0 +1,65 @@
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from general.cache import invalidate_payloads
+from university.models import CourseDelivery, Intake, IntakeProgramCounter, Section
+
+
+def _unassigned_count(group_by, distinct=False):
+    """Subquery counting unassigned deliveries per ``group_by`` (a through-table lookup)."""
+    return Coalesce(
+        Subquery(
+            CourseDelivery.sections.through.objects
+            .filter(coursedelivery__professor__isnull=True, **{group_by: OuterRef('pk')})
+            .values(group_by)
+            .annotate(total=Count('coursedelivery_id', distinct=distinct))
+            .values('total')
+        ),
+        0,
+    )
+
+
+def refresh_missing_professor_counters(section_ids=None, intake_ids=None):
+    """
+    Recomputes the missing-professor counters of ``section_ids`` and of every
+    intake they (or ``intake_ids``) belong to, including the per-program rows of
+    those intakes. Without arguments every counter is rebuilt.
+
+    - ``Section.missing_professors``: unassigned deliveries in the section.
+    - ``Intake.missing_professors``: distinct unassigned deliveries with a section in the intake.
+    - ``IntakeProgramCounter.missing_professors``: sum of the section counters of
+      the program in the intake (a delivery shared by two sections counts twice).
+    """
+    rebuild_all = section_ids is None and intake_ids is None
+    sections = Section.objects.all() if rebuild_all else Section.objects.filter(pk__in=list(section_ids or ()))
+    with transaction.atomic():
+        if rebuild_all:
+            intakes = Intake.objects.all()
+        else:
+            intakes = Intake.objects.filter(Q(pk__in=list(intake_ids or ())) | Q(pk__in=sections.values('intake_id')))
+
+        sections.update(missing_professors=_unassigned_count('section_id'))
+        intakes.update(missing_professors=_unassigned_count('section__intake_id', distinct=True))
+
+        totals = (
+            Section.objects
+            .filter(intake__in=intakes, program__isnull=False)
+            .values('intake_id', 'program_id')
+            .annotate(total=Sum('missing_professors'))
+            .order_by()
+        )
+        # Upserted in place, so the rows keep their ids; only vanished pairs are deleted
+        IntakeProgramCounter.objects.bulk_create(
+            [
+                IntakeProgramCounter(intake_id=row['intake_id'], program_id=row['program_id'], missing_professors=row['total'])
+                for row in totals
+            ],
+            update_conflicts=True,
+            unique_fields=['intake', 'program'],
+            update_fields=['missing_professors'],
+        )
+        IntakeProgramCounter.objects.filter(intake__in=intakes).exclude(
+            Exists(Section.objects.filter(intake_id=OuterRef('intake_id'), program_id=OuterRef('program_id')))
+        ).delete()
+        invalidate_payloads()
@@ -0,0 +1,59 @@
+from collections import defaultdict
+
+from django.utils.encoding import force_str
+
+from university.models import CourseDelivery, CourseTypes
+from university.translation import localized
+
+
+def program_section_deliveries(program, intake):
+    """
+    ``{section_id: [delivery, ...]}`` for the sections of ``program`` in ``intake``.
+
+    Built in a single pass over one query on the delivery/section through table
+    joined to course and professor, so the query count does not depend on the
+    number of sections or deliveries.
+    """
+    rows = (
+        CourseDelivery.sections.through.objects
+        .filter(section__program=program, section__intake=intake)
+        .annotate(course_name=localized('coursedelivery__course__name'))
+        .order_by('section_id', 'coursedelivery_id')
+        .values_list(
+            'section_id',
+            'coursedelivery_id',
+            'coursedelivery__course_id',
+            'course_name',
+            'coursedelivery__course__code',
+            'coursedelivery__course__credits',
+            'coursedelivery__course__sessions',
+            'coursedelivery__course__course_type',
+            'coursedelivery__professor_id',
+            'coursedelivery__professor__name',
+            'coursedelivery__professor__last_name',
+            'coursedelivery__professor__corporate_email',
+        )
+    )
+
+    course_types = dict(CourseTypes.choices)
+    deliveries = defaultdict(list)
+    for (section_id, delivery_id, course_id, course_name, code, credits, sessions, course_type,
+         professor_id, professor_name, last_name, corporate_email) in rows:
+        deliveries[section_id].append({
+            'id': delivery_id,
+            'course': {
+                'id': course_id,
+                'name': course_name,
+                'code': code,
+                'credits': credits,
+                'sessions': sessions,
+                'course_type_display': force_str(course_types.get(course_type, course_type)) if course_type else None,
+            } if course_id else None,
+            'professor': {
+                'id': professor_id,
+                'name': professor_name,
+                'last_name': last_name,
+                'corporate_email': corporate_email,
+            } if professor_id else None,
+        })
+    return deliveries
@@ -0,0 +1,249 @@
+import datetime
+import random
+from itertools import islice
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from university.models import (
+    Area, AvailabilityChoices, CampusChoices, Course, CourseDelivery, CourseTypes, Degree, DegreeType, Intake,
+    JoinedAcademicYear, Professor, ProfessorCoursePossibility, ProfessorDegree, ProfessorType, Program,
+    ProgramTypeChoices, Schools, Section, SemesterType, University,
+)
+
+from .missing_professors import refresh_missing_professor_counters
+
+BATCH_SIZE = 5000
+
+# Presets for ``generate_synthetic_data(**SIZES[name])``
+SIZES = {
+    'small': {'professors': 200, 'programs': 4, 'intakes': 2, 'courses_per_year': 6, 'sections_per_campus': 1},
+    'medium': {'professors': 2000, 'programs': 12, 'intakes': 4, 'courses_per_year': 10, 'sections_per_campus': 2},
+    'large': {'professors': 10000, 'programs': 40, 'intakes': 8, 'courses_per_year': 12, 'sections_per_campus': 3},
+}
+
+SYLLABLES = [consonant + vowel for consonant in "bcdfglmnprstvz" for vowel in "aeiou"]
+
+
+class _Names:
+    """Pronounceable, seeded names so searches and sorting behave like real data."""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def word(self, syllables=None):
+        syllables = syllables or self.rng.randint(2, 4)
+        return "".join(self.rng.choice(SYLLABLES) for _ in range(syllables)).title()
+
+    def phrase(self, words):
+        return " ".join(self.word() for _ in range(words))
+
+
+def _bulk_create(model, objects, batch_size=BATCH_SIZE):
+    """``bulk_create`` in batches from any iterable; returns the created objects."""
+    created = []
+    objects = iter(objects)
+    while batch := list(islice(objects, batch_size)):
+        created += model.objects.bulk_create(batch)
+    return created
+
+
+def _intake_periods(count, today):
+    """``(start, end, semester)`` of ``count`` consecutive semesters, oldest first, ending with the current one."""
+    if today.month >= 7:
+        semester, year = SemesterType.FALL, today.year
+    elif today.month == 1:
+        semester, year = SemesterType.FALL, today.year - 1
+    else:
+        semester, year = SemesterType.SPRING, today.year
+
+    periods = []
+    for _ in range(count):
+        if semester == SemesterType.FALL:
+            periods.append((datetime.date(year, 9, 1), datetime.date(year + 1, 1, 31), semester))
+            semester = SemesterType.SPRING
+        else:
+            periods.append((datetime.date(year, 2, 1), datetime.date(year, 6, 30), semester))
+            semester, year = SemesterType.FALL, year - 1
+    return periods[::-1]
+
+
+def generate_synthetic_data(
+    *, seed=0, tag='SYN', professors=2000, programs=12, intakes=4, active_intakes=2, courses_per_year=10,
+    sections_per_campus=2, unassigned_rate=0.2, degrees_per_professor=2, possibilities_per_professor=8,
+    universities=50, areas=20, today=None, log=None,
+):
+    """
+    Fills the database with a seeded, realistic-looking population and returns
+    the number of rows created per model.
+
+    Programs are spread over the schools, each with sections per intake, year
+    and campus; every course of a program year is delivered to the sections of
+    each campus (alone or shared by two sections), and ``unassigned_rate`` of
+    those deliveries are left without professor. Assigned professors come from
+    the course's possibilities when there are any.
+
+    Everything is written with ``bulk_create``, so no historical records are
+    created and no signals run; the missing-professor counters of the new
+    intakes are rebuilt at the end. ``tag`` prefixes every unique name and
+    code, so a second dataset needs a different tag.
+    """
+    rng = random.Random(seed)
+    names = _Names(rng)
+    today = today or timezone.localdate()
+    log = log or (lambda message: None)
+    counts = {}
+    tables = set()
+
+    def created(model, objects):
+        counts[model._meta.label] = counts.get(model._meta.label, 0) + len(objects)
+        tables.add(model._meta.db_table)
+        return objects
+
+    with transaction.atomic():
+        university_objects = created(University, _bulk_create(University, (
+            University(name=f"{tag} {names.phrase(2)} University {index}", country=rng.choice(["ES", "US", "GB", "FR", "DE", "MX"]))
+            for index in range(universities)
+        )))
+        degree_objects = created(Degree, _bulk_create(Degree, (
+            Degree(name=f"{tag} {degree_type.label} in {names.word()} {index}", university=university, degree_type=degree_type)
+            for index, university in enumerate(university_objects)
+            for degree_type in (DegreeType.BACHELOR, DegreeType.MASTER, DegreeType.DOCTORATE)
+        )))
+        area_objects = created(Area, _bulk_create(Area, (
+            Area(name=name, name_en=name, name_es=name) for name in (f"{names.word()} {index}" for index in range(areas))
+        )))
+
+        periods = _intake_periods(intakes, today)
+        intake_objects = created(Intake, _bulk_create(Intake, (
+            Intake(
+                name=f"{tag} {start.year} {semester}", start_time=start, end_time=end, semester=semester,
+                active=index >= len(periods) - active_intakes,
+            )
+            for index, (start, end, semester) in enumerate(periods)
+        )))
+        first_year = periods[0][0].year - 4
+        joined_years = {
+            year: joined
+            for year, joined in zip(
+                range(first_year, today.year + 1),
+                created(JoinedAcademicYear, _bulk_create(JoinedAcademicYear, (
+                    JoinedAcademicYear(name=f"{tag} {year}-{year + 1}", start_date=datetime.date(year, 9, 1))
+                    for year in range(first_year, today.year + 1)
+                ))),
+            )
+        }
+
+        program_objects = created(Program, _bulk_create(Program, (
+            Program(
+                name=f"{tag} {'Bachelor' if kind == ProgramTypeChoices.BACHELORS else 'Master'} in {names.phrase(2)}",
+                code=f"{tag}{index}", school=rng.choice(Schools.values), type=kind,
+                years=4 if kind == ProgramTypeChoices.BACHELORS else 1,
+            )
+            for index, kind in enumerate(
+                rng.choice([ProgramTypeChoices.BACHELORS] * 3 + [ProgramTypeChoices.MASTER]) for _ in range(programs)
+            )
+        )))
+        log(f"Created {len(program_objects)} programs and {len(intake_objects)} intakes")
+
+        # Courses per program year
+        course_plan = [(program, year) for program in program_objects for year in range(1, program.years + 1)]
+        course_objects = created(Course, _bulk_create(Course, (
+            Course(
+                code=f"{tag}{index:06d}", name=name, name_en=name, name_es=f"{names.phrase(2)} {index}",
+                course_type=rng.choice(CourseTypes.values), credits=credits, sessions=int(credits * 5),
+                area=rng.choice(area_objects),
+            )
+            for index, name, credits in (
+                (index, f"{names.phrase(2)} {index}", rng.choice([3.0, 4.5, 6.0]))
+                for index in range(len(course_plan) * courses_per_year)
+            )
+        )))
+        courses_by_year = {
+            key: course_objects[position * courses_per_year:(position + 1) * courses_per_year]
+            for position, key in enumerate(course_plan)
+        }
+        created(Course.programs.through, _bulk_create(Course.programs.through, (
+            Course.programs.through(course_id=course.pk, program_id=program.pk)
+            for (program, _), courses in courses_by_year.items() for course in courses
+        )))
+        log(f"Created {len(course_objects)} courses")
+
+        campuses = {program.pk: rng.sample(CampusChoices.values, rng.randint(1, 2)) for program in program_objects}
+        professor_objects = created(Professor, _bulk_create(Professor, (
+            Professor(
+                name=first_name, last_name=last_name,
+                email=f"{first_name}.{last_name}.{index}@example.com".lower().replace(" ", ""),
+                corporate_email=f"{tag}.{index}@ie.example".lower(),
+                campuses=rng.sample(CampusChoices.values, rng.randint(1, len(CampusChoices.values))),
+                availabilities=rng.sample(AvailabilityChoices.values, rng.randint(1, len(AvailabilityChoices.values))),
+                professor_type=rng.choice([ProfessorType.FACULTY] * 2 + [ProfessorType.ADJUNCT_PROFESSOR, ProfessorType.VISITING_PROFESSOR]),
+                minimum_number_of_sessions=rng.choice([0, 30, 60, 90, 120]),
+                birth_year=rng.randint(1950, 1995), gender=rng.choice(["H", "M"]),
+                joined_year=rng.randint(1995, today.year), accredited=rng.random() < 0.6,
+            )
+            for index, first_name, last_name in (
+                (index, names.word(), f"{names.word()} {names.word()}") for index in range(professors)
+            )
+        )))
+        created(ProfessorDegree, _bulk_create(ProfessorDegree, (
+            ProfessorDegree(professor=professor, degree=degree)
+            for professor in professor_objects
+            for degree in rng.sample(degree_objects, min(len(degree_objects), rng.randint(1, degrees_per_professor)))
+        )))
+        course_professors = {}
+        possibilities = []
+        for professor in professor_objects:
+            for course in rng.sample(course_objects, min(len(course_objects), possibilities_per_professor)):
+                course_professors.setdefault(course.pk, []).append(professor)
+                possibilities.append(ProfessorCoursePossibility(professor=professor, course=course))
+        created(ProfessorCoursePossibility, _bulk_create(ProfessorCoursePossibility, possibilities))
+        log(f"Created {len(professor_objects)} professors")
+
+        letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+        link = CourseDelivery.sections.through
+        for intake in intake_objects:
+            # Academic year the intake belongs to: a spring semester continues the previous September's
+            academic_year = intake.start_time.year - (intake.semester == SemesterType.SPRING)
+            sections = {
+                (program, year, campus): [
+                    Section(
+                        name=letters[index], intake=intake, campus=campus, course_year=year, program=program,
+                        joined_academic_year=joined_years.get(academic_year - year + 1),
+                    )
+                    for index in range(sections_per_campus)
+                ]
+                for program, year in course_plan
+                for campus in campuses[program.pk]
+            }
+            created(Section, _bulk_create(Section, (section for group in sections.values() for section in group)))
+
+            deliveries = []
+            for (program, year, _), group in sections.items():
+                for course in courses_by_year[program, year]:
+                    position = 0
+                    while position < len(group):
+                        size = rng.randint(1, 2)
+                        professor = None
+                        if rng.random() >= unassigned_rate:
+                            professor = rng.choice(course_professors.get(course.pk) or professor_objects)
+                        deliveries.append((CourseDelivery(course=course, professor=professor), group[position:position + size]))
+                        position += size
+            created(CourseDelivery, _bulk_create(CourseDelivery, (delivery for delivery, _ in deliveries)))
+            created(link, _bulk_create(link, (
+                link(coursedelivery_id=delivery.pk, section_id=section.pk)
+                for delivery, group in deliveries for section in group
+            )))
+            log(f"Created {len(deliveries)} deliveries for intake {intake.name}")
+
+        if connection.vendor == 'postgresql':
+            # Fresh statistics, or the planner keeps costing these tables as empty
+            # (starting with the counter refresh below)
+            with connection.cursor() as cursor:
+                for table in sorted(tables):
+                    cursor.execute(f'ANALYZE "{table}"')
+        refresh_missing_professor_counters(
+            section_ids=list(Section.objects.filter(intake__in=intake_objects).values_list('pk', flat=True)),
+            intake_ids=[intake.pk for intake in intake_objects],
+        )
+    return counts
@@ -0,0 +1,105 @@
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from university.models import CourseDelivery
+
+
+def delivery_intake_links(**lookups):
+    """
+    Delivery/section links with ``lookups``, keeping one per delivery and
+    intake (the first), so a delivery shared by two sections of an intake is
+    counted once there. The duplicates go with an anti-join, not a DISTINCT.
+    """
+    Through = CourseDelivery.sections.through
+    earlier = Through.objects.filter(
+        coursedelivery_id=OuterRef('coursedelivery_id'),
+        section__intake_id=OuterRef('section__intake_id'),
+        pk__lt=OuterRef('pk'),
+    )
+    return Through.objects.filter(**lookups).exclude(Exists(earlier))
+
+
+def _workload_lookups(professor_id, intake_id, semester, active):
+    lookups = {'coursedelivery__professor__isnull': False}
+    if professor_id is not None:
+        lookups['coursedelivery__professor_id'] = professor_id
+    if intake_id is not None:
+        lookups['section__intake_id'] = intake_id
+    if semester is not None:
+        lookups['section__intake__semester'] = semester
+    if active is not None:
+        lookups['section__intake__active'] = active
+    return lookups
+
+
+def workload_deliveries(professor_id=None, intake_id=None, semester=None, active=None):
+    """The deliveries counted by ``professor_workload`` with the same filters."""
+    links = CourseDelivery.sections.through.objects.filter(
+        **_workload_lookups(professor_id, intake_id, semester, active)
+    )
+    return CourseDelivery.objects.filter(pk__in=links.values('coursedelivery_id'))
+
+
+def professor_workload(professor_id=None, intake_id=None, semester=None, active=None):
+    """
+    Deliveries, sessions and credits each professor teaches per intake, next
+    to their PDP (``minimum_number_of_sessions``), in one grouped query.
+
+    Rows are ordered by intake (newest first), then professor name; a
+    professor without deliveries in an intake has no row for it.
+    ``missing_sessions`` is how far the professor is below the PDP there.
+    """
+    rows = (
+        delivery_intake_links(**_workload_lookups(professor_id, intake_id, semester, active))
+        .values(
+            professor_id=F('coursedelivery__professor_id'),
+            professor_name=F('coursedelivery__professor__name'),
+            professor_last_name=F('coursedelivery__professor__last_name'),
+            minimum_sessions=F('coursedelivery__professor__minimum_number_of_sessions'),
+            intake_id=F('section__intake_id'),
+            intake_name=F('section__intake__name'),
+            intake_start=F('section__intake__start_time'),
+            semester=F('section__intake__semester'),
+        )
+        .annotate(
+            deliveries=Count('coursedelivery_id'),
+            sessions=Coalesce(Sum('coursedelivery__course__sessions'), 0),
+            credits=Coalesce(Sum('coursedelivery__course__credits'), 0.0),
+        )
+        .order_by('-intake_start', 'intake_id', 'professor_last_name', 'professor_name', 'professor_id')
+    )
+    return [
+        {
+            'professor_id': row['professor_id'],
+            'professor_name': f"{row['professor_name']} {row['professor_last_name']}",
+            'intake_id': row['intake_id'],
+            'intake_name': row['intake_name'],
+            'semester': row['semester'],
+            'deliveries': row['deliveries'],
+            'sessions': row['sessions'],
+            'credits': row['credits'],
+            'minimum_sessions': row['minimum_sessions'],
+            'missing_sessions': max(row['minimum_sessions'] - row['sessions'], 0),
+        }
+        for row in rows
+    ]
+
+
+def sessions_taught(**lookups):
+    """
+    Subquery with the sessions the outer professor teaches in the intakes
+    matching ``lookups`` (Intake lookups, e.g. ``active=True``), 0 for none.
+    """
+    return Coalesce(
+        Subquery(
+            delivery_intake_links(
+                coursedelivery__professor_id=OuterRef('pk'),
+                **{f'section__intake__{lookup}': value for lookup, value in lookups.items()},
+            )
+            .values('coursedelivery__professor_id')
+            .annotate(total=Sum('coursedelivery__course__sessions'))
+            .values('total'),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
@@ -0,0 +1,105 @@
+"""
+Keeps the missing-professor counters (see ``refresh_missing_professor_counters``)
+in line with course delivery, section and delivery/section changes, and drops
+the cached API payloads whenever a university model they read changes.
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+
+from general.cache import invalidate_payloads
+from university.models import (
+    Area, Course, CourseDelivery, CourseDeliverySection, CurrentIntake, Degree, Intake, JoinedAcademicYear,
+    Professor, ProfessorCoursePossibility, ProfessorDegree, Program, Section, University,
+)
+from university.services import refresh_missing_professor_counters
+
+_UNKNOWN = object()
+
+
+def _delivery_section_ids(delivery):
+    return list(
+        CourseDelivery.sections.through.objects
+        .filter(coursedelivery_id=delivery.pk)
+        .values_list('section_id', flat=True)
+    )
+
+
+@receiver(post_init, sender=CourseDelivery)
+def remember_delivery_professor(sender, instance, **kwargs):
+    instance._saved_professor_id = instance.__dict__.get('professor_id', _UNKNOWN)
+
+
+@receiver(post_save, sender=CourseDelivery)
+def refresh_on_delivery_save(sender, instance, created, raw=False, **kwargs):
+    previous = instance._saved_professor_id
+    instance._saved_professor_id = instance.professor_id
+    # New deliveries have no sections yet; only assigning/unassigning moves the counters
+    if created or raw or (previous is not _UNKNOWN and (previous is None) == (instance.professor_id is None)):
+        return
+    refresh_missing_professor_counters(section_ids=_delivery_section_ids(instance))
+
+
+@receiver(pre_delete, sender=CourseDelivery)
+def remember_delivery_sections(sender, instance, **kwargs):
+    instance._deleted_section_ids = _delivery_section_ids(instance)
+
+
+@receiver(post_delete, sender=CourseDelivery)
+def refresh_on_delivery_delete(sender, instance, **kwargs):
+    if instance.professor_id is None and instance._deleted_section_ids:
+        refresh_missing_professor_counters(section_ids=instance._deleted_section_ids)
+
+
+@receiver(m2m_changed, sender=CourseDelivery.sections.through)
+def refresh_on_sections_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        instance._cleared_section_ids = [instance.pk] if reverse else _delivery_section_ids(instance)
+    elif action == 'post_clear':
+        refresh_missing_professor_counters(section_ids=instance._cleared_section_ids)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        if reverse:
+            refresh_missing_professor_counters(section_ids=[instance.pk])
+        elif instance.professor_id is None:
+            refresh_missing_professor_counters(section_ids=pk_set)
+
+
+@receiver(post_init, sender=Section)
+def remember_section_intake(sender, instance, **kwargs):
+    instance._saved_placement = (instance.__dict__.get('intake_id'), instance.__dict__.get('program_id'))
+
+
+@receiver(post_save, sender=Section)
+def refresh_on_section_save(sender, instance, created, raw=False, **kwargs):
+    previous_intake_id, previous_program_id = instance._saved_placement
+    instance._saved_placement = (instance.intake_id, instance.program_id)
+    if raw or (not created and (previous_intake_id, previous_program_id) == (instance.intake_id, instance.program_id)):
+        return
+    # New sections and program moves change which programs an intake lists
+    refresh_missing_professor_counters(
+        section_ids=[instance.pk],
+        intake_ids=[intake_id for intake_id in (previous_intake_id, instance.intake_id) if intake_id],
+    )
+
+
+@receiver(post_delete, sender=Section)
+def refresh_on_section_delete(sender, instance, **kwargs):
+    refresh_missing_professor_counters(intake_ids=[instance.intake_id])
+
+
+def invalidate_cached_payloads(sender, action=None, **kwargs):
+    if action is None or action.startswith('post_'):
+        invalidate_payloads()
+
+
+# The models the cached payloads and the ETag generation read, nested relations
+# and links included. Not IntakeProgramCounter (the counter refresh invalidates
+# once itself) nor the history models; connecting only these keeps the fast
+# (signal-free) queryset deletes of every other model.
+for _model in (
+    Intake, CurrentIntake, JoinedAcademicYear, Program, Area, Course, Section, University, Degree,
+    Professor, ProfessorDegree, ProfessorCoursePossibility, CourseDelivery, CourseDeliverySection,
+):
+    post_save.connect(invalidate_cached_payloads, sender=_model)
+    post_delete.connect(invalidate_cached_payloads, sender=_model)
+for _through in (Course.programs.through, CourseDelivery.sections.through, ProfessorDegree, ProfessorCoursePossibility):
+    m2m_changed.connect(invalidate_cached_payloads, sender=_through)
@@ -1,4 +1,8 @@
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, NullIf
 from modeltranslation.translator import translator, TranslationOptions
+from modeltranslation.settings import DEFAULT_LANGUAGE
+from modeltranslation.utils import build_localized_fieldname, get_language
 from university.models import Area, Course
 from simple_history import register
 
@@ -9,4 +13,17 @@ class CourseTranslationOptions(TranslationOptions):
     fields = ('name',)
 
 translator.register(Area, AreaTranslationOptions)
-translator.register(Course, CourseTranslationOptions)
\ No newline at end of file
+translator.register(Course, CourseTranslationOptions)
+
+
+def localized(lookup):
+    """
+    Expression for a translated field (e.g. ``course__name``) in the active
+    language, falling back to the default language like the model descriptors.
+    Needed by ``values()`` queries, which read the raw columns.
+    """
+    return Coalesce(
+        NullIf(F(build_localized_fieldname(lookup, get_language())), Value('')),
+        NullIf(F(build_localized_fieldname(lookup, DEFAULT_LANGUAGE)), Value('')),
+        F(lookup),
+    )
@@ -91,10 +91,10 @@ class ProgramDeliveryOverviewView(UnfoldModelAdminViewMixin, TemplateView):
             to_attr="filtered_sections"
         )
 
-        deliveries = CourseDelivery.objects.filter(
-            sections__program=program,
-            sections__intake__active=True
-        ).select_related("course", "professor").prefetch_related(sections_prefetch).distinct()
+        deliveries = CourseDelivery.objects.with_section(
+            program=program,
+            intake__active=True
+        ).select_related("course", "professor").prefetch_related(sections_prefetch)
 
         all_section_keys_set = set()
 